@@ -95,13 +95,10 @@ if args.map:
     options.append('--game_config')
     options.append(args.map)
 
-iteration = 0
-
-while True:
-    serverProcess = Popen([*options,
-                           '--record_path',
-                           f'/replays/replay-{iteration}.json'],
-                          stdin=PIPE, shell=False)
-    serverProcess.wait()
-
-    iteration += 1
+# a single server process hosts every game, one replay per game
+serverProcess = Popen([*options,
+                       '--lobby',
+                       '--record_path',
+                       '/replays/replay-{game}.json'],
+                      stdin=PIPE, shell=False)
+serverProcess.wait()
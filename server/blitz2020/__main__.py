@@ -5,10 +5,15 @@ import logging
 import signal
 import time
 from pathlib import Path
+from typing import Optional
 
 import configargparse
+from blitz2020.game.array_game_map import ArrayGameMap
 from blitz2020.game.game_config import GameConfig
+from blitz2020.game.game_map import GameMap
 from blitz2020.servers.socket.socket_game_server import SocketGameServer
+from blitz2020.servers.socket.socket_lobby_server import SocketLobbyServer
+from blitz2020.servers.socket.tournament_server import TournamentServer
 
 # We need that to shutdown the process on Windows (python ..)
 signal.signal(signal.SIGINT, signal.SIG_DFL)
@@ -71,7 +76,7 @@ parser.add_argument(
 parser.add_argument(
     "--game_delay",
     env_var="GAME_DELAY",
-    help="Allows you to slow down the game, useful for debuging. Value in (ms)",
+    help="Allows you to slow down the game, useful for debuging. Minimum duration of a tick in (ms)",
     type=int,
     default=0,
 )
@@ -92,6 +97,87 @@ parser.add_argument(
     default=120,
 )
 
+parser.add_argument(
+    "--map_storage",
+    env_var="MAP_STORAGE",
+    help="Select how the game map is stored: python lists or numpy arrays (faster on large maps)",
+    type=str,
+    default="list",
+    choices=["list", "array"],
+)
+
+parser.add_argument(
+    "--pretty_map",
+    env_var="PRETTY_MAP",
+    help="Select who receives the pretty map: everyone, only the bots registering with 'pretty_map': true, or nobody",
+    type=str,
+    default=SocketGameServer.PRETTY_MAP_ALWAYS,
+    choices=SocketGameServer.pretty_map_options,
+)
+
+parser.add_argument(
+    "--compact_json",
+    env_var="COMPACT_JSON",
+    help="Send and record compact json documents (no indentation), encoded with orjson when it is installed",
+    action="store_true",
+)
+
+parser.add_argument(
+    "--keyframe_interval",
+    env_var="KEYFRAME_INTERVAL",
+    help="Number of tick messages between two full game states for the clients using the delta protocol",
+    type=int,
+    default=50,
+)
+
+parser.add_argument(
+    "--record_format",
+    env_var="RECORD_FORMAT",
+    help="Select the replay format: a json document written at the end of the game, json lines written every tick "
+    "or delta compressed json lines with keyframes",
+    type=str,
+    default=SocketGameServer.RECORD_FORMAT_JSON,
+    choices=SocketGameServer.record_formats,
+)
+
+parser.add_argument(
+    "--record_drop_ticks",
+    env_var="RECORD_DROP_TICKS",
+    help="Drop the ticks the recorders cannot keep up with instead of buffering them in memory",
+    action="store_true",
+)
+
+parser.add_argument(
+    "--lobby",
+    env_var="LOBBY",
+    help="Host many games in this process, the registrations are routed to a game by room. "
+    "Use {room} and {game} in the record and S3 paths to keep the replay of every game",
+    action="store_true",
+)
+
+parser.add_argument(
+    "--room_ids_by_token",
+    env_var="ROOM_IDS_BY_TOKEN",
+    help="The lobby room of the players registering with a token, when their registration has no room",
+    type=str,
+    default=None,
+)
+
+parser.add_argument(
+    "--tournament",
+    env_var="TOURNAMENT",
+    help="Like --lobby, but the games run in a pool of worker processes",
+    action="store_true",
+)
+
+parser.add_argument(
+    "--nb_workers",
+    env_var="NB_WORKERS",
+    help="The number of worker processes of the tournament mode, the number of cores by default",
+    type=int,
+    default=None,
+)
+
 args = parser.parse_args()
 
 logFormatter = logging.Formatter("%(asctime)s - %(levelname)-8s [%(name)s] - %(message)s")
@@ -108,43 +194,69 @@ consoleHandler.setFormatter(logFormatter)
 rootLogger.addHandler(consoleHandler)
 
 
-async def start() -> None:
-    # Start the game
+def create_game_server(record_path: str = None, s3_path: str = None) -> SocketGameServer:
+    game_map_class = ArrayGameMap if args.map_storage == "array" else GameMap
+
+    game_config = None
     if args.game_config is not None:
         root_path = Path(__file__).parent.parent.parent
         file_path = (root_path / f"server/game_presets/{args.game_config}").resolve()
-        game_config = GameConfig.from_file(file_path)
-
-        game = SocketGameServer(
-            max_nb_ticks=args.max_nb_ticks,
-            min_nb_players=args.min_nb_players,
-            max_nb_players=args.max_nb_players,
-            start_delay_timeout=args.start_delay_timeout,
-            team_names_by_token=json.loads(args.team_names_by_token) if args.team_names_by_token is not None else None,
-            game_config=game_config,
-            record_path=args.record_path,
-            s3_bucket=args.s3_bucket,
-            s3_path=args.s3_path,
-            path=args.server_address,
-            game_delay=args.game_delay,
-            log_file=args.log_file,
-            move_timeout=args.move_timeout,
-        )
-    else:
-        game = SocketGameServer(
-            max_nb_ticks=args.max_nb_ticks,
-            min_nb_players=args.min_nb_players,
-            max_nb_players=args.max_nb_players,
-            start_delay_timeout=args.start_delay_timeout,
-            team_names_by_token=json.loads(args.team_names_by_token) if args.team_names_by_token is not None else None,
-            record_path=args.record_path,
-            s3_bucket=args.s3_bucket,
-            s3_path=args.s3_path,
-            path=args.server_address,
-            game_delay=args.game_delay,
-            log_file=args.log_file,
-            move_timeout=args.move_timeout,
-        )
+        game_config = GameConfig.from_file(file_path, game_map_class)
+
+    return SocketGameServer(
+        max_nb_ticks=args.max_nb_ticks,
+        min_nb_players=args.min_nb_players,
+        max_nb_players=args.max_nb_players,
+        start_delay_timeout=args.start_delay_timeout,
+        team_names_by_token=json.loads(args.team_names_by_token) if args.team_names_by_token is not None else None,
+        game_config=game_config,
+        record_path=record_path,
+        s3_bucket=args.s3_bucket,
+        s3_path=s3_path,
+        path=args.server_address,
+        game_delay=args.game_delay,
+        log_file=args.log_file,
+        move_timeout=args.move_timeout,
+        game_map_class=game_map_class,
+        pretty_map=args.pretty_map,
+        compact_json=args.compact_json,
+        keyframe_interval=args.keyframe_interval,
+        record_format=args.record_format,
+        record_drop_ticks=args.record_drop_ticks,
+    )
+
+
+def game_path(path: Optional[str], room_id: str, game_id: int) -> Optional[str]:
+    # only the {room} and {game} tokens are replaced, other braces are kept as is
+    if path is None:
+        return None
+    return path.replace("{room}", room_id).replace("{game}", str(game_id))
+
+
+def create_lobby_game_server(room_id: str, game_id: int) -> SocketGameServer:
+    return create_game_server(game_path(args.record_path, room_id, game_id), game_path(args.s3_path, room_id, game_id))
+
+
+async def start() -> None:
+    room_ids_by_token = json.loads(args.room_ids_by_token) if args.room_ids_by_token is not None else None
+    if args.tournament or args.lobby:
+        if args.tournament:
+            lobby: SocketLobbyServer = TournamentServer(
+                create_lobby_game_server,
+                nb_workers=args.nb_workers,
+                path=args.server_address,
+                room_ids_by_token=room_ids_by_token,
+            )
+        else:
+            lobby = SocketLobbyServer(
+                create_lobby_game_server, path=args.server_address, room_ids_by_token=room_ids_by_token
+            )
+        await lobby.start()
+        await lobby.server.wait_closed()
+        return
+
+    # Start the game
+    game = create_game_server(args.record_path, args.s3_path)
 
     await game.start()
     winner = await game.wait_for_game_to_finish()
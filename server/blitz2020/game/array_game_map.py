@@ -0,0 +1,176 @@
+from typing import Optional, Tuple, List, Any, Dict, Callable, Set
+
+import numpy as np
+
+from blitz2020.game.game_map import GameMap
+from blitz2020.game.position import Position
+
+
+class ArrayGameMap(GameMap):
+    """
+    A GameMap storing its tiles in two compact NumPy arrays instead of a list of lists of tuples
+
+    The public API is the same as GameMap, single tile accesses are a bit slower but every
+    operation on the whole map (counting, clearing, finding empty tiles) is vectorized.
+
+    Attributes
+    ----------
+    kinds : numpy.ndarray
+        a (size, size) uint8 array of tile kinds, see `kind_states`
+    owners : numpy.ndarray
+        a (size, size) int8 array of tile owners, `NO_OWNER` when the tile is not conquered
+
+    The arrays are only written by the map methods, call `invalidate_tiles` after writing them directly.
+    """
+
+    NO_OWNER = -1
+
+    # kind value -> tile state
+    kind_states = [GameMap.EMPTY, GameMap.ASTEROIDS, GameMap.PLANET, GameMap.BLITZIUM, GameMap.BLACK_HOLE]
+    state_kinds = {state: kind for kind, state in enumerate(kind_states)}
+
+    EMPTY_KIND = state_kinds[GameMap.EMPTY]
+    ASTEROIDS_KIND = state_kinds[GameMap.ASTEROIDS]
+    PLANET_KIND = state_kinds[GameMap.PLANET]
+    BLITZIUM_KIND = state_kinds[GameMap.BLITZIUM]
+    BLACK_HOLE_KIND = state_kinds[GameMap.BLACK_HOLE]
+
+    def _allocate_tiles(self, size: int) -> None:
+        self.kinds = np.full((size, size), ArrayGameMap.EMPTY_KIND, dtype=np.uint8)
+        self.owners = np.full((size, size), ArrayGameMap.NO_OWNER, dtype=np.int8)
+        self._tiles: Optional[List[List[Tuple[str, Optional[int]]]]] = None
+
+    def _load_tile(self, x: int, y: int) -> Tuple[str, Optional[int]]:
+        owner = self.owners.item(y, x)
+        return ArrayGameMap.kind_states[self.kinds.item(y, x)], (None if owner < 0 else owner)
+
+    def _store_tile(self, x: int, y: int, tile: Tuple[str, Optional[int]]) -> None:
+        state, owner = tile
+        self.kinds[y, x] = ArrayGameMap.state_kinds[state]
+        self.owners[y, x] = ArrayGameMap.NO_OWNER if owner is None else owner
+        self._tiles = None
+
+    @property
+    def tiles(self) -> Optional[List[List[Tuple[str, Optional[int]]]]]:
+        """
+        A list of lists of tuples[state, owner] view of the map, same format as GameMap.tiles
+
+        The view is built on the first access after the map changed, it must not be modified.
+        """
+        if self.size == 0:
+            return None
+        if self._tiles is None:
+            states = ArrayGameMap.kind_states
+            self._tiles = [
+                [(states[kind], (None if owner < 0 else owner)) for kind, owner in zip(kinds_row, owners_row)]
+                for kinds_row, owners_row in zip(self.kinds.tolist(), self.owners.tolist())
+            ]
+        return self._tiles
+
+    @tiles.setter
+    def tiles(self, tiles: Optional[List[List[Tuple[str, Optional[int]]]]]) -> None:
+        size = 0 if tiles is None else len(tiles)
+        self._allocate_tiles(size)
+        for y in range(size):
+            for x in range(size):
+                self._store_tile(x, y, tiles[y][x])
+        self._count_owned_tiles()
+
+    def invalidate_tiles(self) -> None:
+        """
+        Rebuild the tiles view on its next access, the kinds or owners arrays were written directly
+        """
+        self._tiles = None
+
+    def _count_owned_tiles(self) -> None:
+        owners = self.owners.ravel()
+        indices = np.flatnonzero(owners != ArrayGameMap.NO_OWNER)
+        planets = self.kinds.ravel()[indices] == ArrayGameMap.PLANET_KIND
+        self.owned_tiles = {}
+        self.owned_planets = {}
+        for index, owner, is_planet in zip(indices.tolist(), owners[indices].tolist(), planets.tolist()):
+            self.owned_tiles.setdefault(owner, set()).add(index)
+            self.owned_planets[owner] = self.owned_planets.get(owner, 0) + is_planet
+
+    @staticmethod
+    def tile_arrays(game_map: GameMap) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The kinds and owners arrays of any game map, the arrays of an ArrayGameMap are returned without copy
+        """
+        if isinstance(game_map, ArrayGameMap):
+            return game_map.kinds, game_map.owners
+        tiles = game_map.tiles
+        kinds = np.array([[ArrayGameMap.state_kinds[state] for state, _ in row] for row in tiles], np.uint8)
+        owners = np.array(
+            [[ArrayGameMap.NO_OWNER if owner is None else owner for _, owner in row] for row in tiles], np.int8
+        )
+        return kinds, owners
+
+    @classmethod
+    def from_game_map(cls, game_map: GameMap) -> "ArrayGameMap":
+        """
+        Create an ArrayGameMap with the same content as game_map
+        """
+        obj = cls()
+        obj.size = game_map.size
+        obj.tiles = game_map.tiles
+        obj.empty_tiles = game_map.empty_tiles
+        return obj
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ArrayGameMap):
+            return super().__eq__(other)
+        return (
+            self.size == other.size
+            and self.empty_tiles == other.empty_tiles
+            and np.array_equal(self.kinds, other.kinds)
+            and np.array_equal(self.owners, other.owners)
+        )
+
+    def __deepcopy__(self, _: Optional[Dict[str, Any]] = None) -> "ArrayGameMap":
+        obj = type(self)()
+        obj.size = self.size
+        obj.kinds = self.kinds.copy()
+        obj.owners = self.owners.copy()
+        obj.empty_tiles = self.empty_tiles
+        obj.owned_tiles = {owner: tiles.copy() for owner, tiles in self.owned_tiles.items()}
+        obj.owned_planets = self.owned_planets.copy()
+        return obj
+
+    def clear_tile_owned_by(self, player_id: int) -> None:
+        owned = self.owned_tiles.pop(player_id, set())
+        if self.journal is not None:
+            self.journal.record(
+                self._restore_owned_tiles, player_id, owned, self.count_planets_owned_by(player_id), self.empty_tiles
+            )
+
+        # blitziums and black holes cannot be owned, cleared tiles are either planets or empty tiles
+        self.empty_tiles += len(owned) - self.count_planets_owned_by(player_id)
+        self.owners.ravel()[list(owned)] = ArrayGameMap.NO_OWNER
+        self.owned_planets[player_id] = 0
+        self._tiles = None
+
+    def _restore_owned_tiles(self, player_id: int, owned: Set[int], nb_planets: int, empty_tiles: int) -> None:
+        """
+        Undo clear_tile_owned_by, owned are the cleared tiles
+        """
+        self.owners.ravel()[list(owned)] = player_id
+        self._tiles = None
+        self.owned_tiles[player_id] = owned
+        self.owned_planets[player_id] = nb_planets
+        self.empty_tiles = empty_tiles
+
+    def _walkable(self, player_id: Optional[int]) -> Callable[[int], bool]:
+        # flat views of the arrays, indexing a memoryview is much faster than indexing an array
+        kinds = self.kinds.ravel().data
+        if player_id is None:
+            return lambda index: kinds[index] != ArrayGameMap.ASTEROIDS_KIND
+
+        owners = self.owners.ravel().data
+        return lambda index: kinds[index] != ArrayGameMap.ASTEROIDS_KIND and owners[index] == player_id
+
+    def get_empty_tiles(self) -> List[Position]:
+        empty = (self.kinds == ArrayGameMap.EMPTY_KIND) & (self.owners == ArrayGameMap.NO_OWNER)
+        # same ordering as GameMap: x first, then y
+        xs, ys = np.nonzero(empty[1:-1, 1:-1].T)
+        return [Position(x + 1, y + 1) for x, y in zip(xs.tolist(), ys.tolist())]
@@ -1,22 +1,69 @@
-from queue import SimpleQueue
-from typing import List
+from typing import Iterable, List
 
 from blitz2020.game.direction import directions
-from blitz2020.game.position import Position
 
 
 def flood(flood: List[List[int]], target: int, replacement: int) -> None:
     x_size = len(flood[0])
     y_size = len(flood)
 
-    queue: SimpleQueue = SimpleQueue()
-    queue.put(Position(0, 0))
-    while not queue.empty():
-        cur = queue.get()
+    stack = [(0, 0)]
+    while stack:
+        x, y = stack.pop()
         for _, delta in directions:
-            sibblingX = cur.x + delta[0]
-            sibblingY = cur.y + delta[1]
+            sibblingX = x + delta[0]
+            sibblingY = y + delta[1]
             if sibblingX >= 0 and sibblingX < x_size and sibblingY >= 0 and sibblingY < y_size:
                 if flood[sibblingY][sibblingX] == target:
                     flood[sibblingY][sibblingX] = replacement
-                    queue.put(Position(sibblingX, sibblingY))
+                    stack.append((sibblingX, sibblingY))
+
+
+def enclosed_tiles(size: int, borders: Iterable[int]) -> List[int]:
+    """
+    Find the tiles enclosed by borders on a size x size map
+
+    The map is flooded from the top-left corner without crossing the border tiles, the enclosed tiles
+    are the ones the flood did not reach. Tiles are flat indices (y * size + x).
+
+    Parameters
+    ----------
+    size : int
+        The map size
+    borders : Iterable[int]
+        Flat indices of the tiles enclosing the area, they are never part of the result
+
+    Returns
+    -------
+    The enclosed tiles flat indices in increasing order
+    """
+    nb_tiles = size * size
+    last_row = nb_tiles - size
+    reached = bytearray(nb_tiles)
+    for index in borders:
+        reached[index] = 1
+
+    reached[0] = 1
+    stack = [0]
+    while stack:
+        index = stack.pop()
+        x = index % size
+        if index >= size and not reached[index - size]:
+            reached[index - size] = 1
+            stack.append(index - size)
+        if x > 0 and not reached[index - 1]:
+            reached[index - 1] = 1
+            stack.append(index - 1)
+        if index < last_row and not reached[index + size]:
+            reached[index + size] = 1
+            stack.append(index + size)
+        if x < size - 1 and not reached[index + 1]:
+            reached[index + 1] = 1
+            stack.append(index + 1)
+
+    enclosed = []
+    index = reached.find(0)
+    while index >= 0:
+        enclosed.append(index)
+        index = reached.find(0, index + 1)
+    return enclosed
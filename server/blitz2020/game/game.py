@@ -1,6 +1,5 @@
 import asyncio
 import logging
-import time
 from asyncio import Future
 from typing import List, Optional, Coroutine
 
@@ -9,6 +8,7 @@ from blitz2020.game.abstract_recorder import AbstractRecorder
 from blitz2020.game.abstract_viewer import AbstractViewer
 from blitz2020.game.action import Action
 from blitz2020.game.game_state import GameState
+from blitz2020.game.tick_scheduler import TickScheduler
 
 
 class Game:
@@ -24,11 +24,18 @@ class Game:
         self.recorders: List[AbstractRecorder] = []
 
         # settings
-        min_nb_ticks = 100
-        self.max_nb_ticks = min(max_nb_ticks, max(min_nb_ticks, 16 * game_state.game_map.size + 70))
+        self.max_nb_ticks = Game.get_max_nb_ticks(game_state, max_nb_ticks)
         self.move_timeout = move_timeout
         self.delay = delay
 
+    @staticmethod
+    def get_max_nb_ticks(game_state: GameState, max_nb_ticks: int) -> int:
+        """
+        The length of a game on the map of game_state, short games are not allowed on big maps
+        """
+        min_nb_ticks = 100
+        return min(max_nb_ticks, max(min_nb_ticks, 16 * game_state.game_map.size + 70))
+
     def register_recorder(self, recorder: AbstractRecorder) -> None:
         self.logger.info(f"Recorder '{recorder.uid}' will record the game")
         self.recorders.append(recorder)
@@ -66,6 +73,8 @@ class Game:
 
     async def game_loop(self) -> AbstractPlayer:
         self.is_started = True
+        scheduler = TickScheduler(self.delay)
+        scheduler.start()
 
         while self.is_started:
             self.game_tick += 1
@@ -92,9 +101,8 @@ class Game:
 
             [recorder.record_tick(self.game_tick, self.game_state) for recorder in self.recorders]
 
-            # Time to slow things down
-            if self.delay > 0:
-                time.sleep(self.delay / 1000)
+            # Time to slow things down, without blocking the other coroutines
+            await scheduler.wait_next_tick()
 
         self.players.sort(key=lambda x: x.player_state.score, reverse=True)
         for p in self.players:
@@ -105,7 +113,7 @@ class Game:
 
         await asyncio.gather(*[self.send_winner(viewer, winner) for viewer in self.viewers], return_exceptions=True)
 
-        [recorder.close() for recorder in self.recorders]
+        await asyncio.gather(*[recorder.close() for recorder in self.recorders])
 
         return winner
 
@@ -1,5 +1,5 @@
 from os import PathLike
-from typing import List
+from typing import List, Type
 
 from blitz2020.game.direction import Direction
 from blitz2020.game.game_map import GameMap
@@ -13,11 +13,11 @@ class GameConfig:
         self.spawn_directions = spawn_directions
 
     @classmethod
-    def from_str(cls, data: str) -> "GameConfig":
+    def from_str(cls, data: str, game_map_class: Type[GameMap] = GameMap) -> "GameConfig":
         lines = data.strip().split("\n")
 
         map_size = len(lines)
-        game_map = GameMap(map_size)
+        game_map = game_map_class(map_size)
 
         spawn_positions = []
         spawn_directions = []
@@ -65,7 +65,7 @@ class GameConfig:
         return GameConfig(game_map, [p for i, p in spawn_positions], spawn_directions)
 
     @classmethod
-    def from_file(cls, path: PathLike) -> 'GameConfig':
+    def from_file(cls, path: PathLike, game_map_class: Type[GameMap] = GameMap) -> 'GameConfig':
         with open(path) as f:
             data = f.read()
-            return GameConfig.from_str(data)
+            return GameConfig.from_str(data, game_map_class)
@@ -1,7 +1,9 @@
 import random
-from typing import Optional, Tuple, List, Any, Dict
+from collections import deque
+from typing import Optional, Tuple, List, Any, Dict, Set, Deque, Callable
 
 from blitz2020.game.position import Position
+from blitz2020.game.undo_journal import UndoJournal
 
 
 class OutOfBoundExeption(Exception):
@@ -37,6 +39,12 @@ class GameMap:
         the map size
     empty_tiles : int
         number of free tiles in the map
+    owned_tiles : dict
+        flat indices (y * size + x) of the tiles owned by each player id, kept up to date by set_tile
+    owned_planets : dict
+        number of planets owned by each player id, kept up to date by set_tile
+    journal : UndoJournal
+        when set, the tile changes are recorded to be rolled back (see `GameState.start_journal`)
     """
 
     EMPTY = " "
@@ -50,19 +58,39 @@ class GameMap:
 
     empty_tile = (EMPTY, None)
 
+    journal: Optional[UndoJournal] = None
+
     def __init__(self, size: int = 0):
         self.size = size
-        self.tiles: Optional[List[List[Tuple[str, Optional[int]]]]] = None
         self.empty_tiles = 0
+        self.owned_tiles: Dict[int, Set[int]] = {}
+        self.owned_planets: Dict[int, int] = {}
+        self._path_visited: List[int] = []
+        self._path_parents: List[int] = []
+        self._path_stamp = 0
+        self._allocate_tiles(size)
         if size > 0:
-            self.tiles = [[GameMap.empty_tile] * size for _ in range(size)]
             self.empty_tiles = (size - 2) ** 2
 
             w = (self.ASTEROIDS, None)
             for y in range(size):
                 for x in range(size):
                     if x == 0 or x == size - 1 or y == 0 or y == size - 1:
-                        self.tiles[y][x] = w
+                        self._store_tile(x, y, w)
+
+    def _allocate_tiles(self, size: int) -> None:
+        """
+        Allocate the tiles storage, every tile is empty
+        """
+        self.tiles: Optional[List[List[Tuple[str, Optional[int]]]]] = None
+        if size > 0:
+            self.tiles = [[GameMap.empty_tile] * size for _ in range(size)]
+
+    def _load_tile(self, x: int, y: int) -> Tuple[str, Optional[int]]:
+        return self.tiles[y][x]
+
+    def _store_tile(self, x: int, y: int, tile: Tuple[str, Optional[int]]) -> None:
+        self.tiles[y][x] = tile
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, GameMap):
@@ -74,6 +102,8 @@ class GameMap:
         obj.size = self.size
         obj.tiles = [row.copy() for row in self.tiles]
         obj.empty_tiles = self.empty_tiles
+        obj.owned_tiles = {owner: tiles.copy() for owner, tiles in self.owned_tiles.items()}
+        obj.owned_planets = self.owned_planets.copy()
         return obj
 
     def __str__(self) -> str:
@@ -130,7 +160,7 @@ class GameMap:
         """
         self.check_position(position)
 
-        return self.tiles[position.y][position.x]
+        return self._load_tile(position.x, position.y)
 
     def set_tile(self, position: Position, state: str, player_id: Optional[int] = None) -> None:
         """
@@ -168,12 +198,32 @@ class GameMap:
         if state != GameMap.PLANET and self.get_tile(position)[0] == GameMap.PLANET:
             raise InvalidStateException(f"Cannot overwrite a planet at {position}")
 
-        if (state, player_id) != GameMap.empty_tile and self.is_empty(position):
+        if self.journal is not None:
+            self.journal.record(self._write_tile, position.x, position.y, self._load_tile(position.x, position.y))
+        self._write_tile(position.x, position.y, (state, player_id))
+
+    def _write_tile(self, x: int, y: int, tile: Tuple[str, Optional[int]]) -> None:
+        """
+        Store a valid tile and update the tile counts, without recording it in the journal
+        """
+        cur_state, cur_owner = cur_tile = self._load_tile(x, y)
+        if tile != GameMap.empty_tile and cur_tile == GameMap.empty_tile:
             self.empty_tiles -= 1
-        elif (state, player_id) == GameMap.empty_tile and not self.is_empty(position):
+        elif tile == GameMap.empty_tile and cur_tile != GameMap.empty_tile:
             self.empty_tiles += 1
 
-        self.tiles[position.y][position.x] = (state, player_id)
+        state, player_id = tile
+        index = y * self.size + x
+        if cur_owner is not None:
+            self.owned_tiles[cur_owner].discard(index)
+            if cur_state == GameMap.PLANET:
+                self.owned_planets[cur_owner] -= 1
+        if player_id is not None:
+            self.owned_tiles.setdefault(player_id, set()).add(index)
+            if state == GameMap.PLANET:
+                self.owned_planets[player_id] = self.owned_planets.get(player_id, 0) + 1
+
+        self._store_tile(x, y, tile)
 
     def conquer_tile(self, position: Position, player_id: int) -> None:
         """
@@ -338,7 +388,7 @@ class GameMap:
             If the position is out of bound.
         """
         self.check_position(position)
-        return self.tiles[position.y][position.x][1]
+        return self._load_tile(position.x, position.y)[1]
 
     def clear_tile_owned_by(self, player_id: int) -> None:
         """
@@ -349,85 +399,130 @@ class GameMap:
         player_id : int
             The player id
         """
-        for y in range(len(self.tiles)):
-            for x in range(len(self.tiles)):
-                if self.get_owner(Position(x=x, y=y)) == player_id:
-                    self.clear_tile(position=Position(x=x, y=y))
+        # iterate on a copy, clear_tile removes the tiles from the owned tiles
+        for index in list(self.owned_tiles.get(player_id, ())):
+            self.clear_tile(position=Position(x=index % self.size, y=index // self.size))
 
     def count_tiles_owned_by(self, player_id: int) -> int:
-        conquered = 0
-        for y in range(len(self.tiles)):
-            for x in range(len(self.tiles)):
-                if self.get_owner(Position(x=x, y=y)) == player_id:
-                    conquered += 1
-        return conquered
+        """
+        Number of tiles (planets included) owned by the player_id, O(1)
+
+        Parameters
+        ----------
+        player_id : int
+            The player id
+        """
+        return len(self.owned_tiles.get(player_id, ()))
+
+    def count_planets_owned_by(self, player_id: int) -> int:
+        """
+        Number of planets owned by the player_id, O(1)
+
+        Parameters
+        ----------
+        player_id : int
+            The player id
+        """
+        return self.owned_planets.get(player_id, 0)
 
     def find_path(
         self, start: Position, goal: Position, player_id: Optional[int] = None
     ) -> Tuple[bool, List[Position]]:
-        init = start
+        """
+        Find the shortest path from start to goal avoiding asteroids
 
-        conquered_only = player_id is not None
-        init_state = self.tiles[init.y][init.x]
-        if conquered_only:
-            goal_state = self.tiles[goal.y][goal.x]
-            if goal_state[1] != player_id or init_state[1] != player_id:
-                raise Exception(f"Invalid initial or goal states: {init}, {goal}")
+        All moves have the same cost so a breadth first search on flat tile indices (y * size + x) is
+        enough, neighbours are visited up, left, down then right. The visited and parent buffers are
+        kept on the map and reused by the next search.
 
-        delta = [[-1, 0], [0, -1], [1, 0], [0, 1]]  # go up  # go left  # go down  # go right
-        cost = 1
+        Parameters
+        ----------
+        start : Position
+            The first position of the path
+        goal : Position
+            The last position of the path
+        player_id : int
+            When set, only walk on tiles conquered by this player
 
-        y_size = len(self.tiles)
-        x_size = len(self.tiles[0])
-        closed = [[0] * x_size for y in range(y_size)]
-        action = [[0] * x_size for y in range(y_size)]
+        Returns
+        -------
+        (found, path) where path contains start and goal when found, empty otherwise
+        """
+        size = self.size
+        init_state = self._load_tile(start.x, start.y)
+        if player_id is not None:
+            goal_state = self._load_tile(goal.x, goal.y)
+            if goal_state[1] != player_id or init_state[1] != player_id:
+                raise Exception(f"Invalid initial or goal states: {start}, {goal}")
+
+        walkable = self._walkable(player_id)
+        visited, parents, stamp = self._path_buffers()
 
-        open = [(0, init)]
-        found = False  # flag that is set when search complete
+        start_index = start.y * size + start.x
+        goal_index = goal.y * size + goal.x
+        last_row = size * size - size
+        visited[start_index] = stamp
 
+        open: Deque[int] = deque([start_index])
+        found = start_index == goal_index
         while not found and len(open) > 0:
-            # pick min from open
-            current = min(open, key=lambda v: v[0])
-
-            # expand
-            open.remove(current)
-            closed[current[1].y][current[1].x] = 1
-            g, pos = current
-
-            if pos.x == goal.x and pos.y == goal.y:
-                found = True
-            else:
-                for i in range(len(delta)):
-                    dir = delta[i]
-                    x2 = pos.x + dir[1]
-                    y2 = pos.y + dir[0]
-                    if (
-                        x2 >= 0
-                        and x2 < x_size
-                        and y2 >= 0
-                        and y2 < y_size
-                        and closed[y2][x2] == 0
-                        and self.tiles[y2][x2][0] != GameMap.ASTEROIDS
-                        and (not conquered_only or self.tiles[y2][x2][1] == init_state[1])
-                    ):
-                        open.append((cost + g, Position(x=x2, y=y2)))
-                        closed[y2][x2] = 1
-                        action[y2][x2] = i
+            index = open.popleft()
+            x = index % size
+            for neighbour in (
+                index - size if index >= size else -1,  # go up
+                index - 1 if x > 0 else -1,  # go left
+                index + size if index < last_row else -1,  # go down
+                index + 1 if x < size - 1 else -1,  # go right
+            ):
+                if neighbour >= 0 and visited[neighbour] != stamp and walkable(neighbour):
+                    visited[neighbour] = stamp
+                    parents[neighbour] = index
+                    if neighbour == goal_index:
+                        found = True
+                        break
+                    open.append(neighbour)
 
         invpath = []
         if found:
-            pos = goal
-            invpath.append(pos)
-            while pos != init:
-                x2 = pos.x - delta[action[pos.y][pos.x]][1]
-                y2 = pos.y - delta[action[pos.y][pos.x]][0]
-                pos = Position(x=x2, y=y2)
-                invpath.append(pos)
+            index = goal_index
+            invpath.append(goal)
+            while index != start_index:
+                index = parents[index]
+                invpath.append(Position(x=index % size, y=index // size))
 
             invpath.reverse()
 
         return (found, invpath)
 
+    def _walkable(self, player_id: Optional[int]) -> Callable[[int], bool]:
+        """
+        Check if find_path can walk on the tile at a flat index: everything but asteroids, or only the player_id tiles
+
+        The tiles are checked as the search reaches them, a short path only reads the tiles around it.
+        """
+        tiles = self.tiles
+        size = self.size
+        if player_id is None:
+            return lambda index: tiles[index // size][index % size][0] != GameMap.ASTEROIDS
+
+        def walkable(index: int) -> bool:
+            state, owner = tiles[index // size][index % size]
+            return state != GameMap.ASTEROIDS and owner == player_id
+
+        return walkable
+
+    def _path_buffers(self) -> Tuple[List[int], List[int], int]:
+        """
+        Visited and parent buffers for find_path, a tile is visited when it holds the returned stamp
+        """
+        nb_tiles = self.size * self.size
+        if len(self._path_visited) != nb_tiles:
+            self._path_visited = [0] * nb_tiles
+            self._path_parents = [0] * nb_tiles
+            self._path_stamp = 0
+        self._path_stamp += 1
+        return self._path_visited, self._path_parents, self._path_stamp
+
     def get_random_empty_position(self) -> Position:
         """
         Find a random starting position for a player
@@ -442,6 +537,6 @@ class GameMap:
         empty = []
         for x in range(1, self.size - 1):
             for y in range(1, self.size - 1):
-                if self.tiles[y][x] == GameMap.empty_tile:
+                if self._load_tile(x, y) == GameMap.empty_tile:
                     empty.append(Position(x, y))
         return empty
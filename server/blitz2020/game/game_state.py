@@ -1,15 +1,17 @@
 import copy
 import logging
+import math
 import random
-from typing import List, Optional, Set, Union, Dict
+from typing import Any, Callable, List, Optional, Set, Union, Dict, Tuple
 
 from blitz2020.game.action import Action
-from blitz2020.game.flood import flood
+from blitz2020.game.flood import enclosed_tiles
 from blitz2020.game.game_config import GameConfig
 from blitz2020.game.game_map import GameMap
 from blitz2020.game.player_state import PlayerState
 from blitz2020.game.player_stats import PlayerStats
 from blitz2020.game.position import Position
+from blitz2020.game.undo_journal import UndoJournal
 
 logger = logging.getLogger("GameState")
 
@@ -25,6 +27,9 @@ class GameState:
     relocate_black_hole = False
     relocate_blitzium = False
 
+    # cross-check the incremental scores with a full map scan on every update (slow, used by tests)
+    validate_incremental_scores = False
+
     def __init__(self, game_config: Union[GameConfig, GameMap], players: List[PlayerState] = None):
         self.logger = logger
 
@@ -42,6 +47,12 @@ class GameState:
         self.players = players
         self.game_tick = 0
 
+        # incremented by every game loop update, used to know when a serialized snapshot is outdated
+        self.version = 0
+
+        # records the changes to roll them back when set, see `start_journal`
+        self.journal: Optional[UndoJournal] = None
+
     def __deepcopy__(self, memodict: Dict) -> "GameState":
         gm = copy.deepcopy(self.game_map, memodict)
         obj = type(self)(gm)
@@ -68,8 +79,69 @@ class GameState:
 
         return player
 
+    def start_journal(self) -> UndoJournal:
+        """
+        Record the changes of the following actions and score updates to roll them back with `undo`
+
+        The tiles, the game tick and the positions, directions, tails, killed flags, scores and stats of the players
+        are restored. The history of the players, the random generator relocating the items and the version are
+        not, the version keeps increasing. The players must be added before starting the journal.
+        """
+        self.journal = UndoJournal()
+        self.game_map.journal = self.journal
+        return self.journal
+
+    def stop_journal(self) -> None:
+        self.journal = None
+        self.game_map.journal = None
+
+    def undo(self, mark: int = 0) -> None:
+        """
+        Roll back the changes recorded after mark (see `UndoJournal.mark`), every recorded change by default
+        """
+        if self.journal is None:
+            raise Exception("The changes are not recorded, see start_journal")
+        self.journal.rollback(mark)
+        self.version += 1
+
+    def record(self, undo: Callable[..., Any], *args: Any) -> None:
+        if self.journal is not None:
+            self.journal.record(undo, *args)
+
+    def record_position(self, player: PlayerState) -> None:
+        # the position and direction are changed in place by moves
+        if self.journal is not None:
+            self.journal.record(setattr, player, "position", player.position.copy())
+            self.journal.record(setattr, player, "direction", player.direction.copy())
+
+    def record_tail(self, player: PlayerState) -> None:
+        # the previous tail is not modified once replaced
+        if self.journal is not None:
+            self.journal.record(player.replace_tail, player.tail, player.tail_tiles)
+
+    def record_stats(self, player: PlayerState) -> None:
+        if self.journal is not None:
+            stats = player.stats
+            self.journal.record(
+                GameState.restore_stats,
+                stats,
+                stats.stats.copy(),
+                stats.kills.copy(),
+                stats.killed_by_players.copy(),
+            )
+
+    @staticmethod
+    def restore_stats(
+        stats: PlayerStats, values: Dict[str, Any], kills: Dict[str, int], killed_by_players: Dict[str, int]
+    ) -> None:
+        stats.stats = values
+        stats.kills = kills
+        stats.killed_by_players = killed_by_players
+
     def apply_action(self, game_tick: int, player: PlayerState, action: Optional[Action]) -> None:
+        self.record(setattr, self, "game_tick", self.game_tick)
         self.game_tick = game_tick
+        self.version += 1
         if player.killed:
             msg = f"Player '{player.name_str()}' was killed in the last turn, skip current action."
             self.logger.info(msg)
@@ -84,6 +156,7 @@ class GameState:
             # If you move outside the map or an asteroids; you die.
             if self.game_map.is_out_of_bound(player.position) or self.game_map.is_asteroids(player.position):
                 self.logger.info(f"Player '{player.name_str()}' stepped on an asteroids or outside the map.")
+                self.record_stats(player)
                 player.stats.add_stat(PlayerStats.SUICIDES)
                 player.add_history(game_tick, f"Committed suicide by going out of bound.")
                 self.kill_player(player)
@@ -108,7 +181,7 @@ class GameState:
                         for p in self.players:
                             # check if we conquered current position of a player
                             # if p.id != player.id and (p.position in new_conquers or p.tail[0] in new_conquers):
-                            if p.id != player.id and len(set(p.tail) & new_conquers) > 0:
+                            if p.id != player.id and p.is_tail_in(new_conquers):
                                 self.kill_player_by(p, player)
                             # check if we conquered the last owned tiles of a player
                             if (
@@ -119,12 +192,14 @@ class GameState:
                                 self.kill_player_by(p, player)
 
     def respawn_player(self, player: PlayerState) -> None:
+        self.version += 1
         # discard current action
         msg = f"Respawning player '{player.name_str()}'."
         self.logger.info(msg)
         player.add_history(self.game_tick, msg)
+        self.record(setattr, player, "killed", player.killed)
         player.killed = False
-        player.reset_position()
+        self.reset_player_position(player)
 
         # check if it kill another player
         poor_player = self.will_kill_player(player)
@@ -134,6 +209,8 @@ class GameState:
     def move_player(self, player: PlayerState, action: Action) -> None:
         prev_position = player.position.copy()
         prev_direction = player.direction.copy()
+        self.record(setattr, player, "position", prev_position)
+        self.record(setattr, player, "direction", prev_direction)
 
         player.direction.change_direction(action)
         player.position.move(player.direction)
@@ -151,17 +228,29 @@ class GameState:
             player.tail[-1], player.id
         ):
             self.logger.debug(f"Player '{player.name_str()}' appending position to tail.")
-            player.tail.append(player.position.copy())
+            self.record(player.pop_tail)
+            player.extend_tail(player.position.copy())
         else:
+            self.record_tail(player)
             player.tail = [player.position.copy()]
 
+    def reset_player_position(self, player: PlayerState) -> None:
+        self.record_position(player)
+        self.record_tail(player)
+        self.record_stats(player)
+        player.reset_position()
+
     def kill_player(self, poor_player: PlayerState) -> None:
         self.game_map.clear_tile_owned_by(poor_player.id)
-        poor_player.reset_position()
+        self.reset_player_position(poor_player)
+        self.record(setattr, poor_player, "killed", poor_player.killed)
         poor_player.killed = True
         poor_player.stats.set_stat(PlayerStats.CONQUERED, 0)
 
     def kill_player_by(self, poor_player: PlayerState, player: PlayerState) -> None:
+        self.record_stats(player)
+        self.record_stats(poor_player)
+        self.record(setattr, player, "score", player.score)
         if poor_player.id != player.id:
             self.logger.info(f"Player '{player.name_str()}' will kill player '{poor_player.name_str()}'.")
             player.score += GameState.SCORE_KILL_PLAYER
@@ -179,12 +268,7 @@ class GameState:
         # A player can kill itself if it walks on it's tail.
         for p in self.players:
             # Do not consider current player position when checking if walking on self tail
-            if p.id == player.id:
-                player_tail = p.tail[1:-1]
-            else:
-                player_tail = p.tail
-
-            if player.position in player_tail:
+            if p.is_on_tail(player.position, with_ends=p.id != player.id):
                 return p
         return None
 
@@ -204,80 +288,95 @@ class GameState:
         if closed_loop:
             # Conquer the closed shape made by the tail
             map_size = self.game_map.size
-            flooded_tiles = [[1] * map_size for _ in range(map_size)]
-
-            for p in player.tail:
-                flooded_tiles[p.y][p.x] = 0
-            for p in shortest_path_to_close_tail:
-                flooded_tiles[p.y][p.x] = 0
-
-            # flooding work by changing the value to 0 for every reachable tiles from the top left of the map (skipping bombs,
-            # walls and other players)  The remainder are the tiles that will be flooded. Using the closest path from start
-            # to end of the tail make sure that we are filling only the smallest zone  when wrap around and also make sure we
-            # do not re-kill any players walking inside our captured zone.
-            flood(flooded_tiles, target=1, replacement=0)
-
-            for y in range(map_size):
-                for x in range(map_size):
-                    if flooded_tiles[y][x] == 1:
-                        p = Position(x, y)
-
-                        # skip already conquered tiles or walls (asteroids)
-                        if not self.game_map.is_conquered_by(p, id) and not self.game_map.is_asteroids(p):
-                            if self.game_map.is_black_hole(p):
-                                # if we happen to surround a black hole, we die instantly
-                                self.stepped_on_a_black_hole(p, player)
-                                return set()
-
-            for y in range(map_size):
-                for x in range(map_size):
-                    if flooded_tiles[y][x] == 1:
-                        p = Position(x, y)
-
-                        # skip already conquered tiles or walls (asteroids)
-                        if not self.game_map.is_conquered_by(p, id) and not self.game_map.is_asteroids(p):
-                            if self.game_map.is_blitzium(p):
-                                # surrounding a coin (blitzium) will give us more points.
-                                self.check_if_captured_a_blitzium(p, player)
-
-                            # add tile to new conquered tiles for later scoring
-                            new_conquers.add(p)
-                            self.game_map.conquer_tile(p, id)
+            borders = [p.y * map_size + p.x for p in player.tail]
+            borders.extend(p.y * map_size + p.x for p in shortest_path_to_close_tail)
+
+            # flooding works by marking every reachable tiles from the top left of the map without crossing the tail
+            # and the path closing it. The remainder are the tiles that will be flooded. Using the closest path from
+            # start to end of the tail make sure that we are filling only the smallest zone when wrap around and also
+            # make sure we do not re-kill any players walking inside our captured zone.
+            captured = []
+            for index in enclosed_tiles(map_size, borders):
+                p = Position(index % map_size, index // map_size)
+                tile_state, tile_owner = self.game_map.get_tile(p)
+
+                # skip already conquered tiles or walls (asteroids)
+                if tile_owner != id and tile_state != GameMap.ASTEROIDS:
+                    if tile_state == GameMap.BLACK_HOLE:
+                        # if we happen to surround a black hole, we die instantly
+                        self.stepped_on_a_black_hole(p, player)
+                        return set()
+                    captured.append(p)
+
+            for p in captured:
+                if self.game_map.is_blitzium(p):
+                    # surrounding a coin (blitzium) will give us more points.
+                    self.check_if_captured_a_blitzium(p, player)
+
+                # add tile to new conquered tiles for later scoring
+                new_conquers.add(p)
+                self.game_map.conquer_tile(p, id)
 
         # capture the tail (no-op to recapture start and end tiles)
         for t in player.tail:
             self.game_map.conquer_tile(t, id)
+        self.record_tail(player)
         player.tail = [player.position.copy()]
 
         # adjust stats
         nb_conquers = len(new_conquers)
         self.logger.info(f"Player '{player.name_str()}' is capturing {nb_conquers} new tiles..")
+        self.record_stats(player)
+        self.record(setattr, player, "score", player.score)
         player.stats.set_stat(PlayerStats.CONQUERED, player.stats.stats[PlayerStats.CONQUERED] + nb_conquers)
         player.score += GameState.SCORE_NEW_CONQUERED * nb_conquers
         player.add_history(self.game_tick, f"Conquered {nb_conquers} new tiles.")
         return new_conquers
 
     def update_players_scores(self) -> None:
-        # tiles count may become out of sync because a player might conquer someone else territory
-        for player in self.players:
-            player.stats.set_stat(PlayerStats.CONQUERED, 0)
-            player.stats.set_stat(PlayerStats.PLANETS, 0)
+        self.version += 1
+        expected_scores = self.scan_players_scores() if GameState.validate_incremental_scores else None
 
+        # the game map counts conquered tiles and planets as they change owner, no need to scan it
+        for player in self.players:
+            conquered = self.game_map.count_tiles_owned_by(player.id)
+            planets = self.game_map.count_planets_owned_by(player.id)
+            self.record_stats(player)
+            self.record(setattr, player, "score", player.score)
+            player.stats.set_stat(PlayerStats.CONQUERED, conquered)
+            player.stats.set_stat(PlayerStats.PLANETS, planets)
+
+            prev_score = player.score
+            player.score += GameState.SCORE_CONQUERED_PLANET * planets
+            player.score += GameState.SCORE_CONQUERED * (conquered - planets)
+            player.score += len(player.tail) * GameState.SCORE_TAIL
+
+            if expected_scores is not None:
+                expected = expected_scores[player.id]
+                if (conquered, planets) != expected[:2] or not math.isclose(
+                    player.score - prev_score, expected[2], abs_tol=1e-9
+                ):
+                    raise Exception(
+                        f"Incremental score of player '{player.name_str()}' is out of sync: "
+                        f"{(conquered, planets, player.score - prev_score)} != {expected}"
+                    )
+
+    def scan_players_scores(self) -> Dict[int, Tuple[int, int, float]]:
+        """
+        Compute the conquered tiles, planets and score increment of every player by scanning the whole map
+        """
+        scores = {p.id: (0, 0, len(p.tail) * GameState.SCORE_TAIL) for p in self.players}
         for x in range(0, self.game_map.size):
             for y in range(0, self.game_map.size):
                 tile_state, player_id = self.game_map.get_tile(Position(x, y))
 
                 if player_id is not None:
+                    conquered, planets, score = scores[player_id]
                     if tile_state == GameMap.PLANET:
-                        self.players[player_id].score += GameState.SCORE_CONQUERED_PLANET
-                        self.players[player_id].stats.add_stat(PlayerStats.PLANETS)
+                        scores[player_id] = (conquered + 1, planets + 1, score + GameState.SCORE_CONQUERED_PLANET)
                     else:
-                        self.players[player_id].score += GameState.SCORE_CONQUERED
-
-                    self.players[player_id].stats.add_stat(PlayerStats.CONQUERED)
-
-        for p in self.players:
-            p.score += len(p.tail) * GameState.SCORE_TAIL
+                        scores[player_id] = (conquered + 1, planets, score + GameState.SCORE_CONQUERED)
+        return scores
 
     @classmethod
     def is_closed_tail(cls, player: PlayerState, game_map: GameMap) -> bool:
@@ -289,6 +388,7 @@ class GameState:
     def stepped_on_a_black_hole(self, pos: Position, player: PlayerState) -> bool:
         if self.game_map.is_black_hole(pos):
             self.logger.info(f"Player '{player.name_str()}' stepped on a black hole.")
+            self.record_stats(player)
             player.stats.add_stat(PlayerStats.SUICIDES)
             player.add_history(self.game_tick, f"Committed suicide by stepping on a black hole.")
             self.kill_player(player)
@@ -300,6 +400,8 @@ class GameState:
     def check_if_captured_a_blitzium(self, pos: Position, player: PlayerState) -> None:
         if self.game_map.is_blitzium(pos):
             self.logger.info(f"Player '{player.name_str()}' found a blitzium.")
+            self.record_stats(player)
+            self.record(setattr, player, "score", player.score)
             player.stats.add_stat(PlayerStats.BLITZIUMS)
             player.add_history(self.game_tick, "Found a blitzium.")
             player.score += GameState.SCORE_CAPTURED_BLITZIUM
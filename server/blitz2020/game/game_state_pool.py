@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from blitz2020.game.array_game_map import ArrayGameMap
+from blitz2020.game.game_state import GameState
+from blitz2020.game.player_stats import PlayerStats
+from blitz2020.game.position import Position
+
+
+class GameStatePool:
+    """
+    Preallocated storage for many snapshots of the states of a game, to explore a game tree without deep copies
+
+    A snapshot copies the map arrays and packs every player (position, direction, score, counted stats) in a
+    record of NumPy arrays, restoring it overwrites a game state of the same game in place. The tiles owned by each
+    player are rebuilt from the restored owners array. The tails share their positions with the saved state like a
+    deep copy, they are never modified. The names, spawn positions and history of the players are not part of the
+    snapshots, they are not needed to apply actions.
+
+    A search bot restores the snapshot of a node into a single working state, applies an action and saves the
+    result in a new slot, the slots of the dropped nodes are released for reuse.
+
+    Parameters
+    ----------
+    game_state : GameState
+        A state of the game, its map must be an ArrayGameMap (see `ArrayGameMap.from_game_map`)
+    capacity : int
+        The maximum number of snapshots
+    """
+
+    # the counted stats packed in the player records, -1 when the stat is not set
+    STATS = (
+        PlayerStats.KILLS,
+        PlayerStats.KILLED,
+        PlayerStats.SUICIDES,
+        PlayerStats.PLANETS,
+        PlayerStats.BLITZIUMS,
+        PlayerStats.CONQUERED,
+    )
+
+    player_dtype = np.dtype(
+        [
+            ("active", np.bool_),
+            ("killed", np.bool_),
+            ("score", np.float64),
+            ("x", np.int16),
+            ("y", np.int16),
+            ("direction", np.int8),
+            ("owned_planets", np.int32),
+        ]
+        + [(stat, np.int32) for stat in STATS]
+    )
+
+    def __init__(self, game_state: GameState, capacity: int) -> None:
+        game_map = GameStatePool.array_game_map(game_state)
+        size = game_map.size
+        nb_players = len(game_state.players)
+        self.capacity = capacity
+        self.nb_players = nb_players
+
+        self.kinds = np.zeros((capacity, size, size), dtype=np.uint8)
+        self.owners = np.zeros((capacity, size, size), dtype=np.int8)
+        self.game_ticks = np.zeros(capacity, dtype=np.int64)
+        self.empty_tiles = np.zeros(capacity, dtype=np.int64)
+        self.players = np.zeros((capacity, nb_players), dtype=GameStatePool.player_dtype)
+        # the tails and tail_tiles of the players
+        self.tails: List[List[Tuple[Tuple[Position, ...], Counter[Tuple[int, int]]]]] = [
+            [((), Counter())] * nb_players for _ in range(capacity)
+        ]
+        # kills, killed_by_players and nemesis of the players who killed or were killed (rare)
+        self.kills: List[List[Optional[Tuple[Dict[str, int], Dict[str, int], Optional[str]]]]] = [
+            [None] * nb_players for _ in range(capacity)
+        ]
+
+        self.free_slots = list(range(capacity - 1, -1, -1))
+
+    @staticmethod
+    def array_game_map(game_state: GameState) -> ArrayGameMap:
+        game_map = game_state.game_map
+        if not isinstance(game_map, ArrayGameMap):
+            raise Exception(f"The game map must be an ArrayGameMap, got {type(game_map).__name__}")
+        return game_map
+
+    @property
+    def nb_free_slots(self) -> int:
+        return len(self.free_slots)
+
+    def acquire(self) -> int:
+        if not self.free_slots:
+            raise Exception(f"The game state pool is full ({self.capacity} snapshots)")
+        return self.free_slots.pop()
+
+    def release(self, slot: int) -> None:
+        self.free_slots.append(slot)
+
+    def release_all(self) -> None:
+        self.free_slots = list(range(self.capacity - 1, -1, -1))
+
+    def save(self, game_state: GameState, slot: Optional[int] = None) -> int:
+        """
+        Save a snapshot of game_state in slot, a newly acquired slot by default, and return the slot
+        """
+        if slot is None:
+            slot = self.acquire()
+
+        game_map = GameStatePool.array_game_map(game_state)
+        self.kinds[slot] = game_map.kinds
+        self.owners[slot] = game_map.owners
+        self.game_ticks[slot] = game_state.game_tick
+        self.empty_tiles[slot] = game_map.empty_tiles
+
+        records = self.players[slot]
+        tails = self.tails[slot]
+        kills = self.kills[slot]
+        for index, player in enumerate(game_state.players):
+            tails[index] = (tuple(player.tail), player.tail_tiles.copy())
+
+            stats = player.stats
+            records[index] = (
+                player.active,
+                player.killed,
+                player.score,
+                player.position.x,
+                player.position.y,
+                player.direction.dir,
+                game_map.owned_planets.get(player.id, 0),
+                *[stats.stats.get(stat, -1) for stat in GameStatePool.STATS],
+            )
+            if stats.kills or stats.killed_by_players:
+                kills[index] = (
+                    stats.kills.copy(),
+                    stats.killed_by_players.copy(),
+                    stats.stats.get(PlayerStats.NEMESIS),
+                )
+            else:
+                kills[index] = None
+        return slot
+
+    def restore(self, slot: int, game_state: GameState) -> GameState:
+        """
+        Overwrite game_state, a state of the same game as the saved one, with the snapshot in slot
+
+        The version of game_state is incremented, the snapshot can be restored again.
+        """
+        game_map = GameStatePool.array_game_map(game_state)
+        np.copyto(game_map.kinds, self.kinds[slot])
+        np.copyto(game_map.owners, self.owners[slot])
+        game_map.invalidate_tiles()
+        game_map.empty_tiles = int(self.empty_tiles[slot])
+        game_state.game_tick = int(self.game_ticks[slot])
+        game_state.version += 1
+
+        owners = game_map.owners.ravel()
+        game_map.owned_tiles = {}
+        game_map.owned_planets = {}
+        tails = self.tails[slot]
+        kills = self.kills[slot]
+        for index, (record, player) in enumerate(zip(self.players[slot].tolist(), game_state.players)):
+            active, killed, score, x, y, direction, owned_planets, *stats = record
+            player.active = active
+            player.killed = killed
+            player.score = score
+            player.position.x = x
+            player.position.y = y
+            player.direction.dir = direction
+            player.restore_tail(*tails[index])
+            owned_tiles = np.flatnonzero(owners == player.id)
+            if len(owned_tiles) > 0:
+                game_map.owned_tiles[player.id] = set(owned_tiles.tolist())
+            game_map.owned_planets[player.id] = owned_planets
+
+            player.stats.stats = {stat: value for stat, value in zip(GameStatePool.STATS, stats) if value >= 0}
+            if kills[index] is None:
+                player.stats.kills = {}
+                player.stats.killed_by_players = {}
+            else:
+                player_kills, killed_by_players, nemesis = kills[index]
+                player.stats.kills = player_kills.copy()
+                player.stats.killed_by_players = killed_by_players.copy()
+                if nemesis is not None:
+                    player.stats.stats[PlayerStats.NEMESIS] = nemesis
+        return game_state
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from collections import deque
+from collections import Counter, deque
 from datetime import datetime
-from typing import Optional, Deque, List, Dict
+from typing import Optional, Deque, List, Dict, Sequence, Set, Tuple
 
 from blitz2020.game.game_map import GameMap
 from blitz2020.game.player_stats import PlayerStats
@@ -43,6 +43,7 @@ class PlayerState:
         self.stats: PlayerStats = PlayerStats()
         self.max_ticks_in_history = 10
         self.history: Deque[HistoryItem] = deque()
+        self.nb_history_items = 0  # the number of items ever added to the history, old items are dropped
 
         self.spawn_position: Position = position or self.game_map.get_random_empty_position()
         self.position: Optional[Position] = None
@@ -69,6 +70,78 @@ class PlayerState:
         obj.max_ticks_in_history = 0
         return obj
 
+    @property
+    def tail(self) -> List[Position]:
+        """
+        The positions walked since leaving the conquered territory.
+
+        The list must only change through `extend_tail`, `pop_tail`, `replace_tail`, `restore_tail` or by assigning
+        a new list: mutating it in place (append, clear, ...) desyncs `tail_tiles` and the collision checks.
+        """
+        return self._tail
+
+    @tail.setter
+    def tail(self, tail: List[Position]) -> None:
+        self._tail = tail
+        # (x, y) -> number of times the position is in the tail
+        self.tail_tiles: Counter[Tuple[int, int]] = Counter((t.x, t.y) for t in tail)
+
+    def extend_tail(self, position: Position) -> None:
+        """
+        Append position to the tail while keeping the tail index in sync
+        """
+        self._tail.append(position)
+        self.tail_tiles[(position.x, position.y)] += 1
+
+    def pop_tail(self) -> Position:
+        """
+        Remove the last position of the tail, the reverse of `extend_tail`
+        """
+        position = self._tail.pop()
+        key = (position.x, position.y)
+        self.tail_tiles[key] -= 1
+        if self.tail_tiles[key] == 0:
+            del self.tail_tiles[key]
+        return position
+
+    def replace_tail(self, tail: List[Position], tail_tiles: Counter[Tuple[int, int]]) -> None:
+        """
+        Set the tail and its tail_tiles as is, they must be in sync (used to undo a tail change)
+        """
+        self._tail = tail
+        self.tail_tiles = tail_tiles
+
+    def restore_tail(self, tail: Sequence[Position], tail_tiles: Counter[Tuple[int, int]]) -> None:
+        """
+        Replace the tail by a copy of a saved tail and of its tail_tiles, without counting the tail again
+        """
+        self._tail = list(tail)
+        self.tail_tiles = tail_tiles.copy()
+
+    def is_on_tail(self, position: Position, with_ends: bool = True) -> bool:
+        """
+        Check if position is part of the tail in O(1)
+
+        Parameters
+        ----------
+        position : Position
+            The position to look for
+        with_ends : bool
+            When False, the first and last tiles of the tail are ignored (same as looking into tail[1:-1])
+        """
+        count = self.tail_tiles.get((position.x, position.y), 0)
+        if not with_ends and count > 0:
+            count -= (self._tail[0] == position) + (self._tail[-1] == position)
+        return count > 0
+
+    def is_tail_in(self, positions: Set[Position]) -> bool:
+        """
+        Check if any tile of the tail is in positions, walking the smallest of the two collections
+        """
+        if len(self._tail) <= len(positions):
+            return any(t in positions for t in self._tail)
+        return any(self.is_on_tail(p) for p in positions)
+
     def name_str(self) -> str:
         return f"{self.name}-{self.id}"
 
@@ -90,6 +163,7 @@ class PlayerState:
     def add_history(self, game_tick: int, message: str) -> None:
         if self.max_ticks_in_history > 0:
             self.history.appendleft(HistoryItem(game_tick, message))
+            self.nb_history_items += 1
             game_tick_cutoff = game_tick - self.max_ticks_in_history
             while self.history[-1].tick < game_tick_cutoff:
                 self.history.pop()
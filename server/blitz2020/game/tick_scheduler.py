@@ -0,0 +1,54 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+
+class TickScheduler:
+    """
+    Pace the game ticks at a fixed cadence without blocking the event loop
+
+    The time spent in a tick is subtracted from the wait, a late tick starts the next one right away without
+    trying to catch up on the missed ticks.
+
+    Parameters
+    ----------
+    period : int
+        The tick period in milliseconds, 0 to run the ticks as fast as possible
+    clock : Callable[[], float]
+        The current time in seconds, the time of the running event loop by default
+    sleep : Callable[[float], Awaitable]
+        Wait for a number of seconds, asyncio.sleep by default
+    """
+
+    def __init__(
+        self,
+        period: int,
+        clock: Optional[Callable[[], float]] = None,
+        sleep: Callable[[float], Awaitable] = asyncio.sleep,
+    ) -> None:
+        self.period = period / 1000
+        self.clock = clock
+        self.sleep = sleep
+        self.next_tick_time: Optional[float] = None
+        self.nb_late_ticks = 0
+
+    def time(self) -> float:
+        if self.clock is not None:
+            return self.clock()
+        return asyncio.get_running_loop().time()
+
+    def start(self) -> None:
+        self.next_tick_time = self.time() + self.period
+
+    async def wait_next_tick(self) -> None:
+        if self.period <= 0:
+            return
+        if self.next_tick_time is None:
+            self.start()
+
+        now = self.time()
+        if now < self.next_tick_time:
+            await self.sleep(self.next_tick_time - now)
+            self.next_tick_time += self.period
+        else:
+            self.nb_late_ticks += 1
+            self.next_tick_time = now + self.period
@@ -0,0 +1,38 @@
+from typing import Any, Callable, List, Tuple
+
+
+class UndoJournal:
+    """
+    The changes made to a game state, recorded as the calls undoing them
+
+    Every change records a function and its arguments restoring the previous value (a tile, an attribute, a stats
+    dict, ...) before being made. Rolling back calls them in reverse order, in O(number of changes) instead of
+    copying the whole state. See `GameState.start_journal`.
+    """
+
+    def __init__(self) -> None:
+        self.entries: List[Tuple[Callable[..., Any], Tuple]] = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def record(self, undo: Callable[..., Any], *args: Any) -> None:
+        self.entries.append((undo, args))
+
+    def mark(self) -> int:
+        """
+        The current position in the journal, to roll back the changes made after it
+        """
+        return len(self.entries)
+
+    def rollback(self, mark: int = 0) -> None:
+        entries = self.entries
+        while len(entries) > mark:
+            undo, args = entries.pop()
+            undo(*args)
+
+    def clear(self) -> None:
+        """
+        Forget the recorded changes, they can no longer be rolled back
+        """
+        self.entries.clear()
@@ -1,7 +1,10 @@
+import os
 import random
 from collections import deque
+from typing import Dict, Optional, Tuple
 
 import numpy as np
+from numpy.typing import DTypeLike
 
 
 class ReplayMemory:
@@ -22,3 +25,226 @@ class ReplayMemory:
             sampledTraces.append(episode[point : point + trace_length])
         sampledTraces = np.array(sampledTraces)
         return sampledTraces
+
+
+class SumTree:
+    """
+    A binary tree whose nodes are the sum of their children, to sample leaves proportionally to their value
+
+    The leaves are padded to a power of two and stored after the inner nodes, node i has the children 2i and 2i+1
+    and the root is node 1. Updates and lookups are vectorized over many leaves, one NumPy operation per level.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.nb_leaves = 1 << max(0, capacity - 1).bit_length()
+        self.depth = self.nb_leaves.bit_length() - 1
+        self.tree = np.zeros(2 * self.nb_leaves, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def get(self, indices: np.ndarray) -> np.ndarray:
+        values: np.ndarray = self.tree[self.nb_leaves + np.asarray(indices)]
+        return values
+
+    def update(self, indices: np.ndarray, values: np.ndarray) -> None:
+        nodes = self.nb_leaves + np.asarray(indices)
+        self.tree[nodes] = values
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """
+        The leaves where the prefix sums of the leaves reach values, values are in [0, total)
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.intp)
+        for _ in range(self.depth):
+            left = self.tree[2 * nodes]
+            # rounding errors must not lead to an empty subtree
+            right = (values >= left) & (self.tree[2 * nodes + 1] > 0)
+            values -= np.where(right, left, 0)
+            nodes = 2 * nodes + right
+        return np.minimum(nodes - self.nb_leaves, self.capacity - 1)
+
+
+class RingReplayMemory:
+    """
+    A fixed capacity replay memory of transitions stored in contiguous preallocated arrays
+
+    A transition is the frame seen by the agent, its action, its reward and if the episode is done after it.
+    The oldest transitions are overwritten once the memory is full. `sample` returns traces of consecutive
+    transitions of the same episode, like `ReplayMemory.sample`, gathered with a few NumPy operations.
+
+    Parameters
+    ----------
+    capacity : int
+        The maximum number of transitions
+    frame_shape : Tuple[int, ...]
+        The shape of a frame, (size, size) for game_state_to_frame
+    prioritized : bool
+        Sample the traces proportionally to the priority of their first transition (see `update_priorities`)
+        instead of uniformly, the new transitions get the highest priority seen so far
+    alpha : float
+        How much the priorities are used when prioritized, 0 is uniform sampling
+    path : str
+        Store the arrays in .npy files memory-mapped from this directory instead of memory, to hold more
+        transitions than the RAM allows
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        frame_shape: Tuple[int, ...],
+        frame_dtype: DTypeLike = np.float32,
+        prioritized: bool = False,
+        alpha: float = 0.6,
+        path: Optional[str] = None,
+    ) -> None:
+        if capacity <= 0:
+            raise Exception(f"Invalid capacity: {capacity}")
+
+        self.capacity = capacity
+        self.path = path
+        self.frames = self.allocate("frames", (capacity, *frame_shape), frame_dtype)
+        self.actions = self.allocate("actions", (capacity,), np.int64)
+        self.rewards = self.allocate("rewards", (capacity,), np.float32)
+        self.dones = self.allocate("dones", (capacity,), np.bool_)
+
+        self.position = 0  # the index of the next transition
+        self.size = 0
+
+        self.alpha = alpha
+        self.max_priority = 1.0
+        self.priorities: Optional[SumTree] = SumTree(capacity) if prioritized else None
+
+    def allocate(self, name: str, shape: Tuple[int, ...], dtype: DTypeLike) -> np.ndarray:
+        if self.path is None:
+            return np.zeros(shape, dtype=dtype)
+        os.makedirs(self.path, exist_ok=True)
+        return np.lib.format.open_memmap(os.path.join(self.path, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, frame: np.ndarray, action: int, reward: float, done: bool) -> None:
+        index = self.position
+        self.frames[index] = frame
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.dones[index] = done
+
+        if self.priorities is not None:
+            self.priorities.update(np.array([index]), np.array([self.max_priority ** self.alpha]))
+
+        self.position = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, frames: np.ndarray, actions: np.ndarray, rewards: np.ndarray, dones: np.ndarray) -> None:
+        """
+        Add the transitions of a batch, in order, e.g. the ones of a VecEnv step for a single game
+        """
+        nb_transitions = len(frames)
+        # only the last transitions fit when the batch is bigger than the memory
+        first = max(0, nb_transitions - self.capacity)
+        indices = (self.position + first + np.arange(nb_transitions - first)) % self.capacity
+
+        self.frames[indices] = frames[first:]
+        self.actions[indices] = actions[first:]
+        self.rewards[indices] = rewards[first:]
+        self.dones[indices] = dones[first:]
+
+        if self.priorities is not None:
+            self.priorities.update(indices, np.full(len(indices), self.max_priority ** self.alpha))
+
+        self.position = (self.position + nb_transitions) % self.capacity
+        self.size = min(self.size + nb_transitions, self.capacity)
+
+    def valid_traces(self, starts: np.ndarray, trace_length: int) -> np.ndarray:
+        """
+        If the traces starting at starts only have stored transitions of a single episode
+
+        The next frame of the last transition must be stored too, it is the first frame of the following
+        episode when the episode is done.
+        """
+        oldest = (self.position - self.size) % self.capacity
+        valid = (starts - oldest) % self.capacity + trace_length < self.size
+        # a done transition can only end a trace
+        inner = (starts[:, np.newaxis] + np.arange(trace_length - 1)) % self.capacity
+        return valid & ~self.dones[inner].any(axis=1)
+
+    def sample_starts(self, batch_size: int) -> np.ndarray:
+        if self.priorities is None:
+            oldest = (self.position - self.size) % self.capacity
+            return (oldest + np.random.randint(0, self.size, batch_size)) % self.capacity
+        return self.priorities.find(np.random.uniform(0, self.priorities.total, batch_size))
+
+    def sample(
+        self, batch_size: int, trace_length: int = 1, beta: float = 0.4, max_nb_tries: int = 100
+    ) -> Dict[str, np.ndarray]:
+        """
+        Sample batch_size traces of trace_length consecutive transitions of the same episode
+
+        The invalid traces (crossing an episode end or the newest transition) are sampled again, at most
+        max_nb_tries times.
+
+        Returns
+        -------
+        A dict of arrays of batch_size x trace_length transitions:
+        "frames", "actions", "rewards", "next_frames" and "dones", the "indices" of the first transitions of the
+        traces to update their priorities and their importance sampling "weights", all 1 when not prioritized
+        (weights are normalized by their max and corrected by beta).
+        """
+        if self.size <= trace_length:
+            raise Exception(f"Not enough transitions to sample traces of length {trace_length}: {self.size}")
+
+        starts = self.sample_starts(batch_size)
+        invalid = ~self.valid_traces(starts, trace_length)
+        nb_tries = 1
+        while invalid.any():
+            if nb_tries >= max_nb_tries:
+                raise Exception(f"No valid trace of length {trace_length} found in {max_nb_tries} tries")
+            starts[invalid] = self.sample_starts(int(np.count_nonzero(invalid)))
+            invalid[invalid] = ~self.valid_traces(starts[invalid], trace_length)
+            nb_tries += 1
+
+        indices = (starts[:, np.newaxis] + np.arange(trace_length)) % self.capacity
+        weights: np.ndarray
+        if self.priorities is None:
+            weights = np.ones(batch_size, dtype=np.float32)
+        else:
+            probabilities = self.priorities.get(starts) / self.priorities.total
+            weights = (self.size * probabilities) ** -beta
+            weights = (weights / weights.max()).astype(np.float32)
+
+        return {
+            "frames": self.frames[indices],
+            "actions": self.actions[indices],
+            "rewards": self.rewards[indices],
+            "next_frames": self.frames[(indices + 1) % self.capacity],
+            "dones": self.dones[indices],
+            "indices": starts,
+            "weights": weights,
+        }
+
+    def update_priorities(self, indices: np.ndarray, priorities: np.ndarray) -> None:
+        """
+        Set the priorities of the traces starting at indices, typically their absolute TD errors
+        """
+        if self.priorities is None:
+            raise Exception("The replay memory is not prioritized")
+
+        priorities = np.maximum(np.asarray(priorities, dtype=np.float64), 1e-6)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.priorities.update(indices, priorities ** self.alpha)
+
+    def flush(self) -> None:
+        """
+        Write the memory-mapped arrays to their files
+        """
+        for array in (self.frames, self.actions, self.rewards, self.dones):
+            if isinstance(array, np.memmap):
+                array.flush()
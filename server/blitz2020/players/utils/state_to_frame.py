@@ -1,9 +1,11 @@
+from typing import List, Optional, Sequence, Tuple
+
 import numpy as np
+from numpy.typing import DTypeLike
 
-from blitz2020.game.game_map import GameMap
+from blitz2020.game.array_game_map import ArrayGameMap
 from blitz2020.game.game_state import GameState
 from blitz2020.game.player_state import PlayerState
-from blitz2020.game.position import Position
 
 """
   Map a game state to a frame
@@ -38,34 +40,139 @@ def payer_state_to_frame(player_state: PlayerState, frame, head: float, tail: fl
     frame[player_state.position.y, player_state.position.x] = head
 
 
-def game_state_to_frame(player_id: int, state: GameState) -> np.array:
-    size = state.game_map.size
-    frame = np.zeros((size, size))
+# frame value of every ArrayGameMap tile kind, owned tiles are overwritten
+KIND_VALUES = np.zeros(len(ArrayGameMap.kind_states))
+KIND_VALUES[ArrayGameMap.ASTEROIDS_KIND] = ASTEROIDS_BH
+KIND_VALUES[ArrayGameMap.BLACK_HOLE_KIND] = ASTEROIDS_BH
+KIND_VALUES[ArrayGameMap.BLITZIUM_KIND] = BLITZIUM
+KIND_VALUES[ArrayGameMap.PLANET_KIND] = PLANETS
 
-    for y in range(size):
-        for x in range(size):
-            tile_state, tile_owner = state.game_map.get_tile(Position(x, y))
+"""
+  One-hot frames: one channel per feature, a tile can be in several channels (the head is part of the tail)
+"""
 
-            value = EMPTY
-            if tile_state == GameMap.ASTEROIDS or tile_state == GameMap.BLACK_HOLE:
-                value = ASTEROIDS_BH
-            elif tile_state == GameMap.BLITZIUM:
-                value = BLITZIUM
-            elif tile_state == GameMap.PLANET and tile_owner != player_id:
-                value = PLANETS
+ONE_HOT_ASTEROIDS = 0
+ONE_HOT_BLACK_HOLE = 1
+ONE_HOT_BLITZIUM = 2
+ONE_HOT_PLANET = 3
+ONE_HOT_CAPTURED_BY_PLAYER = 4
+ONE_HOT_CAPTURED_BY_OTHERS = 5
+ONE_HOT_PLAYER_HEAD = 6
+ONE_HOT_PLAYER_TAIL = 7
+ONE_HOT_OTHERS_HEAD = 8
+ONE_HOT_OTHERS_TAIL = 9
+ONE_HOT_NB_CHANNELS = 10
 
-            if tile_owner is not None:
-                if tile_owner == player_id:
-                    value = CAPTURED_BY_PLAYER
-                else:
-                    value = CAPTURED_BY_OTHERS
 
-            frame[y, x] = value
+def players_tiles(state: GameState) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The tail and head tiles of the players, in painting order: the tail then the head of every player
 
+    Returns
+    -------
+    The flat tile indices (y * size + x), the id of the player on the tile and if the tile is the head
+    """
+    size = state.game_map.size
+    tiles: List[int] = []
+    players: List[int] = []
+    heads: List[bool] = []
     for p in state.players:
-        if p.id == player_id:
-            payer_state_to_frame(p, frame, head=PLAYER_HEAD, tail=PLAYER_TAIL)
-        else:
-            payer_state_to_frame(p, frame, head=OTHERS_HEAD, tail=OTHERS_TAIL)
+        tail = [y * size + x for x, y in p.tail_tiles]
+        tiles += tail
+        tiles.append(p.position.y * size + p.position.x)
+        players += [p.id] * (len(tail) + 1)
+        heads += [False] * len(tail)
+        heads.append(True)
+    return np.array(tiles, dtype=np.intp), np.array(players, dtype=np.intp), np.array(heads, dtype=bool)
+
+
+def frame_player_ids(state: GameState, player_ids: Optional[Sequence[int]]) -> np.ndarray:
+    if player_ids is None:
+        player_ids = [p.id for p in state.players]
+    return np.array(player_ids, dtype=np.intp)
+
+
+def game_state_to_frames(state: GameState, player_ids: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    The frames of many players in a single pass
+
+    Parameters
+    ----------
+    player_ids : Sequence[int]
+        The players seeing the frames, every player of the state by default
+
+    Returns
+    -------
+    A (len(player_ids), size, size) array, frame i is game_state_to_frame(player_ids[i], state)
+    """
+    size = state.game_map.size
+    kinds, owners = ArrayGameMap.tile_arrays(state.game_map)
+    ids = frame_player_ids(state, player_ids)
+
+    base = KIND_VALUES[kinds].ravel()
+    owners = owners.ravel()
+    base[owners != ArrayGameMap.NO_OWNER] = CAPTURED_BY_OTHERS
+    frames = np.repeat(base[np.newaxis], len(ids), axis=0)
+    frames[owners[np.newaxis] == ids[:, np.newaxis]] = CAPTURED_BY_PLAYER
+
+    # a tile painted several times keeps the value of the last player painting it
+    tiles, players, heads = players_tiles(state)
+    last = len(tiles) - 1 - np.unique(tiles[::-1], return_index=True)[1]
+    tiles, players, heads = tiles[last], players[last], heads[last]
+
+    frames[:, tiles] = np.where(
+        players[np.newaxis] == ids[:, np.newaxis],
+        np.where(heads, PLAYER_HEAD, PLAYER_TAIL),
+        np.where(heads, OTHERS_HEAD, OTHERS_TAIL),
+    )
+    return frames.reshape(len(ids), size, size)
+
+
+def game_state_to_frame(player_id: int, state: GameState) -> np.ndarray:
+    frame: np.ndarray = game_state_to_frames(state, [player_id])[0]
+    return frame
+
+
+def game_state_to_one_hot_frames(
+    state: GameState, player_ids: Optional[Sequence[int]] = None, dtype: DTypeLike = np.float32
+) -> np.ndarray:
+    """
+    The one-hot frames of many players in a single pass
+
+    Parameters
+    ----------
+    player_ids : Sequence[int]
+        The players seeing the frames, every player of the state by default
+
+    Returns
+    -------
+    A (len(player_ids), ONE_HOT_NB_CHANNELS, size, size) array
+    """
+    size = state.game_map.size
+    kinds, owners = ArrayGameMap.tile_arrays(state.game_map)
+    ids = frame_player_ids(state, player_ids)
+
+    frames = np.zeros((len(ids), ONE_HOT_NB_CHANNELS, size * size), dtype=dtype)
+    kinds = kinds.ravel()
+    owners = owners.ravel()
+    frames[:, ONE_HOT_ASTEROIDS] = kinds == ArrayGameMap.ASTEROIDS_KIND
+    frames[:, ONE_HOT_BLACK_HOLE] = kinds == ArrayGameMap.BLACK_HOLE_KIND
+    frames[:, ONE_HOT_BLITZIUM] = kinds == ArrayGameMap.BLITZIUM_KIND
+    frames[:, ONE_HOT_PLANET] = kinds == ArrayGameMap.PLANET_KIND
+    is_owner = owners[np.newaxis] == ids[:, np.newaxis]
+    frames[:, ONE_HOT_CAPTURED_BY_PLAYER] = is_owner
+    frames[:, ONE_HOT_CAPTURED_BY_OTHERS] = (owners != ArrayGameMap.NO_OWNER) & ~is_owner
+
+    tiles, players, heads = players_tiles(state)
+    for index, player_id in enumerate(ids):
+        mine = players == player_id
+        frames[index, ONE_HOT_PLAYER_TAIL, tiles[mine & ~heads]] = 1
+        frames[index, ONE_HOT_PLAYER_HEAD, tiles[mine & heads]] = 1
+        frames[index, ONE_HOT_OTHERS_TAIL, tiles[~mine & ~heads]] = 1
+        frames[index, ONE_HOT_OTHERS_HEAD, tiles[~mine & heads]] = 1
+    return frames.reshape(len(ids), ONE_HOT_NB_CHANNELS, size, size)
+
 
+def game_state_to_one_hot_frame(player_id: int, state: GameState, dtype: DTypeLike = np.float32) -> np.ndarray:
+    frame: np.ndarray = game_state_to_one_hot_frames(state, [player_id], dtype)[0]
     return frame
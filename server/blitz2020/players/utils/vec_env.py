@@ -0,0 +1,192 @@
+import multiprocessing
+import random
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from blitz2020.game.action import Action
+from blitz2020.game.array_game_map import ArrayGameMap
+from blitz2020.game.game import Game
+from blitz2020.game.game_config import GameConfig
+from blitz2020.game.game_state import GameState
+from blitz2020.players.utils.state_to_frame import game_state_to_frames
+
+"""
+  Step many games in lockstep for reinforcement learning
+
+  Every player of every game is controlled by the batched actions (indices in ACTIONS), the observation of a
+  player is its game_state_to_frame and its reward is its score gain during the step.
+"""
+
+ACTIONS = list(Action)
+
+
+class GameEnv:
+    """
+    A single game stepped synchronously, the same rules as Game.game_loop without asyncio nor players
+
+    Parameters
+    ----------
+    maps : List[str]
+        The game presets (content of the files), a new episode uses the next one
+    nb_players : int
+        The number of players, every map needs as many spawn positions
+    """
+
+    def __init__(self, maps: List[str], nb_players: int, max_nb_ticks: int = 1000, first_map: int = 0) -> None:
+        self.maps = maps
+        self.nb_players = nb_players
+        self.max_nb_ticks = max_nb_ticks
+        self.nb_episodes = first_map
+        self.game_state: Optional[GameState] = None
+        self.game_tick = 0
+        self.max_game_ticks = 0
+
+    def reset(self) -> np.ndarray:
+        # array maps: the observations are built with a few NumPy operations
+        game_config = GameConfig.from_str(self.maps[self.nb_episodes % len(self.maps)], ArrayGameMap)
+        self.nb_episodes += 1
+
+        self.game_state = GameState(game_config)
+        for player in range(self.nb_players):
+            self.game_state.add_player(f"player-{player}")
+        self.game_tick = 0
+        self.max_game_ticks = Game.get_max_nb_ticks(self.game_state, self.max_nb_ticks)
+        return self.observe()
+
+    def observe(self) -> np.ndarray:
+        return game_state_to_frames(self.game_state)
+
+    def scores(self) -> np.ndarray:
+        return np.array([player.score for player in self.game_state.players])
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, bool, Dict[str, Any]]:
+        """
+        Apply the action of every player and return the observations, the rewards, if the game is done and info
+
+        A done game is reset, the observations are then the first of the next game and info has the final
+        "scores" and the "observations" of the last tick.
+        """
+        self.game_tick += 1
+        scores = self.scores()
+
+        for player, action in zip(self.game_state.players, actions):
+            self.game_state.apply_action(self.game_tick, player, None if player.killed else ACTIONS[action])
+        self.game_state.update_players_scores()
+
+        final_scores = self.scores()
+        rewards = final_scores - scores
+        if self.game_tick < self.max_game_ticks:
+            return self.observe(), rewards, False, {}
+
+        info = {"scores": final_scores, "observations": self.observe(), "nb_ticks": self.game_tick}
+        return self.reset(), rewards, True, info
+
+
+def run_env_worker(connection: Connection, envs: List[GameEnv], seed: int) -> None:
+    """
+    Run the commands of a VecEnv on envs until it is closed
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+
+    while True:
+        command, data = connection.recv()
+        if command == "step":
+            connection.send([env.step(actions) for env, actions in zip(envs, data)])
+        elif command == "reset":
+            connection.send([env.reset() for env in envs])
+        elif command == "close":
+            connection.close()
+            break
+
+
+class VecEnv:
+    """
+    Step nb_envs independent games in lockstep with batched actions
+
+    Observations are (nb_envs, nb_players, size, size) frames, rewards are (nb_envs, nb_players) and actions are
+    (nb_envs, nb_players) indices in ACTIONS. Games are reset as soon as they are done, see `GameEnv.step`.
+
+    Parameters
+    ----------
+    maps : List[str]
+        The game presets (content of the files), all of the same size
+    nb_processes : int
+        Run the games in this number of worker processes, 0 to run them in this process
+    seed : int
+        Seed of the random generators of the process running the games, incremented for every worker
+    """
+
+    def __init__(
+        self,
+        maps: List[str],
+        nb_envs: int,
+        nb_players: int = 1,
+        max_nb_ticks: int = 1000,
+        nb_processes: int = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        sizes = {GameConfig.from_str(game_map).game_map.size for game_map in maps}
+        if len(sizes) != 1:
+            raise Exception(f"All the maps must have the same size, got {sorted(sizes)}")
+
+        self.nb_envs = nb_envs
+        self.nb_players = nb_players
+        envs = [GameEnv(maps, nb_players, max_nb_ticks, first_map=env) for env in range(nb_envs)]
+
+        self.envs: List[GameEnv] = []
+        self.connections: List[Connection] = []
+        self.processes: List[multiprocessing.process.BaseProcess] = []
+        self.chunks: List[slice] = []
+        if nb_processes <= 0:
+            if seed is not None:
+                random.seed(seed)
+                np.random.seed(seed)
+            self.envs = envs
+        else:
+            nb_processes = min(nb_processes, nb_envs)
+            bounds = np.linspace(0, nb_envs, nb_processes + 1).astype(int).tolist()
+            for worker in range(nb_processes):
+                chunk = slice(bounds[worker], bounds[worker + 1])
+                connection, worker_connection = multiprocessing.Pipe()
+                worker_seed = random.randrange(2 ** 32) if seed is None else seed + worker
+                process = multiprocessing.Process(
+                    target=run_env_worker, args=(worker_connection, envs[chunk], worker_seed), daemon=True
+                )
+                process.start()
+                worker_connection.close()
+
+                self.chunks.append(chunk)
+                self.connections.append(connection)
+                self.processes.append(process)
+
+    def run(self, command: str, data: Optional[np.ndarray] = None) -> List[Any]:
+        """
+        Run a command on every env, in the worker processes when there are some
+        """
+        if not self.connections:
+            if command == "step":
+                return [env.step(actions) for env, actions in zip(self.envs, data)]
+            return [env.reset() for env in self.envs]
+
+        for connection, chunk in zip(self.connections, self.chunks):
+            connection.send((command, None if data is None else data[chunk]))
+        return [result for connection in self.connections for result in connection.recv()]
+
+    def reset(self) -> np.ndarray:
+        return np.stack(self.run("reset"))
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        actions = np.asarray(actions).reshape(self.nb_envs, self.nb_players)
+        observations, rewards, dones, infos = zip(*self.run("step", actions))
+        return np.stack(observations), np.stack(rewards), np.array(dones), list(infos)
+
+    def close(self) -> None:
+        for connection in self.connections:
+            connection.send(("close", None))
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
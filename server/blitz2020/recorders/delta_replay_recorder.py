@@ -0,0 +1,217 @@
+import bisect
+import json
+import logging
+from typing import Dict, IO, Iterator, List, Optional
+
+from blitz2020.game.game import Game
+from blitz2020.game.game_state import GameState
+from blitz2020.recorders.tick_recorder import TickRecorder
+from blitz2020.servers.socket.utils import (
+    apply_tick_delta,
+    generate_pretty_map_from_tick,
+    tick_delta,
+    tick_snapshot,
+    to_json,
+)
+
+
+class DeltaReplayWriter:
+    """
+    Write a delta compressed replay, one json document per line
+
+    A full tick (keyframe) is written every `keyframe_interval` ticks, the other ticks are deltas from the
+    previous tick (see `tick_delta`). The pretty map is only in the keyframes, the reader generates it back
+    for the other ticks. The last line is a footer with the players, the winner and the byte offset of every
+    keyframe, used by DeltaReplayReader to seek to any tick.
+
+    Parameters
+    ----------
+    record_path : str
+        The replay file
+    keyframe_interval : int
+        Number of ticks between two keyframes
+    """
+
+    DEFAULT_KEYFRAME_INTERVAL = 50
+
+    def __init__(self, record_path: str, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL) -> None:
+        self.record_path = record_path
+        self.keyframe_interval = keyframe_interval
+        self.file: Optional[IO[bytes]] = None
+        self.offset = 0
+        self.previous: Optional[Dict] = None
+        self.nb_ticks = 0
+        self.keyframes: List[List[int]] = []  # [tick, offset]
+        self.with_pretty_map = False
+
+    def write_tick(self, tick: Dict) -> None:
+        if self.nb_ticks % self.keyframe_interval == 0:
+            self.keyframes.append([tick["game"]["tick"], self.offset])
+            self.with_pretty_map = "pretty_map" in tick["game"]
+            self.write_line(tick)
+        else:
+            delta = tick_delta(self.previous, tick)
+            delta["game"].pop("pretty_map", None)
+            self.write_line(delta)
+        self.previous = tick
+        self.nb_ticks += 1
+
+    def close(self, players: List[str], winner: Optional[str]) -> None:
+        footer = {
+            "type": "footer",
+            "players": players,
+            "winner": winner,
+            "pretty_map": self.with_pretty_map,
+            "keyframe_interval": self.keyframe_interval,
+            "keyframes": self.keyframes,
+        }
+        self.write_line(footer)
+        self.file.close()
+
+    def write_line(self, data: Dict) -> None:
+        if self.file is None:
+            self.file = open(self.record_path, "wb")
+        line = to_json(data, compact=True).encode("utf-8") + b"\n"
+        self.file.write(line)
+        self.offset += len(line)
+
+
+class DeltaReplayRecorder(TickRecorder):
+    """
+    A recorder streaming a delta compressed replay to disk, see DeltaReplayWriter
+    """
+
+    def __init__(
+        self,
+        game: Game,
+        record_path: str,
+        with_history: bool = False,
+        with_pretty_map: bool = True,
+        keyframe_interval: int = DeltaReplayWriter.DEFAULT_KEYFRAME_INTERVAL,
+    ) -> None:
+        super().__init__()
+        self.logger = logging.getLogger("Recorder")
+        self.game = game
+        self.record_path = record_path
+        self.with_history = with_history
+        self.with_pretty_map = with_pretty_map
+        self.writer = DeltaReplayWriter(record_path, keyframe_interval)
+
+    def finish(self) -> None:
+        sortedPlayersByScore = sorted(self.game.players, key=lambda p: p.player_state.score, reverse=True)
+        self.writer.close(
+            [player.player_state.name_str() for player in sortedPlayersByScore], sortedPlayersByScore[0].name
+        )
+        self.logger.info(f"{self.uid}: {self.writer.nb_ticks} ticks recorded in '{self.record_path}'")
+
+    def tick_payload(self, game_tick: int, game_state: GameState) -> Dict:
+        self.logger.debug(f"{self.uid}: game_tick={game_tick}")
+
+        return tick_snapshot(game_state).to_dict(
+            game_tick,
+            -1,
+            ticks_left=self.game.max_nb_ticks - game_tick,
+            with_history=self.with_history,
+            with_pretty_map=self.with_pretty_map,
+        )
+
+    def write_tick(self, tick: Dict) -> None:
+        self.writer.write_tick(tick)
+
+
+class DeltaReplayReader:
+    """
+    Read a replay written by DeltaReplayWriter
+
+    Only the footer is read when opening the replay, `get_tick` decodes from the closest keyframe.
+    """
+
+    def __init__(self, record_path: str) -> None:
+        self.record_path = record_path
+        self.footer = self.read_footer()
+        self.keyframe_ticks = [tick for tick, _ in self.footer["keyframes"]]
+
+    def read_footer(self) -> Dict:
+        with open(self.record_path, "rb") as file:
+            # the footer is the last line, read the end of the file until its first character
+            end = file.seek(0, 2)
+            start = end - 1
+            block_size = 4096
+            while start > 0:
+                block_start = max(0, start - block_size)
+                file.seek(block_start)
+                newline = file.read(start - block_start).rfind(b"\n")
+                if newline >= 0:
+                    start = block_start + newline + 1
+                    break
+                start = block_start
+            file.seek(start)
+            footer: Dict = json.loads(file.read(end - start))
+
+        if footer.get("type") != "footer":
+            raise Exception(f"Replay '{self.record_path}' is incomplete: no footer")
+        return footer
+
+    @property
+    def players(self) -> List[str]:
+        players: List[str] = self.footer["players"]
+        return players
+
+    @property
+    def winner(self) -> Optional[str]:
+        winner: Optional[str] = self.footer["winner"]
+        return winner
+
+    def iter_ticks(self, offset: int = 0) -> Iterator[Dict]:
+        """
+        Decode the ticks from the keyframe at offset to the end of the replay
+        """
+        with open(self.record_path, "rb") as file:
+            file.seek(offset)
+            tick = None
+            for line in file:
+                data = json.loads(line)
+                if data["type"] == "footer":
+                    break
+                if data["type"] == "delta":
+                    tick = apply_tick_delta(tick, data)
+                    if self.footer["pretty_map"]:
+                        tick["game"]["pretty_map"] = generate_pretty_map_from_tick(tick)
+                else:
+                    tick = data
+                yield tick
+
+    def get_tick(self, game_tick: int) -> Dict:
+        """
+        Get the tick message of game_tick, decoding from the last keyframe before it
+        """
+        index = bisect.bisect_right(self.keyframe_ticks, game_tick) - 1
+        if index < 0:
+            raise Exception(f"Tick {game_tick} is not in replay '{self.record_path}'")
+
+        for tick in self.iter_ticks(self.footer["keyframes"][index][1]):
+            if tick["game"]["tick"] == game_tick:
+                return tick
+            if tick["game"]["tick"] > game_tick:
+                break
+        raise Exception(f"Tick {game_tick} is not in replay '{self.record_path}'")
+
+
+def json_replay_to_delta_replay(
+    replay: Dict, record_path: str, keyframe_interval: int = DeltaReplayWriter.DEFAULT_KEYFRAME_INTERVAL
+) -> None:
+    """
+    Convert a replay in the JsonRecorder format (ticks, players and winner) to a delta compressed replay
+    """
+    writer = DeltaReplayWriter(record_path, keyframe_interval)
+    for tick in replay["ticks"]:
+        writer.write_tick(tick)
+    writer.close(replay.get("players", []), replay.get("winner"))
+
+
+def delta_replay_to_json_replay(record_path: str) -> Dict:
+    """
+    Convert a delta compressed replay to the JsonRecorder format (ticks, players and winner)
+    """
+    reader = DeltaReplayReader(record_path)
+    return {"ticks": list(reader.iter_ticks()), "players": reader.players, "winner": reader.winner}
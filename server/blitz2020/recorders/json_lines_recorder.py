@@ -0,0 +1,81 @@
+import json
+import logging
+from typing import Dict, IO, Optional
+
+from blitz2020.game.game import Game
+from blitz2020.game.game_state import GameState
+from blitz2020.recorders.tick_recorder import TickRecorder
+from blitz2020.servers.socket.utils import tick_snapshot, to_json
+
+
+class JsonLinesRecorder(TickRecorder):
+    """
+    A recorder streaming the replay to disk, one json document per line
+
+    Every tick is written as soon as it is recorded, the last line is a footer with the players and the winner
+    ({"type": "footer", "players": [...], "winner": "..."}). Use `read_json_lines_replay` to load the replay
+    in the JsonRecorder format.
+    """
+
+    def __init__(
+        self, game: Game, record_path: str, with_history: bool = False, with_pretty_map: bool = True
+    ) -> None:
+        super().__init__()
+        self.logger = logging.getLogger("Recorder")
+        self.game = game
+        self.record_path = record_path
+        self.with_history = with_history
+        self.with_pretty_map = with_pretty_map
+        self.file: Optional[IO[str]] = None
+        self.nb_ticks = 0
+
+    def finish(self) -> None:
+        sortedPlayersByScore = sorted(self.game.players, key=lambda p: p.player_state.score, reverse=True)
+
+        footer = {
+            "type": "footer",
+            "players": [player.player_state.name_str() for player in sortedPlayersByScore],
+            "winner": sortedPlayersByScore[0].name,
+        }
+        self.write_line(footer)
+        self.file.close()
+        self.logger.info(f"{self.uid}: {self.nb_ticks} ticks recorded in '{self.record_path}'")
+
+    def tick_payload(self, game_tick: int, game_state: GameState) -> Dict:
+        self.logger.debug(f"{self.uid}: game_tick={game_tick}")
+
+        return tick_snapshot(game_state).to_dict(
+            game_tick,
+            -1,
+            ticks_left=self.game.max_nb_ticks - game_tick,
+            with_history=self.with_history,
+            with_pretty_map=self.with_pretty_map,
+        )
+
+    def write_tick(self, tick: Dict) -> None:
+        self.write_line(tick)
+        self.nb_ticks += 1
+
+    def write_line(self, data: Dict) -> None:
+        if self.file is None:
+            self.file = open(self.record_path, "w+")
+        self.file.write(to_json(data, compact=True))
+        self.file.write("\n")
+
+
+def read_json_lines_replay(record_path: str) -> Dict:
+    """
+    Load a replay written by JsonLinesRecorder, in the same format as JsonRecorder (ticks, players and winner)
+
+    A replay without footer (game interrupted) has no players nor winner.
+    """
+    replay: Dict = {"ticks": []}
+    with open(record_path, "r") as file:
+        for line in file:
+            data = json.loads(line)
+            if data["type"] == "footer":
+                replay["players"] = data["players"]
+                replay["winner"] = data["winner"]
+            else:
+                replay["ticks"].append(data)
+    return replay
@@ -1,23 +1,31 @@
-import json
 import logging
 from typing import List, Dict
 
-from blitz2020.game.abstract_recorder import AbstractRecorder
 from blitz2020.game.game import Game
 from blitz2020.game.game_state import GameState
-from blitz2020.servers.socket.utils import game_state_to_dict
-
-
-class JsonRecorder(AbstractRecorder):
-    def __init__(self, game: Game, record_path: str, with_history: bool = False) -> None:
+from blitz2020.recorders.tick_recorder import TickRecorder
+from blitz2020.servers.socket.utils import tick_snapshot, to_json
+
+
+class JsonRecorder(TickRecorder):
+    def __init__(
+        self,
+        game: Game,
+        record_path: str,
+        with_history: bool = False,
+        with_pretty_map: bool = True,
+        compact_json: bool = False,
+    ) -> None:
         super().__init__()
         self.logger = logging.getLogger("Recorder")
         self.game = game
         self.ticks: List[Dict] = list()
         self.record_path = record_path
         self.with_history = with_history
+        self.with_pretty_map = with_pretty_map
+        self.compact_json = compact_json
 
-    def close(self) -> None:
+    def finish(self) -> None:
         sortedPlayersByScore = sorted(self.game.players, key=lambda p: p.player_state.score, reverse=True)
 
         payload = {
@@ -27,12 +35,18 @@ class JsonRecorder(AbstractRecorder):
         }
 
         with open(self.record_path, "w+") as file:
-            file.write(json.dumps(payload, indent=2))
+            file.write(to_json(payload, self.compact_json))
 
-    def record_tick(self, game_tick: int, game_state: GameState) -> None:
+    def tick_payload(self, game_tick: int, game_state: GameState) -> Dict:
         self.logger.debug(f"{self.uid}: game_tick={game_tick}")
 
-        tick = game_state_to_dict(
-            game_tick, -1, game_state, ticks_left=self.game.max_nb_ticks - game_tick, with_history=self.with_history
+        return tick_snapshot(game_state).to_dict(
+            game_tick,
+            -1,
+            ticks_left=self.game.max_nb_ticks - game_tick,
+            with_history=self.with_history,
+            with_pretty_map=self.with_pretty_map,
         )
+
+    def write_tick(self, tick: Dict) -> None:
         self.ticks.append(tick)
@@ -0,0 +1,153 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import boto3
+
+
+class MultipartUpload(ABC):
+    """
+    An object uploaded part by part, the object only exists once the upload is completed
+    """
+
+    @abstractmethod
+    def upload_part(self, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def complete(self) -> None:
+        pass
+
+    @abstractmethod
+    def abort(self) -> None:
+        pass
+
+
+class ObjectStore(ABC):
+    """
+    The storage used by S3Recorder, keys are relative to the store
+    """
+
+    @abstractmethod
+    def put(self, key: str, body: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def upload_file(self, key: str, file_name: str) -> None:
+        pass
+
+    @abstractmethod
+    def create_multipart_upload(self, key: str) -> MultipartUpload:
+        pass
+
+
+class S3MultipartUpload(MultipartUpload):
+    def __init__(self, client: Any, bucket: str, key: str) -> None:
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.upload_id = client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+        self.parts: List[Dict] = []
+
+    def upload_part(self, data: bytes) -> None:
+        part_number = len(self.parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=self.key, PartNumber=part_number, UploadId=self.upload_id, Body=data
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def complete(self) -> None:
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, MultipartUpload={"Parts": self.parts}
+        )
+
+    def abort(self) -> None:
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+
+
+class S3ObjectStore(ObjectStore):
+    """
+    Store the objects in an S3 bucket
+
+    Every part of a multipart upload but the last one must be at least 5 MiB (`S3_MIN_PART_SIZE`).
+    """
+
+    S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+    def __init__(self, bucket: str, client: Optional[Any] = None) -> None:
+        self.bucket = bucket
+        self.client = boto3.client("s3") if client is None else client
+
+    def put(self, key: str, body: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=body)
+
+    def upload_file(self, key: str, file_name: str) -> None:
+        self.client.upload_file(file_name, self.bucket, key)
+
+    def create_multipart_upload(self, key: str) -> MultipartUpload:
+        return S3MultipartUpload(self.client, self.bucket, key)
+
+
+def make_parent_directory(path: str) -> None:
+    directory = os.path.dirname(path)
+    # a path without directory is in the working directory
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+class LocalMultipartUpload(MultipartUpload):
+    def __init__(self, path: str, min_part_size: int) -> None:
+        self.path = path
+        self.min_part_size = min_part_size
+        self.parts: List[int] = []  # size of every uploaded part
+        make_parent_directory(path)
+        self.file = open(path + ".upload", "wb")
+
+    def upload_part(self, data: bytes) -> None:
+        if self.parts and self.parts[-1] < self.min_part_size:
+            raise Exception(f"Part {len(self.parts)} of '{self.path}' is smaller than {self.min_part_size} bytes")
+        self.file.write(data)
+        self.parts.append(len(data))
+
+    def complete(self) -> None:
+        self.file.close()
+        os.replace(self.path + ".upload", self.path)
+
+    def abort(self) -> None:
+        self.file.close()
+        os.remove(self.path + ".upload")
+
+
+class LocalObjectStore(ObjectStore):
+    """
+    Store the objects in a local directory, a stand-in for S3ObjectStore
+
+    Parameters
+    ----------
+    root : str
+        The directory of the store, keys are paths relative to it
+    min_part_size : int
+        Like S3, reject a multipart upload part following a part smaller than min_part_size
+    """
+
+    def __init__(self, root: str, min_part_size: int = 0) -> None:
+        self.root = root
+        self.min_part_size = min_part_size
+        self.uploads: List[LocalMultipartUpload] = []
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def put(self, key: str, body: bytes) -> None:
+        make_parent_directory(self.path(key))
+        with open(self.path(key), "wb") as file:
+            file.write(body)
+
+    def upload_file(self, key: str, file_name: str) -> None:
+        with open(file_name, "rb") as file:
+            self.put(key, file.read())
+
+    def create_multipart_upload(self, key: str) -> MultipartUpload:
+        upload = LocalMultipartUpload(self.path(key), self.min_part_size)
+        self.uploads.append(upload)
+        return upload
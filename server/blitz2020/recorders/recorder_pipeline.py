@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import queue
+import threading
+from collections import deque
+from typing import Any, Deque
+
+from blitz2020.game.abstract_recorder import AbstractRecorder
+from blitz2020.game.game_state import GameState
+from blitz2020.recorders.tick_recorder import TickRecorder
+
+
+class RecorderPipeline(AbstractRecorder):
+    """
+    Run a recorder off the game loop
+
+    Only `TickRecorder.tick_payload` runs on the game loop, the payloads go through a bounded queue to a
+    background thread writing them and finishing the replay when the pipeline is closed. The game loop never
+    waits for the worker.
+
+    Parameters
+    ----------
+    recorder : TickRecorder
+        The recorder writing the ticks
+    max_queue_size : int
+        The number of ticks waiting to be written before applying the backpressure policy
+    drop_when_full : bool
+        The backpressure policy when the queue is full: drop the tick (the replay will miss it) or keep it in
+        an unbounded backlog moved to the queue as the worker catches up (the memory grows)
+    """
+
+    DEFAULT_MAX_QUEUE_SIZE = 256
+
+    # sent to the worker when the pipeline is closed
+    _STOP = object()
+
+    def __init__(
+        self, recorder: TickRecorder, max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE, drop_when_full: bool = False
+    ) -> None:
+        super().__init__()
+        self.logger = logging.getLogger("RecorderPipeline")
+        self.recorder = recorder
+        self.drop_when_full = drop_when_full
+        self.nb_dropped_ticks = 0
+        # the payloads waiting for a free slot in the queue, only used by the game loop until closing
+        self.backlog: Deque[Any] = deque()
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self.worker = threading.Thread(target=self.run_worker, name=f"recorder-{self.recorder.uid}", daemon=True)
+        self.worker.start()
+
+    def record_tick(self, game_tick: int, game_state: GameState) -> None:
+        payload = self.recorder.tick_payload(game_tick, game_state)
+        if self.drop_when_full:
+            try:
+                self.queue.put_nowait(payload)
+            except queue.Full:
+                self.nb_dropped_ticks += 1
+                self.logger.warning(f"{self.recorder.uid}: recorder is late, dropping tick {game_tick}")
+        else:
+            self.backlog.append(payload)
+            self.flush_backlog()
+            if len(self.backlog) == 1:
+                self.logger.warning(f"{self.recorder.uid}: recorder is late, buffering from tick {game_tick}")
+
+    def flush_backlog(self) -> None:
+        # keep the order of the ticks: the backlog goes first
+        try:
+            while self.backlog:
+                self.queue.put_nowait(self.backlog[0])
+                self.backlog.popleft()
+        except queue.Full:
+            pass
+
+    def put_remaining(self) -> None:
+        while self.backlog:
+            self.queue.put(self.backlog.popleft())
+        self.queue.put(RecorderPipeline._STOP)
+
+    async def close(self) -> None:
+        # the queue may be full, wait for the free slots out of the game loop
+        await asyncio.get_running_loop().run_in_executor(None, self.put_remaining)
+        await asyncio.get_running_loop().run_in_executor(None, self.worker.join)
+
+    def run_worker(self) -> None:
+        payload = self.queue.get()
+        while payload is not RecorderPipeline._STOP:
+            try:
+                self.recorder.write_tick(payload)
+            except Exception as e:
+                self.logger.error(f"{self.recorder.uid}: recording tick failed with: '{e}'")
+            payload = self.queue.get()
+
+        try:
+            self.recorder.finish()
+        except Exception as e:
+            self.logger.error(f"{self.recorder.uid}: finishing the replay failed with: '{e}'")
@@ -1,29 +1,62 @@
 import gzip
+import io
 import json
 import logging
-from typing import List, Dict, Any
+from typing import Dict, Any, Optional
 
-import boto3
-from blitz2020.game.abstract_recorder import AbstractRecorder
 from blitz2020.game.game import Game
 from blitz2020.game.game_state import GameState
-from blitz2020.servers.socket.utils import game_state_to_dict
+from blitz2020.recorders.object_store import MultipartUpload, ObjectStore, S3ObjectStore
+from blitz2020.recorders.tick_recorder import TickRecorder
+from blitz2020.servers.socket.utils import tick_snapshot
 
 
-class S3Recorder(AbstractRecorder):
-    def __init__(self, game: Game, s3_bucket: str, s3_path: str, log_file: str):
+class S3Recorder(TickRecorder):
+    """
+    A recorder uploading the game results and the gzipped replay to S3
+
+    The replay is compressed and uploaded by parts of `part_size` bytes while the game runs, only the last part
+    is uploaded when the recorder is closed.
+
+    Parameters
+    ----------
+    object_store : ObjectStore
+        The storage of the files, an S3ObjectStore on s3_bucket by default
+    part_size : int
+        The size of the replay parts, S3 rejects parts smaller than 5 MiB but the last one
+    """
+
+    DEFAULT_PART_SIZE = S3ObjectStore.S3_MIN_PART_SIZE
+    REPLAY_FILE_NAME = "replay.gz"
+
+    def __init__(
+        self,
+        game: Game,
+        s3_bucket: str,
+        s3_path: str,
+        log_file: str,
+        with_pretty_map: bool = True,
+        object_store: Optional[ObjectStore] = None,
+        part_size: int = DEFAULT_PART_SIZE,
+    ):
         super().__init__()
         self.logger = logging.getLogger("S3 Recorder")
 
-        self.s3 = boto3.resource("s3").Bucket(s3_bucket)
+        self.s3 = S3ObjectStore(s3_bucket) if object_store is None else object_store
         self.s3_path = s3_path
+        self.part_size = part_size
 
         self.game = game
-        self.ticks: List[Dict] = list()
-        self.s3_path = s3_path
         self.log_file = log_file
+        self.with_pretty_map = with_pretty_map
+
+        # the replay is a gzipped {"ticks": [...]} json document, compressed into buffer as the ticks are written
+        self.nb_ticks = 0
+        self.replay_upload: Optional[MultipartUpload] = None
+        self.buffer = io.BytesIO()
+        self.gzip_file = gzip.GzipFile(filename="", mode="wb", fileobj=self.buffer)
 
-    def close(self) -> None:
+    def finish(self) -> None:
         sortedPlayersByScore = sorted(self.game.players, key=lambda p: p.player_state.score, reverse=True)
 
         gameResult = [
@@ -37,33 +70,61 @@ class S3Recorder(AbstractRecorder):
             for player in self.game.players
         ]
 
-        replay = {"ticks": self.ticks}
-
         self.upload_data_to_S3(gameResult, "gameResults.json")
-        self.gzip_and_upload_data_to_S3(replay, "replay.gz")
+        self.complete_replay_upload()
         if self.log_file:
             logging.info("Uploading log file to s3, following logs will be in cloudwatch only")
             self.upload_file_to_S3(self.log_file, self.log_file)
 
-    def record_tick(self, game_tick: int, game_state: GameState) -> None:
+    def tick_payload(self, game_tick: int, game_state: GameState) -> Dict:
         self.logger.debug(f"{self.uid}: game_tick={game_tick}")
 
-        tick = game_state_to_dict(
-            game_tick, -1, game_state, ticks_left=self.game.max_nb_ticks - game_tick, with_history=False
+        return tick_snapshot(game_state).to_dict(
+            game_tick,
+            -1,
+            ticks_left=self.game.max_nb_ticks - game_tick,
+            with_history=False,
+            with_pretty_map=self.with_pretty_map,
         )
-        self.ticks.append(tick)
+
+    def write_tick(self, tick: Dict) -> None:
+        if self.replay_upload is None:
+            self.start_replay_upload()
+        else:
+            self.gzip_file.write(b", ")
+        self.gzip_file.write(json.dumps(tick).encode("utf8"))
+        self.nb_ticks += 1
+
+        if self.buffer.tell() >= self.part_size:
+            self.upload_replay_part()
+
+    def start_replay_upload(self) -> None:
+        self.replay_upload = self.s3.create_multipart_upload(self.s3_path + S3Recorder.REPLAY_FILE_NAME)
+        self.gzip_file.write(b'{"ticks": [')
+
+    def upload_replay_part(self) -> None:
+        self.replay_upload.upload_part(self.buffer.getvalue())
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+    def complete_replay_upload(self) -> None:
+        if self.replay_upload is None:
+            self.start_replay_upload()
+        self.gzip_file.write(b"]}")
+        self.gzip_file.close()
+
+        try:
+            self.upload_replay_part()
+            self.replay_upload.complete()
+        except Exception:
+            self.replay_upload.abort()
+            raise
+        logging.info('Uploaded file "%s" (%d ticks)', S3Recorder.REPLAY_FILE_NAME, self.nb_ticks)
 
     def upload_data_to_S3(self, data: Any, s3_file_name: str) -> None:
-        self.s3.Object(key=self.s3_path + s3_file_name).put(Body=json.dumps(data))
+        self.s3.put(self.s3_path + s3_file_name, json.dumps(data).encode("utf8"))
         logging.info('Uploaded file "%s"', s3_file_name)
 
     def upload_file_to_S3(self, file_name: str, s3_file_name: str) -> None:
-        self.s3.Object(key=self.s3_path + s3_file_name).upload_file(file_name)
-        logging.info('Uploaded file "%s"', s3_file_name)
-
-    def gzip_and_upload_data_to_S3(self, data: Any, s3_file_name: str) -> None:
-        with gzip.open(s3_file_name, "wt", encoding="utf8") as f:
-            json.dump(data, f)
-
-        self.s3.Object(key=self.s3_path + s3_file_name).upload_file(s3_file_name)
+        self.s3.upload_file(self.s3_path + s3_file_name, file_name)
         logging.info('Uploaded file "%s"', s3_file_name)
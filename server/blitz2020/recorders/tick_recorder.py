@@ -0,0 +1,33 @@
+from abc import abstractmethod
+from typing import Any
+
+from blitz2020.game.abstract_recorder import AbstractRecorder
+from blitz2020.game.game_state import GameState
+
+
+class TickRecorder(AbstractRecorder):
+    """
+    A recorder split in a fast step on the game loop and slow steps that can run anywhere
+
+    `tick_payload` serializes the game state on the game loop, the payload must not reference the live game
+    state. `write_tick` stores or writes a payload and `finish` completes the replay, they are called in
+    order by `record_tick` and `close`, or from a background thread by RecorderPipeline.
+    """
+
+    def record_tick(self, game_tick: int, game_state: GameState) -> None:
+        self.write_tick(self.tick_payload(game_tick, game_state))
+
+    async def close(self) -> None:
+        self.finish()
+
+    @abstractmethod
+    def tick_payload(self, game_tick: int, game_state: GameState) -> Any:
+        pass
+
+    @abstractmethod
+    def write_tick(self, payload: Any) -> None:
+        pass
+
+    @abstractmethod
+    def finish(self) -> None:
+        pass
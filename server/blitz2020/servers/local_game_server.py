@@ -1,6 +1,37 @@
+from typing import List, Optional, Type
+
+from blitz2020.game.abstract_player import AbstractPlayer
+from blitz2020.game.game_config import GameConfig
+from blitz2020.game.game_map import GameMap
 from blitz2020.servers.abstract_server import AbstractServer
 
 
 class LocalGameServer(AbstractServer):
-    async def start(self) -> None:
-        pass
+    """
+    Run a game between in process players, without sockets, move timeouts nor delays
+
+    Parameters
+    ----------
+    players : List[AbstractPlayer]
+        The players, registered in order: the first player gets the first spawn position of the game config
+    """
+
+    def __init__(
+        self,
+        players: List[AbstractPlayer],
+        max_nb_ticks: int = 1000,
+        game_config: GameConfig = None,
+        game_map_class: Type[GameMap] = GameMap,
+    ):
+        super().__init__(max_nb_ticks, game_config, game_delay=0, move_timeout=None, game_map_class=game_map_class)
+        self.winner: Optional[AbstractPlayer] = None
+        for player in players:
+            self.game.register_player(player)
+
+    async def start(self) -> bool:
+        await self.run()
+        return True
+
+    async def run(self) -> AbstractPlayer:
+        self.winner = await self.game.game_loop()
+        return self.winner
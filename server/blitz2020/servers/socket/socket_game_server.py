@@ -2,21 +2,39 @@ import asyncio
 import json
 import logging
 from asyncio import Future
-from typing import Dict, Optional, cast
+from typing import Callable, Dict, List, Optional, Type, cast
 
 import websockets
 from websockets import WebSocketServer
 
 from blitz2020.game.abstract_player import AbstractPlayer
 from blitz2020.game.game_config import GameConfig
+from blitz2020.game.game_map import GameMap
+from blitz2020.recorders.delta_replay_recorder import DeltaReplayRecorder
+from blitz2020.recorders.json_lines_recorder import JsonLinesRecorder
 from blitz2020.recorders.json_recorder import JsonRecorder
+from blitz2020.recorders.recorder_pipeline import RecorderPipeline
 from blitz2020.recorders.s3_recorder import S3Recorder
+from blitz2020.recorders.tick_recorder import TickRecorder
 from blitz2020.servers.abstract_server import AbstractServer
 from blitz2020.servers.socket.socket_player import SocketPlayer
 from blitz2020.servers.socket.socket_viewer import SocketViewer
+from blitz2020.servers.socket.utils import TickEncoder, PROTOCOL_FULL, protocols
 
 
 class SocketGameServer(AbstractServer):
+    # pretty_map option: who receives the pretty map in the tick messages
+    PRETTY_MAP_ALWAYS = "always"  # every player, viewer and recorder
+    PRETTY_MAP_REQUESTED = "requested"  # only the clients registering with "pretty_map": true
+    PRETTY_MAP_NEVER = "never"
+    pretty_map_options = [PRETTY_MAP_ALWAYS, PRETTY_MAP_REQUESTED, PRETTY_MAP_NEVER]
+
+    # record_format option: file format of the replay written to record_path
+    RECORD_FORMAT_JSON = "json"  # a single json document written at the end of the game
+    RECORD_FORMAT_JSON_LINES = "jsonl"  # one line per tick written during the game, see JsonLinesRecorder
+    RECORD_FORMAT_DELTA = "delta"  # keyframes and deltas written during the game, see DeltaReplayRecorder
+    record_formats = [RECORD_FORMAT_JSON, RECORD_FORMAT_JSON_LINES, RECORD_FORMAT_DELTA]
+
     def __init__(
         self,
         max_nb_ticks: int = 1000,
@@ -33,8 +51,14 @@ class SocketGameServer(AbstractServer):
         game_delay: int = 0,
         log_file: str = None,
         move_timeout: int = 1,
+        game_map_class: Type[GameMap] = GameMap,
+        pretty_map: str = PRETTY_MAP_ALWAYS,
+        compact_json: bool = False,
+        keyframe_interval: int = TickEncoder.DEFAULT_KEYFRAME_INTERVAL,
+        record_format: str = RECORD_FORMAT_JSON,
+        record_drop_ticks: bool = False,
     ):
-        super().__init__(max_nb_ticks, game_config, game_delay, move_timeout)
+        super().__init__(max_nb_ticks, game_config, game_delay, move_timeout, game_map_class)
         self.logger = logging.getLogger("SocketGameServer")
         self.path = path
         self.port = port
@@ -42,15 +66,52 @@ class SocketGameServer(AbstractServer):
         self.game_loop_future: Optional[Future] = None
         self.auto_start_task: Optional[Future] = None
         self.server: Optional[WebSocketServer] = None
+        # called with every player accepted in the game
+        self.player_registered_callbacks: List[Callable[[SocketPlayer], None]] = []
+
+        if pretty_map not in SocketGameServer.pretty_map_options:
+            raise Exception(f"Invalid pretty_map option: '{pretty_map}'")
+        self.pretty_map = pretty_map
+        self.compact_json = compact_json
+        self.keyframe_interval = keyframe_interval
+
+        if record_format not in SocketGameServer.record_formats:
+            raise Exception(f"Invalid record_format option: '{record_format}'")
+
+        # recorders run in a background thread, record_drop_ticks selects what happens when they fall behind
+        def pipeline(recorder: TickRecorder) -> RecorderPipeline:
+            return RecorderPipeline(recorder, drop_when_full=record_drop_ticks)
 
         # create json game recorder
-        if record_path is not None:
-            json_recorder = JsonRecorder(game=self.game, record_path=record_path)
-            self.game.register_recorder(json_recorder)
+        recorder_pretty_map = self.with_pretty_map(False)
+        if record_path is not None and record_format == SocketGameServer.RECORD_FORMAT_JSON_LINES:
+            json_lines_recorder = JsonLinesRecorder(
+                game=self.game, record_path=record_path, with_pretty_map=recorder_pretty_map
+            )
+            self.game.register_recorder(pipeline(json_lines_recorder))
+        elif record_path is not None and record_format == SocketGameServer.RECORD_FORMAT_DELTA:
+            delta_recorder = DeltaReplayRecorder(
+                game=self.game, record_path=record_path, with_pretty_map=recorder_pretty_map
+            )
+            self.game.register_recorder(pipeline(delta_recorder))
+        elif record_path is not None:
+            json_recorder = JsonRecorder(
+                game=self.game,
+                record_path=record_path,
+                with_pretty_map=recorder_pretty_map,
+                compact_json=compact_json,
+            )
+            self.game.register_recorder(pipeline(json_recorder))
 
         if s3_bucket is not None and s3_path is not None:
-            s3_recorder = S3Recorder(game=self.game, s3_bucket=s3_bucket, s3_path=s3_path, log_file=log_file)
-            self.game.register_recorder(s3_recorder)
+            s3_recorder = S3Recorder(
+                game=self.game,
+                s3_bucket=s3_bucket,
+                s3_path=s3_path,
+                log_file=log_file,
+                with_pretty_map=recorder_pretty_map,
+            )
+            self.game.register_recorder(pipeline(s3_recorder))
 
         # Game options
 
@@ -64,34 +125,72 @@ class SocketGameServer(AbstractServer):
             self.max_nb_players = min(self.max_nb_players, len(game_config.spawn_positions))
         self.start_delay_timeout = start_delay_timeout
 
+    def with_pretty_map(self, requested: bool) -> bool:
+        """
+        Check if a client receives the pretty map given the server option and if the client asked for it
+        """
+        if self.pretty_map == SocketGameServer.PRETTY_MAP_REQUESTED:
+            return requested
+        return self.pretty_map == SocketGameServer.PRETTY_MAP_ALWAYS
+
+    def create_tick_encoder(self, registration: Dict) -> TickEncoder:
+        """
+        Create the tick encoder of a client from the options of its registration message
+
+        The client can ask for the pretty map ("pretty_map": true) and a protocol version ("protocol": 2 for
+        the delta protocol, 3 for binary frames), unsupported protocols fall back to full tick messages.
+        """
+        protocol = registration.get("protocol") or PROTOCOL_FULL
+        if protocol not in protocols:
+            self.logger.warning(f"Unsupported protocol '{protocol}', sending full ticks.")
+            protocol = PROTOCOL_FULL
+
+        return TickEncoder(
+            with_pretty_map=self.with_pretty_map(registration.get("pretty_map") is True),
+            compact=self.compact_json,
+            protocol=protocol,
+            keyframe_interval=self.keyframe_interval,
+        )
+
     async def handle_message(self, websocket: websockets.WebSocketServerProtocol, path: str) -> None:
         message = await websocket.recv()
+        await self.handle_registration(websocket, message)
+
+    async def handle_registration(self, websocket: websockets.WebSocketServerProtocol, message: str) -> None:
         try:
             data = json.loads(message)
+            tick_encoder = self.create_tick_encoder(data)
 
             if data["type"] == "register":
                 if self.team_names_by_token is not None:
                     if data["token"] and data["token"] in self.team_names_by_token:
-                        await self.register_player(self.team_names_by_token[data["token"]], websocket)
+                        await self.register_player(self.team_names_by_token[data["token"]], websocket, tick_encoder)
                     else:
                         raise Exception(f"Invalid token received: '{data}'")
                 else:
-                    await self.register_player(data["name"], websocket)
+                    await self.register_player(data["name"], websocket, tick_encoder)
             elif data["type"] == "viewer":
-                await self.register_viewer(websocket)
+                await self.register_viewer(websocket, tick_encoder)
             else:
                 raise Exception(f"Invalid command received: '{data}'")
         except:
             self.logger.warning(f"Invalid message received: '{message!r}")
 
-    async def register_player(self, player_name: str, websocket: websockets.WebSocketServerProtocol) -> None:
+    async def register_player(
+        self,
+        player_name: str,
+        websocket: websockets.WebSocketServerProtocol,
+        tick_encoder: Optional[TickEncoder] = None,
+    ) -> None:
         self.logger.info(f"A new player just connected: '{player_name}'")
 
         if len(self.game.players) >= self.max_nb_players:
             self.logger.info(f"Player '{player_name}' refused, maximum number of player reached.")
         else:
-            player = SocketPlayer(server=self, name=player_name, websocket=websocket)
+            player = SocketPlayer(server=self, name=player_name, websocket=websocket, tick_encoder=tick_encoder)
             self.game.register_player(player)
+            for callback in self.player_registered_callbacks:
+                callback(player)
 
             # if enough players, start the game loop task
             if len(self.game.players) >= self.min_nb_players and not self.game.is_started:
@@ -107,8 +206,10 @@ class SocketGameServer(AbstractServer):
 
             await self.wait_for_game_to_finish()
 
-    async def register_viewer(self, websocket: websockets.WebSocketServerProtocol) -> None:
-        viewer = SocketViewer(self, websocket=websocket)
+    async def register_viewer(
+        self, websocket: websockets.WebSocketServerProtocol, tick_encoder: Optional[TickEncoder] = None
+    ) -> None:
+        viewer = SocketViewer(self, websocket=websocket, tick_encoder=tick_encoder)
         self.logger.info(f"A new viewer just joined: '{viewer.uid}'")
         self.game.register_viewer(viewer)
         await self.wait_for_game_to_finish()
@@ -128,14 +229,32 @@ class SocketGameServer(AbstractServer):
     async def start_timeout(self) -> str:
         return "Timeout: No player registered"
 
+    def open_registrations(self) -> None:
+        """
+        Accept the players and viewers, the game starts when enough players registered or after the start delay
+
+        Called by `start`, or by a SocketLobbyServer routing the registrations from its own socket.
+        """
+        # receive the game loop task when enough players and the game is started
+        self.game_loop_future = asyncio.get_running_loop().create_future()
+
+        # game will start after start delay timeout if all players are not registered
+        self.auto_start_task = asyncio.get_running_loop().create_task(self.schedule_start_game())
+
+    def accepts_players(self) -> bool:
+        """
+        Check if a new player can join the game: the game is not started and is not full
+        """
+        return not self.game_loop_future.done() and len(self.game.players) < self.max_nb_players
+
+    def close_registrations(self) -> None:
+        if self.auto_start_task is not None:
+            self.auto_start_task.cancel()
+
     async def start(self) -> bool:
         self.logger.info(f"Starting game server on socket '{self.path}:{self.port}'")
         try:
-            # receive the game loop task when enough players and the game is started
-            self.game_loop_future = asyncio.get_running_loop().create_future()
-
-            # game will start after start delay timeout if all players are not registered
-            self.auto_start_task = asyncio.get_running_loop().create_task(self.schedule_start_game())
+            self.open_registrations()
 
             # start socket server
             self.server = await websockets.serve(self.handle_message, self.path, self.port)
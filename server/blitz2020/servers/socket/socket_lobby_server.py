@@ -0,0 +1,114 @@
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, List, Optional
+
+import websockets
+from websockets import WebSocketServer
+
+from blitz2020.servers.socket.socket_game_server import SocketGameServer
+
+
+class SocketLobbyServer:
+    """
+    Host many concurrent games behind a single socket
+
+    Every registration message is routed to a room: the "room" of the message, the room of its token in
+    `room_ids_by_token` or the default room. Players join the game waiting for players in their room, a new game
+    is created when there is none or when it is started or full. Viewers watch the last game of their room.
+    Finished games are dropped, the process keeps serving new games.
+
+    Parameters
+    ----------
+    create_game_server : Callable[[str, int], SocketGameServer]
+        Create the game of a room given the room id and the game number, the game server is never started,
+        the lobby forwards the registrations to it
+    room_ids_by_token : Dict[str, str]
+        The room of the players registering with a token and without room
+    """
+
+    DEFAULT_ROOM = "default"
+
+    def __init__(
+        self,
+        create_game_server: Callable[[str, int], SocketGameServer],
+        path: str = "localhost",
+        port: int = 8765,
+        room_ids_by_token: Dict[str, str] = None,
+    ):
+        self.logger = logging.getLogger("SocketLobbyServer")
+        self.create_game_server = create_game_server
+        self.path = path
+        self.port = port
+        self.room_ids_by_token = room_ids_by_token or {}
+        self.server: Optional[WebSocketServer] = None
+
+        self.rooms: Dict[str, SocketGameServer] = {}
+        self.nb_games = 0
+        self.nb_finished_games = 0
+        self.game_tasks: List[asyncio.Task] = []
+
+    def room_id(self, registration: Dict) -> str:
+        if registration.get("room"):
+            return str(registration["room"])
+        return self.room_ids_by_token.get(registration.get("token"), SocketLobbyServer.DEFAULT_ROOM)
+
+    def get_game_server(self, room_id: str, for_player: bool) -> SocketGameServer:
+        """
+        Get the game of a room, create a new one when the room is empty or when a player cannot join its game
+        """
+        game_server = self.rooms.get(room_id)
+        if game_server is None or (for_player and not game_server.accepts_players()):
+            game_server = self.create_game_server(room_id, self.nb_games)
+            self.nb_games += 1
+            self.logger.info(f"Room '{room_id}': new game #{self.nb_games}")
+
+            game_server.open_registrations()
+            self.rooms[room_id] = game_server
+            self.game_tasks.append(asyncio.create_task(self.recycle_game_server(room_id, game_server)))
+        return game_server
+
+    async def recycle_game_server(self, room_id: str, game_server: SocketGameServer) -> None:
+        try:
+            winner = await game_server.wait_for_game_to_finish()
+            self.logger.info(f"Room '{room_id}': game finished, winner: '{getattr(winner, 'name', winner)}'")
+        except Exception as e:
+            self.logger.warning(f"Room '{room_id}': game failed with: '{e}'")
+        finally:
+            if self.rooms.get(room_id) is game_server:
+                del self.rooms[room_id]
+            self.nb_finished_games += 1
+            self.game_tasks.remove(asyncio.current_task())
+
+    async def handle_message(self, websocket: websockets.WebSocketServerProtocol, path: str) -> None:
+        message = await websocket.recv()
+        try:
+            data = json.loads(message)
+            room_id = self.room_id(data)
+        except:
+            self.logger.warning(f"Invalid message received: '{message!r}")
+            return
+
+        game_server = self.get_game_server(room_id, for_player=data.get("type") == "register")
+        await game_server.handle_registration(websocket, message)
+
+    async def start(self) -> bool:
+        self.logger.info(f"Starting lobby server on socket '{self.path}:{self.port}'")
+        try:
+            self.server = await websockets.serve(self.handle_message, self.path, self.port)
+            return True
+
+        except Exception as e:
+            self.logger.critical(f"An error occurred while starting the server: {e}")
+            return False
+
+    async def terminate(self) -> None:
+        for game_server in self.rooms.values():
+            game_server.close_registrations()
+        for task in list(self.game_tasks):
+            task.cancel()
+
+        # close the socket
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
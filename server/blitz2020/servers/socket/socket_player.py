@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 from typing import Tuple, Optional
@@ -7,15 +8,22 @@ from blitz2020.game.abstract_player import AbstractPlayer
 from blitz2020.game.action import Action
 from blitz2020.game.game_state import GameState
 from blitz2020.servers.abstract_server import AbstractServer
-from blitz2020.servers.socket.utils import game_state_to_json
+from blitz2020.servers.socket.utils import TickEncoder
 
 
 class SocketPlayer(AbstractPlayer):
-    def __init__(self, server: AbstractServer, name: str, websocket: websockets.WebSocketServerProtocol) -> None:
+    def __init__(
+        self,
+        server: AbstractServer,
+        name: str,
+        websocket: websockets.WebSocketServerProtocol,
+        tick_encoder: Optional[TickEncoder] = None,
+    ) -> None:
         super().__init__(name)
         self.logger = logging.getLogger("SocketPlayer")
         self.server = server
         self.websocket = websocket
+        self.tick_encoder = tick_encoder or TickEncoder()
 
     async def close(self) -> None:
         await self.websocket.close()
@@ -25,7 +33,7 @@ class SocketPlayer(AbstractPlayer):
 
         action = Action.FORWARD
         received_tick = None
-        tick = game_state_to_json(
+        tick = self.tick_encoder.encode(
             game_tick, self.player_state.id, game_state, ticks_left=self.server.game.max_nb_ticks - game_tick
         )
 
@@ -53,6 +61,11 @@ class SocketPlayer(AbstractPlayer):
                 self.logger.warning(f"{self.name_str()}: invalid action: '{message!r}'")
                 self.player_state.add_history(game_tick, "Invalid action")
 
+        except asyncio.CancelledError:
+            # timed out, the tick may not have been sent: the next one must not be a delta
+            self.tick_encoder.reset()
+            raise
+
         except websockets.ConnectionClosed:
             self.logger.warning(f"Player '{self.name_str()}' disconnected")
             self.server.game.unregister_player(self)
@@ -1,5 +1,6 @@
-import json
+import asyncio
 import logging
+from typing import Optional
 
 import websockets
 
@@ -7,15 +8,21 @@ from blitz2020.game.abstract_viewer import AbstractViewer
 from blitz2020.game.game_state import GameState
 from blitz2020.game.player_state import PlayerState
 from blitz2020.servers.abstract_server import AbstractServer
-from blitz2020.servers.socket.utils import game_state_to_json, player_state_to_dict
+from blitz2020.servers.socket.utils import player_state_to_dict, to_json, TickEncoder
 
 
 class SocketViewer(AbstractViewer):
-    def __init__(self, server: AbstractServer, websocket: websockets.WebSocketServerProtocol) -> None:
+    def __init__(
+        self,
+        server: AbstractServer,
+        websocket: websockets.WebSocketServerProtocol,
+        tick_encoder: Optional[TickEncoder] = None,
+    ) -> None:
         super().__init__()
         self.logger = logging.getLogger("Viewer")
         self.server = server
         self.websocket = websocket
+        self.tick_encoder = tick_encoder or TickEncoder()
 
     async def close(self) -> None:
         await self.websocket.close()
@@ -23,11 +30,16 @@ class SocketViewer(AbstractViewer):
     async def send_tick(self, game_tick: int, game_state: GameState) -> None:
         self.logger.info(f"{self.uid}: game_tick={game_tick}")
 
-        tick = game_state_to_json(game_tick, -1, game_state, ticks_left=self.server.game.max_nb_ticks - game_tick)
+        tick = self.tick_encoder.encode(game_tick, -1, game_state, ticks_left=self.server.game.max_nb_ticks - game_tick)
         try:
             self.logger.info(f"{self.uid}: send tick to socket")
             await self.websocket.send(tick)
 
+        except asyncio.CancelledError:
+            # timed out, the tick may not have been sent: the next one must not be a delta
+            self.tick_encoder.reset()
+            raise
+
         except websockets.ConnectionClosed:
             self.logger.warning(f"Viewer '{self.uid}' disconnected.")
             self.server.game.unregister_viewer(self)
@@ -56,4 +68,4 @@ class SocketViewer(AbstractViewer):
 
     def to_json(self, game_tick: int, winner: PlayerState) -> str:
         payload = {"type": "winner", "tick": game_tick, "winner": player_state_to_dict(winner)}
-        return json.dumps(payload, indent=2)
+        return to_json(payload, self.tick_encoder.compact)
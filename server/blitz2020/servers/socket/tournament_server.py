@@ -0,0 +1,401 @@
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, cast
+
+import websockets
+
+from blitz2020.servers.socket.socket_game_server import SocketGameServer
+from blitz2020.servers.socket.socket_lobby_server import SocketLobbyServer
+from blitz2020.servers.socket.socket_player import SocketPlayer
+
+# Messages exchanged by the front process and a worker over their pipe, all of them are tuples
+#
+# front -> worker:
+#   ("open_game", game_id, room_id)              create a game and accept its registrations
+#   ("close_registrations", game_id)            the server is terminating
+#   ("connect", connection_id, game_id, message) a client registered to the game with message
+#   ("message", connection_id, message)          a message from the client
+#   ("disconnect", connection_id)                the client disconnected
+#   ("stop",)                                    stop the worker
+#
+# worker -> front:
+#   ("game_opened", game_id, max_nb_players)
+#   ("game_started", game_id)
+#   ("player_registered", game_id, connection_id) the client was accepted as a player of the game
+#   ("game_finished", game_id, winner)           winner is the name of the winner or the game result
+#   ("send", connection_id, data)                send data (str or bytes) to the client
+#   ("close", connection_id)                     close the client connection
+
+
+def read_pipe(connection: Connection, loop: asyncio.AbstractEventLoop, on_message: Callable[[Any], None]) -> None:
+    """
+    Call on_message on the event loop for every message received on connection, with None once it is closed
+
+    The pipe is read by a daemon thread, a blocking recv would freeze the event loop.
+    """
+
+    def run() -> None:
+        try:
+            while True:
+                loop.call_soon_threadsafe(on_message, connection.recv())
+        except (EOFError, OSError):
+            try:
+                loop.call_soon_threadsafe(on_message, None)
+            except RuntimeError:
+                pass  # the event loop is already closed, the workers exit after the server stopped
+
+    threading.Thread(target=run, name="pipe-reader", daemon=True).start()
+
+
+class PipeWebSocket:
+    """
+    A client of the front process as seen by a worker, with the websocket methods used by the players and viewers
+    """
+
+    def __init__(self, worker: "TournamentWorker", connection_id: int) -> None:
+        self.worker = worker
+        self.connection_id = connection_id
+        self.messages: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        self.closed = False
+
+    async def send(self, data: Any) -> None:
+        if self.closed:
+            raise websockets.ConnectionClosed(None, None)
+        self.worker.send(("send", self.connection_id, data))
+
+    async def recv(self) -> str:
+        message = await self.messages.get()
+        if message is None:
+            raise websockets.ConnectionClosed(None, None)
+        return message
+
+    async def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.worker.send(("close", self.connection_id))
+
+    def disconnected(self) -> None:
+        self.closed = True
+        self.messages.put_nowait(None)
+
+
+class TournamentWorker:
+    """
+    Run the games dispatched by the front process of a TournamentServer, see `run_tournament_worker`
+    """
+
+    def __init__(self, connection: Connection, create_game_server: Callable[[str, int], SocketGameServer]) -> None:
+        self.logger = logging.getLogger("TournamentWorker")
+        self.connection = connection
+        self.create_game_server = create_game_server
+        self.game_servers: Dict[int, SocketGameServer] = {}
+        self.websockets: Dict[int, PipeWebSocket] = {}
+        self.stopped: Optional[asyncio.Future] = None
+
+    def send(self, message: Tuple) -> None:
+        self.connection.send(message)
+
+    async def run(self) -> None:
+        self.stopped = asyncio.get_running_loop().create_future()
+        read_pipe(self.connection, asyncio.get_running_loop(), self.on_message)
+        await self.stopped
+
+    def on_message(self, message: Optional[Tuple]) -> None:
+        if message is None or message[0] == "stop":
+            if not self.stopped.done():
+                self.stopped.set_result(None)
+        elif message[0] == "open_game":
+            _, game_id, room_id = message
+            self.open_game(game_id, room_id)
+        elif message[0] == "close_registrations":
+            game_server = self.game_servers.get(message[1])
+            if game_server is not None:
+                game_server.close_registrations()
+        elif message[0] == "connect":
+            _, connection_id, game_id, registration = message
+            websocket = PipeWebSocket(self, connection_id)
+            self.websockets[connection_id] = websocket
+            asyncio.create_task(self.handle_connection(self.game_servers[game_id], websocket, registration))
+        elif message[0] == "message":
+            websocket = self.websockets.get(message[1])
+            if websocket is not None:
+                websocket.messages.put_nowait(message[2])
+        elif message[0] == "disconnect":
+            websocket = self.websockets.pop(message[1], None)
+            if websocket is not None:
+                websocket.disconnected()
+        else:
+            self.logger.warning(f"Invalid message received: '{message!r}'")
+
+    def open_game(self, game_id: int, room_id: str) -> None:
+        game_server = self.create_game_server(room_id, game_id)
+        game_server.player_registered_callbacks.append(functools.partial(self.player_registered, game_id))
+        game_server.open_registrations()
+        self.game_servers[game_id] = game_server
+        self.send(("game_opened", game_id, game_server.max_nb_players))
+
+        game_server.game_loop_future.add_done_callback(lambda _: self.send(("game_started", game_id)))
+        asyncio.create_task(self.wait_for_game_to_finish(game_id, game_server))
+
+    def player_registered(self, game_id: int, player: SocketPlayer) -> None:
+        # the clients of the workers are PipeWebSockets
+        websocket = cast(PipeWebSocket, player.websocket)
+        self.send(("player_registered", game_id, websocket.connection_id))
+
+    async def wait_for_game_to_finish(self, game_id: int, game_server: SocketGameServer) -> None:
+        winner: Any = None
+        try:
+            winner = await game_server.wait_for_game_to_finish()
+        except Exception as e:
+            self.logger.warning(f"Game #{game_id} failed with: '{e}'")
+        finally:
+            del self.game_servers[game_id]
+            self.send(("game_finished", game_id, str(getattr(winner, "name", winner))))
+
+    async def handle_connection(
+        self, game_server: SocketGameServer, websocket: PipeWebSocket, registration: str
+    ) -> None:
+        try:
+            await game_server.handle_registration(websocket, registration)
+        finally:
+            # like a websockets handler returning
+            await websocket.close()
+
+
+def run_tournament_worker(
+    connection: Connection,
+    create_game_server: Callable[[str, int], SocketGameServer],
+    inherited_connections: Sequence[Connection] = (),
+) -> None:
+    """
+    Run a worker, inherited_connections are the front process ends of the pipes of the workers forked before it
+    """
+    # the front ends must only be open in the front process, a worker sees the end of its pipe when it dies
+    for inherited_connection in inherited_connections:
+        inherited_connection.close()
+    asyncio.run(TournamentWorker(connection, create_game_server).run())
+
+
+class RemoteGameServer:
+    """
+    A game hosted by a tournament worker as seen by the front process, with the methods used by SocketLobbyServer
+    """
+
+    def __init__(self, tournament: "TournamentServer", worker_id: int, room_id: str, game_id: int) -> None:
+        self.tournament = tournament
+        self.worker_id = worker_id
+        self.room_id = room_id
+        self.game_id = game_id
+        self.max_nb_players: Optional[int] = None  # known once the worker opened the game
+        self.nb_players = 0  # the players accepted by the worker
+        self.registering: Set[int] = set()  # the connections of the players not yet accepted or refused
+        self.is_started = False
+        self.finished: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def send(self, message: Tuple) -> None:
+        self.tournament.send(self.worker_id, message)
+
+    def open_registrations(self) -> None:
+        self.send(("open_game", self.game_id, self.room_id))
+
+    def accepts_players(self) -> bool:
+        return not self.is_started and (
+            self.max_nb_players is None or self.nb_players + len(self.registering) < self.max_nb_players
+        )
+
+    def player_registered(self, connection_id: int) -> None:
+        self.registering.discard(connection_id)
+        self.nb_players += 1
+
+    def close_registrations(self) -> None:
+        self.send(("close_registrations", self.game_id))
+
+    async def wait_for_game_to_finish(self) -> str:
+        winner: str = await self.finished
+        return winner
+
+    async def handle_registration(self, websocket: websockets.WebSocketServerProtocol, message: str) -> None:
+        connection_id = self.tournament.add_websocket(websocket)
+        if json.loads(message).get("type") == "register":
+            # a refused player is closed by the worker
+            self.registering.add(connection_id)
+        self.send(("connect", connection_id, self.game_id, message))
+        try:
+            async for client_message in websocket:
+                self.send(("message", connection_id, client_message))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.registering.discard(connection_id)
+            self.tournament.remove_websocket(connection_id)
+            self.send(("disconnect", connection_id))
+
+
+class TournamentServer(SocketLobbyServer):
+    """
+    A lobby running its games in a pool of worker processes
+
+    The front process only accepts the connections, routes them to the rooms like SocketLobbyServer and forwards
+    the client messages to the worker hosting their game over a pipe. The game loops, the recorders and the tick
+    serialization run in the workers, a new game goes to the worker with the fewest games.
+
+    The data sent by a worker to a client goes through the send queue of the connection, consumed by a single task:
+    the ticks reach the client in order (the delta ticks depend on the previous ones) and before the connection
+    is closed.
+
+    Parameters
+    ----------
+    create_game_server : Callable[[str, int], SocketGameServer]
+        Create the game of a room in a worker given the room id and the game number, it must be picklable when
+        the processes are not forked
+    nb_workers : int
+        The number of worker processes, the number of cores by default
+    """
+
+    def __init__(
+        self,
+        create_game_server: Callable[[str, int], SocketGameServer],
+        nb_workers: int = None,
+        path: str = "localhost",
+        port: int = 8765,
+        room_ids_by_token: Dict[str, str] = None,
+    ):
+        super().__init__(self.create_remote_game_server, path, port, room_ids_by_token)  # type: ignore
+        self.logger = logging.getLogger("TournamentServer")
+        self.create_worker_game_server = create_game_server
+        self.nb_workers = nb_workers or os.cpu_count() or 1
+
+        self.processes: List[multiprocessing.process.BaseProcess] = []
+        self.connections: List[Connection] = []
+        self.worker_nb_games: List[int] = []
+        self.remote_game_servers: Dict[int, RemoteGameServer] = {}
+        self.websockets: Dict[int, websockets.WebSocketServerProtocol] = {}
+        # the data to send to each client, None closes the connection
+        self.send_queues: Dict[int, "asyncio.Queue[Any]"] = {}
+        self.send_tasks: Dict[int, asyncio.Task] = {}
+        self.nb_connections = 0
+        self.is_terminating = False
+
+    def create_remote_game_server(self, room_id: str, game_id: int) -> RemoteGameServer:
+        worker_id = self.worker_nb_games.index(min(self.worker_nb_games))
+        self.worker_nb_games[worker_id] += 1
+        game_server = RemoteGameServer(self, worker_id, room_id, game_id)
+        self.remote_game_servers[game_id] = game_server
+        return game_server
+
+    def add_websocket(self, websocket: websockets.WebSocketServerProtocol) -> int:
+        self.nb_connections += 1
+        connection_id = self.nb_connections
+        self.websockets[connection_id] = websocket
+        self.send_queues[connection_id] = asyncio.Queue()
+        self.send_tasks[connection_id] = asyncio.create_task(
+            self.send_to_client(websocket, self.send_queues[connection_id])
+        )
+        return connection_id
+
+    def remove_websocket(self, connection_id: int) -> None:
+        self.websockets.pop(connection_id, None)
+        self.send_queues.pop(connection_id, None)
+        send_task = self.send_tasks.pop(connection_id, None)
+        if send_task is not None:
+            # the client is gone, the data left to send is dropped
+            send_task.cancel()
+
+    def send(self, worker_id: int, message: Tuple) -> None:
+        self.connections[worker_id].send(message)
+
+    def on_worker_message(self, worker_id: int, message: Optional[Tuple]) -> None:
+        if message is None:
+            if not self.is_terminating:
+                self.logger.critical(f"Worker #{worker_id} stopped")
+            for game_server in list(self.remote_game_servers.values()):
+                if game_server.worker_id == worker_id:
+                    self.game_finished(game_server.game_id, "Worker stopped")
+        elif message[0] == "send":
+            send_queue = self.send_queues.get(message[1])
+            if send_queue is not None:
+                send_queue.put_nowait(message[2])
+        elif message[0] == "close":
+            send_queue = self.send_queues.get(message[1])
+            if send_queue is not None:
+                send_queue.put_nowait(None)
+        elif message[0] == "game_opened":
+            self.remote_game_servers[message[1]].max_nb_players = message[2]
+        elif message[0] == "game_started":
+            self.remote_game_servers[message[1]].is_started = True
+        elif message[0] == "player_registered":
+            game_server = self.remote_game_servers.get(message[1])
+            if game_server is not None:
+                game_server.player_registered(message[2])
+        elif message[0] == "game_finished":
+            self.game_finished(message[1], message[2])
+        else:
+            self.logger.warning(f"Invalid message received from worker #{worker_id}: '{message!r}'")
+
+    def game_finished(self, game_id: int, winner: str) -> None:
+        game_server = self.remote_game_servers.pop(game_id, None)
+        if game_server is not None:
+            self.worker_nb_games[game_server.worker_id] -= 1
+            game_server.finished.set_result(winner)
+
+    async def send_to_client(
+        self, websocket: websockets.WebSocketServerProtocol, send_queue: "asyncio.Queue[Any]"
+    ) -> None:
+        """
+        Send the data of send_queue to the client in order, until None closes the connection
+        """
+        try:
+            while True:
+                data = await send_queue.get()
+                if data is None:
+                    await websocket.close()
+                    return
+                await websocket.send(data)
+        except websockets.ConnectionClosed:
+            # the worker is notified when the connection handler returns
+            pass
+
+    async def start(self) -> bool:
+        # fork the workers when possible, the game server factory does not need to be picklable
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+
+        # every worker is forked before starting the pipe reader threads
+        for worker_id in range(self.nb_workers):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(
+                target=run_tournament_worker,
+                args=(worker_connection, self.create_worker_game_server, list(self.connections)),
+                name=f"tournament-worker-{worker_id}",
+                daemon=True,
+            )
+            process.start()
+            worker_connection.close()
+
+            self.processes.append(process)
+            self.connections.append(connection)
+            self.worker_nb_games.append(0)
+
+        loop = asyncio.get_running_loop()
+        for worker_id, connection in enumerate(self.connections):
+            read_pipe(connection, loop, functools.partial(self.on_worker_message, worker_id))
+
+        self.logger.info(f"Started {self.nb_workers} tournament workers")
+        return await super().start()
+
+    async def terminate(self) -> None:
+        await super().terminate()
+
+        self.is_terminating = True
+        for game_server in list(self.remote_game_servers.values()):
+            self.game_finished(game_server.game_id, "Server terminated")
+        for connection in self.connections:
+            connection.send(("stop",))
+        for process in self.processes:
+            await asyncio.get_running_loop().run_in_executor(None, process.join)
@@ -1,15 +1,43 @@
 import json
+import struct
+import weakref
 from datetime import datetime
-from typing import Optional, Dict, List, Tuple
+from typing import Any, Optional, Dict, List, Tuple, Union
 
 import numpy
-from blitz2020.game.direction import Direction
+from blitz2020.game.array_game_map import ArrayGameMap
+from blitz2020.game.direction import Direction, directions
 from blitz2020.game.game_map import GameMap
 from blitz2020.game.game_state import GameState
 from blitz2020.game.player_state import PlayerState, HistoryItem
 from blitz2020.game.player_stats import PlayerStats
 from blitz2020.game.position import Position
 
+try:
+    # optional faster json encoder, used by the compact json mode when installed
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def to_json(data: Any, compact: bool = False) -> str:
+    """
+    Serialize data to a json string
+
+    Parameters
+    ----------
+    data : Any
+        The payload to serialize
+    compact : bool
+        When True, no indentation nor spaces between the tokens and orjson is used if installed,
+        otherwise the document is indented for readability
+    """
+    if not compact:
+        return json.dumps(data, indent=2)
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"))
+
 
 def player_state_to_dict(p: PlayerState, with_history: bool = True) -> dict:
     data = {
@@ -23,7 +51,12 @@ def player_state_to_dict(p: PlayerState, with_history: bool = True) -> dict:
         "id": p.id,
         "name": p.name,
         "score": p.score,
-        "stats": {**p.stats.stats, "players_killed": p.stats.kills, "killed_by_players": p.stats.killed_by_players},
+        # copies: the payload can outlive the tick, the stats dicts are changed in place
+        "stats": {
+            **p.stats.stats,
+            "players_killed": dict(p.stats.kills),
+            "killed_by_players": dict(p.stats.killed_by_players),
+        },
         "history": [
             {"timestamp": item.ts.isoformat(), "tick": item.tick, "message": item.message}
             for item in p.history
@@ -98,38 +131,200 @@ def dict_to_game_map(data: List[List[str]]) -> GameMap:
     return game_map
 
 
-def game_state_to_dict(
-    game_tick: int, player_id: Optional[int], game_state: GameState, ticks_left: int, with_history: bool = True
-) -> dict:
-    x_size = len(game_state.game_map.tiles[0])
-    y_size = len(game_state.game_map.tiles)
+def game_map_to_list(game_map: GameMap) -> List[List[str]]:
+    tiles = game_map.tiles
+    x_size = len(tiles[0])
+    y_size = len(tiles)
     map = [["E"] * x_size for y in range(y_size)]
     for y in range(y_size):
         for x in range(x_size):
-            tile, owner = game_state.game_map.tiles[y][x]
+            tile, owner = tiles[y][x]
             if owner is not None:
                 if tile == GameMap.EMPTY:
                     tile = "C"
                 tile = f"{tile}-{owner}"
             map[y][x] = tile
+    return map
 
-    game_state_dict = {
-        "type": "tick",
-        "game": {
-            "map": map,
-            "pretty_map": generate_pretty_map_from_game_state(map, game_state),
-            "player_id": player_id,
-            "tick": game_tick,
-            "ticks_left": ticks_left,
-        },
-        "players": [player_state_to_dict(p, with_history) for p in game_state.players],
-    }
 
-    return game_state_dict
+def game_state_to_dict(
+    game_tick: int,
+    player_id: Optional[int],
+    game_state: GameState,
+    ticks_left: int,
+    with_history: bool = True,
+    with_pretty_map: bool = True,
+) -> dict:
+    return GameStateSnapshot(game_state).to_dict(game_tick, player_id, ticks_left, with_history, with_pretty_map)
+
+
+class GameStateSnapshot:
+    """
+    The serialized parts of a game state shared by every recipient of a tick
+
+    The map, the pretty map and the players are serialized at most once, only the tick related fields
+    and the recipient player_id are added for each message. The pretty map is only generated when a
+    recipient asks for it. The returned dicts share these parts and must not be modified.
+
+    The map and the players are serialized when the snapshot is created, from copies of the player states, the
+    pretty map and the binary body are built from them: the snapshot of a tick is kept to compute the deltas of the
+    next one and must not pick up the changes made after it.
+
+    Parameters
+    ----------
+    game_state : GameState
+        The game state to serialize
+    """
+
+    # unique placeholder where each recipient player_id is spliced into the json document
+    PLAYER_ID_PLACEHOLDER = "\x00player_id\x00"
+
+    def __init__(self, game_state: GameState) -> None:
+        self.version = game_state.version
+        self.players_key = players_key(game_state)
+        self.map = game_map_to_list(game_state.game_map)
+        self._pretty_map: Optional[str] = None
+        self._players: Dict[bool, List[dict]] = {
+            True: [player_state_to_dict(p, with_history=True) for p in game_state.players]
+        }
+        self._json: Dict[Tuple[int, int, bool, bool], Tuple[str, str]] = {}
+        self._deltas: Dict[Tuple[int, Tuple], Tuple[List[dict], List[dict]]] = {}
+        self._binary: Optional[bytes] = None
+
+    def pretty_map(self) -> str:
+        if self._pretty_map is None:
+            self._pretty_map = generate_pretty_map_from_players(self.map, self._players[True])
+        return self._pretty_map
+
+    def players(self, with_history: bool = True) -> List[dict]:
+        if with_history not in self._players:
+            self._players[with_history] = [{**p, "history": []} for p in self._players[True]]
+        return self._players[with_history]
+
+    def to_dict(
+        self,
+        game_tick: int,
+        player_id: Optional[int],
+        ticks_left: int,
+        with_history: bool = True,
+        with_pretty_map: bool = True,
+    ) -> dict:
+        game: Dict = {"map": self.map}
+        if with_pretty_map:
+            game["pretty_map"] = self.pretty_map()
+        game.update({"player_id": player_id, "tick": game_tick, "ticks_left": ticks_left})
+        return {"type": "tick", "game": game, "players": self.players(with_history)}
+
+    def to_json(
+        self,
+        game_tick: int,
+        player_id: Optional[int],
+        ticks_left: int,
+        with_pretty_map: bool = True,
+        compact: bool = False,
+    ) -> str:
+        key = (game_tick, ticks_left, with_pretty_map, compact)
+        if key not in self._json:
+            placeholder: Any = self.PLAYER_ID_PLACEHOLDER
+            payload = self.to_dict(game_tick, placeholder, ticks_left, with_pretty_map=with_pretty_map)
+            document = to_json(payload, compact)
+            # the placeholder is in the "game" object, before any user provided string
+            prefix, _, suffix = document.partition(to_json(self.PLAYER_ID_PLACEHOLDER, compact))
+            self._json[key] = (prefix, suffix)
+
+        prefix, suffix = self._json[key]
+        return f"{prefix}{json.dumps(player_id)}{suffix}"
+
+    def to_binary(self, game_tick: int, player_id: Optional[int], ticks_left: int) -> bytes:
+        """
+        The tick message in the binary format, see `encode_binary_tick`
+        """
+        if self._binary is None:
+            self._binary = encode_binary_body(self.map, self._players[True])
+        header = BINARY_HEADER.pack(
+            BINARY_MAGIC, BINARY_VERSION, len(self.map), _binary_player_id(player_id), game_tick, ticks_left
+        )
+        return header + self._binary
+
+    def to_delta_dict(
+        self,
+        previous: "GameStateSnapshot",
+        base_tick: int,
+        game_tick: int,
+        player_id: Optional[int],
+        ticks_left: int,
+        with_pretty_map: bool = True,
+    ) -> dict:
+        """
+        The changes since the previous snapshot of the same game state, see `tick_delta`
+
+        The changed tiles and players are computed once for all the recipients of the same previous snapshot.
+        """
+        key = (previous.version, previous.players_key)
+        if key not in self._deltas:
+            self._deltas[key] = (
+                map_delta(previous.map, self.map),
+                players_delta(previous.players(), self.players()),
+            )
+        tiles, players = self._deltas[key]
+
+        game: Dict = {"base_tick": base_tick, "tiles": tiles}
+        if with_pretty_map:
+            game["pretty_map"] = self.pretty_map()
+        game.update({"player_id": player_id, "tick": game_tick, "ticks_left": ticks_left})
+        return {"type": "delta", "game": game, "players": players}
+
+
+_snapshots: "weakref.WeakKeyDictionary[GameState, GameStateSnapshot]" = weakref.WeakKeyDictionary()
+
+
+def players_key(game_state: GameState) -> Tuple[Tuple[bool, int], ...]:
+    """
+    The serialized parts of the players changed without changing the game state version: the active flags (a player
+    leaving the game) and the number of history items added (a player asked again for the same tick)
+    """
+    return tuple((p.active, p.nb_history_items) for p in game_state.players)
+
+
+def tick_snapshot(game_state: GameState) -> GameStateSnapshot:
+    """
+    Get the snapshot of the current game state, shared by the players, viewers and recorders
+
+    The snapshot is rebuilt whenever the game state version or the `players_key` changes.
+    """
+    snapshot = _snapshots.get(game_state)
+    if snapshot is None or snapshot.version != game_state.version or snapshot.players_key != players_key(game_state):
+        snapshot = GameStateSnapshot(game_state)
+        _snapshots[game_state] = snapshot
+    return snapshot
 
 
 def generate_pretty_map_from_game_state(map: List[List[str]], game_state: GameState) -> str:
-    map_size = game_state.game_map.size
+    players = [(p.id, (p.position.x, p.position.y), [(t.x, t.y) for t in p.tail]) for p in game_state.players]
+    return generate_pretty_map(map, players)
+
+
+def generate_pretty_map_from_tick(tick: Dict) -> str:
+    """
+    Generate the pretty map of a tick message, as it was sent with the message
+    """
+    return generate_pretty_map_from_players(tick["game"]["map"], tick["players"])
+
+
+def generate_pretty_map_from_players(map: List[List[str]], players: List[Dict]) -> str:
+    """
+    Generate the pretty map of a serialized map and players, see `player_state_to_dict`
+    """
+    return generate_pretty_map(
+        map,
+        [(p["id"], (p["position"]["x"], p["position"]["y"]), [(t["x"], t["y"]) for t in p["tail"]]) for p in players],
+    )
+
+
+def generate_pretty_map(
+    map: List[List[str]], players: List[Tuple[int, Tuple[int, int], List[Tuple[int, int]]]]
+) -> str:
+    map_size = len(map)
     pretty_map = [row.copy() for row in map]
 
     for y in range(len(pretty_map)):
@@ -137,14 +332,12 @@ def generate_pretty_map_from_game_state(map: List[List[str]], game_state: GameSt
             pretty_map[y][x] = pretty_map[y][x].strip()
             pretty_map[y][x] = pretty_map[y][x].replace("-", "")
 
-    for player in game_state.players:
-        y_position = player.position.y
-        x_position = player.position.x
-        player_id = str(player.id)
+    for id, (x_position, y_position), tail in players:
+        player_id = str(id)
 
-        for tail_tile in player.tail[:-1]:
-            if "P" not in pretty_map[tail_tile.y][tail_tile.x]:
-                pretty_map[tail_tile.y][tail_tile.x] += "T" + player_id
+        for tail_x, tail_y in tail[:-1]:
+            if "P" not in pretty_map[tail_y][tail_x]:
+                pretty_map[tail_y][tail_x] += "T" + player_id
 
         pretty_map[y_position][x_position] += "P" + player_id
 
@@ -162,9 +355,16 @@ def generate_pretty_map_from_game_state(map: List[List[str]], game_state: GameSt
     return f'{pretty}\n{disclaimer}'
 
 
-def game_state_to_json(game_tick: int, player_id: Optional[int], game_state: GameState, ticks_left: int) -> str:
-    tick_payload = game_state_to_dict(game_tick, player_id, game_state, ticks_left)
-    return json.dumps(tick_payload, indent=2)
+def game_state_to_json(
+    game_tick: int,
+    player_id: Optional[int],
+    game_state: GameState,
+    ticks_left: int,
+    with_pretty_map: bool = True,
+    compact: bool = False,
+) -> str:
+    tick_payload = game_state_to_dict(game_tick, player_id, game_state, ticks_left, with_pretty_map=with_pretty_map)
+    return to_json(tick_payload, compact)
 
 
 def dict_to_game_state(data: Dict) -> Tuple[int, GameState, int]:
@@ -173,3 +373,322 @@ def dict_to_game_state(data: Dict) -> Tuple[int, GameState, int]:
     gs = GameState(gm, players)
     gs.game_tick = data["game"]["tick"]
     return (data["game"]["player_id"], gs, data["game"]["ticks_left"])
+
+
+PROTOCOL_FULL = 1  # every tick message has the full game state
+PROTOCOL_DELTA = 2  # a full keyframe followed by deltas, see `tick_delta`
+PROTOCOL_BINARY = 3  # every tick message is a binary frame with the full game state, see `encode_binary_tick`
+protocols = [PROTOCOL_FULL, PROTOCOL_DELTA, PROTOCOL_BINARY]
+
+# Binary tick frame, all numbers are little endian:
+# - header: magic, format version, map size, player id (-1 for viewers), tick, ticks left
+# - map: size * size tile kinds (uint8, see `binary_tile_kinds`), then size * size tile owners (uint8, 255 for none)
+# - number of players (uint8), then for each player:
+#   - id, flags (1: active, 2: killed), position, spawn position, direction, spawn direction (index in
+#     `directions`), score (float64) and tail length
+#   - the tail positions (uint16 x, y)
+#   - the name (uint16 length + utf-8)
+#   - the stats and history (uint32 length + compact json object)
+BINARY_MAGIC = b"BLTZ"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sBHhIi")
+BINARY_PLAYER = struct.Struct("<BBHHHHBBdH")
+BINARY_NO_OWNER = 255
+binary_tile_kinds = ArrayGameMap.kind_states
+
+
+def _binary_player_id(player_id: Optional[int]) -> int:
+    return -1 if player_id is None else player_id
+
+
+# tile of a serialized map ("%", "C-1", "%-1", ...) -> (kind, owner) in the binary format
+_binary_tiles: Dict[str, Tuple[int, int]] = {}
+
+
+def _binary_tile(tile: str) -> Tuple[int, int]:
+    if tile not in _binary_tiles:
+        state, _, owner = tile.partition("-")
+        kind = ArrayGameMap.state_kinds[GameMap.EMPTY if state == "C" else state]
+        _binary_tiles[tile] = (kind, int(owner) if owner else BINARY_NO_OWNER)
+    return _binary_tiles[tile]
+
+
+def encode_binary_map(map: List[List[str]]) -> bytes:
+    """
+    Encode a serialized map (see `game_map_to_list`), the tile kinds then the tile owners
+    """
+    tiles = [_binary_tile(tile) for row in map for tile in row]
+    return bytes(kind for kind, _ in tiles) + bytes(owner for _, owner in tiles)
+
+
+def encode_binary_body(map: List[List[str]], players: List[Dict]) -> bytes:
+    """
+    Encode a serialized map and players (see `player_state_to_dict`), the body of a binary tick frame
+    """
+    chunks = [encode_binary_map(map), struct.pack("<B", len(players))]
+    for p in players:
+        tail = p["tail"]
+        chunks.append(
+            BINARY_PLAYER.pack(
+                p["id"],
+                p["active"] | (p["killed"] << 1),
+                p["position"]["x"],
+                p["position"]["y"],
+                p["spawn_position"]["x"],
+                p["spawn_position"]["y"],
+                Direction(p["direction"]).dir,
+                Direction(p["spawn_direction"]).dir,
+                p["score"],
+                len(tail),
+            )
+        )
+        chunks.append(struct.pack(f"<{2 * len(tail)}H", *(c for t in tail for c in (t["x"], t["y"]))))
+        name = p["name"].encode("utf-8")
+        chunks.append(struct.pack("<H", len(name)) + name)
+        extra = to_json({"stats": p["stats"], "history": p["history"]}, compact=True).encode("utf-8")
+        chunks.append(struct.pack("<I", len(extra)) + extra)
+    return b"".join(chunks)
+
+
+def encode_binary_tick(game_tick: int, player_id: Optional[int], game_state: GameState, ticks_left: int) -> bytes:
+    """
+    Encode a tick message in the binary frame format, it has the same content as `game_state_to_dict`
+    without the pretty map
+    """
+    return GameStateSnapshot(game_state).to_binary(game_tick, player_id, ticks_left)
+
+
+def decode_binary_tick(frame: bytes) -> dict:
+    """
+    Decode a binary tick frame into a tick message dict, same format as `game_state_to_dict`
+    """
+    magic, version, size, player_id, tick, ticks_left = BINARY_HEADER.unpack_from(frame)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise Exception(f"Invalid binary tick frame: {magic!r} version {version}")
+    offset = BINARY_HEADER.size
+
+    nb_tiles = size * size
+    kinds = frame[offset : offset + nb_tiles]
+    owners = frame[offset + nb_tiles : offset + 2 * nb_tiles]
+    offset += 2 * nb_tiles
+    map = []
+    for y in range(size):
+        row = []
+        for index in range(y * size, (y + 1) * size):
+            tile = binary_tile_kinds[kinds[index]]
+            if owners[index] != BINARY_NO_OWNER:
+                tile = f"{'C' if tile == GameMap.EMPTY else tile}-{owners[index]}"
+            row.append(tile)
+        map.append(row)
+
+    (nb_players,) = struct.unpack_from("<B", frame, offset)
+    offset += 1
+    players = []
+    for _ in range(nb_players):
+        id, flags, x, y, spawn_x, spawn_y, direction, spawn_direction, score, tail_size = BINARY_PLAYER.unpack_from(
+            frame, offset
+        )
+        offset += BINARY_PLAYER.size
+        tail = struct.unpack_from(f"<{2 * tail_size}H", frame, offset)
+        offset += 4 * tail_size
+        (name_size,) = struct.unpack_from("<H", frame, offset)
+        name = frame[offset + 2 : offset + 2 + name_size].decode("utf-8")
+        offset += 2 + name_size
+        (extra_size,) = struct.unpack_from("<I", frame, offset)
+        extra = json.loads(frame[offset + 4 : offset + 4 + extra_size].decode("utf-8"))
+        offset += 4 + extra_size
+
+        players.append(
+            {
+                "active": bool(flags & 1),
+                "killed": bool(flags & 2),
+                "position": {"x": x, "y": y},
+                "spawn_position": {"x": spawn_x, "y": spawn_y},
+                "direction": directions[direction][0],
+                "spawn_direction": directions[spawn_direction][0],
+                "tail": [{"x": tail[i], "y": tail[i + 1]} for i in range(0, len(tail), 2)],
+                "id": id,
+                "name": name,
+                "score": score,
+                "stats": extra["stats"],
+                "history": extra["history"],
+            }
+        )
+
+    return {
+        "type": "tick",
+        "game": {"map": map, "player_id": player_id, "tick": tick, "ticks_left": ticks_left},
+        "players": players,
+    }
+
+
+def map_delta(previous: List[List[str]], current: List[List[str]]) -> List[dict]:
+    tiles = []
+    for y, (previous_row, row) in enumerate(zip(previous, current)):
+        if previous_row != row:
+            for x, (previous_tile, tile) in enumerate(zip(previous_row, row)):
+                if previous_tile != tile:
+                    tiles.append({"x": x, "y": y, "tile": tile})
+    return tiles
+
+
+def player_delta(previous: dict, current: dict) -> dict:
+    changes = {}
+    for key, value in current.items():
+        if key == "tail":
+            previous_tail = previous["tail"]
+            if len(value) > len(previous_tail) and value[: len(previous_tail)] == previous_tail:
+                changes["tail_append"] = value[len(previous_tail) :]
+            elif value != previous_tail:
+                changes["tail"] = value
+        elif key == "history":
+            # new items are added first and the oldest items are dropped from the end
+            previous_history = previous["history"]
+            if value != previous_history:
+                nb_new = next(n for n in range(len(value) + 1) if value[n:] == previous_history[: len(value) - n])
+                if nb_new < len(value):
+                    changes["history_prepend"] = value[:nb_new]
+                    changes["history_size"] = len(value)
+                else:
+                    changes["history"] = value
+        elif previous.get(key) != value:
+            changes[key] = value
+    return changes
+
+
+def players_delta(previous: List[dict], current: List[dict]) -> List[dict]:
+    previous_by_id = {p["id"]: p for p in previous}
+    players = []
+    for player in current:
+        if player["id"] not in previous_by_id:
+            players.append(player)
+        else:
+            changes = player_delta(previous_by_id[player["id"]], player)
+            if changes:
+                players.append({"id": player["id"], **changes})
+    return players
+
+
+def tick_delta(previous: dict, current: dict) -> dict:
+    """
+    Compute the delta message turning the previous tick message into the current one
+
+    The "game" object has the changed tiles (x, y and tile) instead of the map and the "base_tick" the delta
+    applies to. Only the changed players are listed, with their id and changed fields. Tails are extended
+    with "tail_append" and the new history items are listed in "history_prepend" with the resulting
+    "history_size", otherwise the whole field is sent.
+
+    Parameters
+    ----------
+    previous : dict
+        The previous tick message, as returned by `game_state_to_dict`
+    current : dict
+        The current tick message
+    """
+    game = {key: value for key, value in current["game"].items() if key != "map"}
+    game["base_tick"] = previous["game"]["tick"]
+    game["tiles"] = map_delta(previous["game"]["map"], current["game"]["map"])
+    return {"type": "delta", "game": game, "players": players_delta(previous["players"], current["players"])}
+
+
+def apply_tick_delta(previous: dict, delta: dict) -> dict:
+    """
+    Rebuild a full tick message from the previous one and a delta message, the previous message is not modified
+    """
+    if delta["game"]["base_tick"] != previous["game"]["tick"]:
+        raise Exception(f"Delta for tick {delta['game']['base_tick']} applied on tick {previous['game']['tick']}")
+
+    map = [row.copy() for row in previous["game"]["map"]]
+    for tile in delta["game"]["tiles"]:
+        map[tile["y"]][tile["x"]] = tile["tile"]
+    game = {"map": map}
+    game.update((key, value) for key, value in delta["game"].items() if key not in ("base_tick", "tiles"))
+
+    players = [dict(p) for p in previous["players"]]
+    players_by_id = {p["id"]: p for p in players}
+    for changes in delta["players"]:
+        player = players_by_id.get(changes["id"])
+        if player is None:
+            player = dict(changes)
+            players.append(player)
+            continue
+        for key, value in changes.items():
+            if key == "tail_append":
+                player["tail"] = player["tail"] + value
+            elif key == "history_prepend":
+                player["history"] = (value + player["history"])[: changes["history_size"]]
+            elif key != "history_size":
+                player[key] = value
+
+    return {"type": "tick", "game": game, "players": players}
+
+
+class TickEncoder:
+    """
+    Encode the tick messages sent to one player or viewer
+
+    With the delta protocol, the first message and one message every `keyframe_interval` are full tick
+    messages, the others only have the changes since the previous message sent to the same client.
+    With the binary protocol, the messages are binary frames without the pretty map.
+
+    Parameters
+    ----------
+    with_pretty_map : bool
+        Add the pretty map to the messages
+    compact : bool
+        Encode compact json documents, see `to_json`
+    protocol : int
+        PROTOCOL_FULL, PROTOCOL_DELTA or PROTOCOL_BINARY
+    keyframe_interval : int
+        Number of messages between two full messages with the delta protocol
+    """
+
+    DEFAULT_KEYFRAME_INTERVAL = 50
+
+    def __init__(
+        self,
+        with_pretty_map: bool = True,
+        compact: bool = False,
+        protocol: int = PROTOCOL_FULL,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    ) -> None:
+        if protocol not in protocols:
+            raise Exception(f"Invalid protocol: '{protocol}'")
+        self.with_pretty_map = with_pretty_map
+        self.compact = compact
+        self.protocol = protocol
+        self.keyframe_interval = keyframe_interval
+        self.previous: Optional[GameStateSnapshot] = None
+        self.previous_tick = 0
+        self.messages_since_keyframe = 0
+
+    def reset(self) -> None:
+        """
+        Send a full message next time, when the client may have missed the last message
+        """
+        self.previous = None
+
+    def encode(
+        self, game_tick: int, player_id: Optional[int], game_state: GameState, ticks_left: int
+    ) -> Union[str, bytes]:
+        snapshot = tick_snapshot(game_state)
+        if self.protocol == PROTOCOL_BINARY:
+            return snapshot.to_binary(game_tick, player_id, ticks_left)
+
+        if (
+            self.protocol == PROTOCOL_DELTA
+            and self.previous is not None
+            and self.messages_since_keyframe < self.keyframe_interval
+        ):
+            payload = snapshot.to_delta_dict(
+                self.previous, self.previous_tick, game_tick, player_id, ticks_left, self.with_pretty_map
+            )
+            message = to_json(payload, self.compact)
+            self.messages_since_keyframe += 1
+        else:
+            message = snapshot.to_json(game_tick, player_id, ticks_left, self.with_pretty_map, self.compact)
+            self.messages_since_keyframe = 1
+
+        self.previous = snapshot
+        self.previous_tick = game_tick
+        return message
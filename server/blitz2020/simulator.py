@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+import asyncio
+import glob
+import importlib
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import configargparse
+import numpy as np
+
+from blitz2020.game.abstract_player import AbstractPlayer
+from blitz2020.game.array_game_map import ArrayGameMap
+from blitz2020.game.game_config import GameConfig
+from blitz2020.game.game_map import GameMap
+from blitz2020.servers.local_game_server import LocalGameServer
+
+GAME_PRESETS_PATH = Path(__file__).parent.parent / "game_presets"
+
+DEFAULT_PLAYER = "blitz2020.players.random_player:RandomPlayer"
+
+
+def load_player_class(player_class: str) -> Type[AbstractPlayer]:
+    """
+    Import a player class given as "module:Class"
+    """
+    module_name, _, class_name = player_class.partition(":")
+    cls = getattr(importlib.import_module(module_name), class_name, None)
+    if not isinstance(cls, type) or not issubclass(cls, AbstractPlayer):
+        raise Exception(f"Invalid player class: '{player_class}'")
+    return cls
+
+
+def parse_player(player: str, index: int) -> Tuple[str, str]:
+    """
+    Parse a player given as "[name=]module:Class", the default name is the class name and the player index
+    """
+    name, _, player_class = player.rpartition("=")
+    return name or f"{player_class.rpartition(':')[2]}-{index}", player_class
+
+
+def nb_spawn_positions(map_file: str) -> int:
+    return len(GameConfig.from_file(Path(map_file)).spawn_positions)
+
+
+def run_game(
+    map_file: str, players: List[Tuple[str, str]], max_nb_ticks: int, seed: int, array_map: bool = False
+) -> Dict[str, Any]:
+    """
+    Play a game in this process and return its result
+
+    Parameters
+    ----------
+    map_file : str
+        The game preset
+    players : List[Tuple[str, str]]
+        The name and class ("module:Class") of the players, in spawn order
+    seed : int
+        The seed of the random generators, the game is reproducible when the players only use them
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+
+    game_map_class = ArrayGameMap if array_map else GameMap
+    game_config = GameConfig.from_file(Path(map_file), game_map_class)
+    server = LocalGameServer(
+        [load_player_class(player_class)(name) for name, player_class in players],
+        max_nb_ticks=max_nb_ticks,
+        game_config=game_config,
+    )
+
+    start = time.perf_counter()
+    asyncio.run(server.run())
+    duration = time.perf_counter() - start
+
+    # game_loop sorts the players by score
+    return {
+        "map": os.path.basename(map_file),
+        "seed": seed,
+        "nb_ticks": server.game.game_tick,
+        "duration": duration,
+        "players": [
+            {
+                "name": player.name,
+                "spawn": player.player_state.id,
+                "rank": rank,
+                "score": player.player_state.score,
+                "stats": dict(player.player_state.stats.stats),
+            }
+            for rank, player in enumerate(server.game.players, start=1)
+        ],
+    }
+
+
+def run_game_args(args: Tuple) -> Dict[str, Any]:
+    return run_game(*args)
+
+
+def simulate(
+    nb_games: int,
+    players: List[str],
+    map_files: List[str],
+    max_nb_ticks: int = 1000,
+    nb_processes: Optional[int] = None,
+    seed: int = 0,
+    array_map: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Play nb_games games in parallel and return their results (see `run_game`)
+
+    The games cycle through the maps accepting all the players, and the spawn positions rotate between the
+    players from one game to the next.
+
+    Parameters
+    ----------
+    players : List[str]
+        The players, as "[name=]module:Class"
+    nb_processes : int
+        The number of worker processes, the number of cores by default, 1 to play in this process
+    """
+    named_players = [parse_player(player, index) for index, player in enumerate(players)]
+    map_files = [map_file for map_file in map_files if nb_spawn_positions(map_file) >= len(players)]
+    if not map_files:
+        raise Exception(f"No map with {len(players)} spawn positions")
+
+    games = []
+    for game in range(nb_games):
+        shift = game % len(named_players)
+        order = named_players[shift:] + named_players[:shift]
+        games.append((map_files[game % len(map_files)], order, max_nb_ticks, seed + game, array_map))
+
+    if nb_processes == 1:
+        return [run_game_args(game) for game in games]
+
+    with ProcessPoolExecutor(nb_processes) as executor:
+        chunksize = max(1, nb_games // (4 * (nb_processes or os.cpu_count() or 1)))
+        return list(executor.map(run_game_args, games, chunksize=chunksize))
+
+
+def aggregate_results(results: List[Dict[str, Any]], wall_time: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Aggregate game results: win rate, rank and score distribution of every player and the simulation speed
+
+    wall_time is the duration of the whole simulation, the parallel throughput is only reported when it is given.
+    """
+    nb_ticks = sum(result["nb_ticks"] for result in results)
+    game_time = sum(result["duration"] for result in results)
+
+    scores: Dict[str, List[float]] = {}
+    ranks: Dict[str, List[int]] = {}
+    for result in results:
+        for player in result["players"]:
+            scores.setdefault(player["name"], []).append(player["score"])
+            ranks.setdefault(player["name"], []).append(player["rank"])
+
+    players = {}
+    for name in sorted(scores):
+        player_scores = np.array(scores[name])
+        player_ranks = np.array(ranks[name])
+        players[name] = {
+            "nb_games": len(player_scores),
+            "nb_wins": int(np.count_nonzero(player_ranks == 1)),
+            "win_rate": float(np.mean(player_ranks == 1)),
+            "mean_rank": float(np.mean(player_ranks)),
+            "score": {
+                "mean": float(np.mean(player_scores)),
+                "std": float(np.std(player_scores)),
+                "min": float(np.min(player_scores)),
+                "p25": float(np.percentile(player_scores, 25)),
+                "median": float(np.median(player_scores)),
+                "p75": float(np.percentile(player_scores, 75)),
+                "max": float(np.max(player_scores)),
+            },
+        }
+
+    summary: Dict[str, Any] = {
+        "nb_games": len(results),
+        "nb_ticks": nb_ticks,
+        "ticks_per_second": nb_ticks / game_time if game_time > 0 else None,
+        "players": players,
+    }
+    if wall_time is not None:
+        summary["wall_time"] = wall_time
+        summary["total_ticks_per_second"] = nb_ticks / wall_time if wall_time > 0 else None
+    return summary
+
+
+def main() -> None:
+    parser = configargparse.ArgumentParser(description="Blitz 2020 headless game simulator")
+    parser.add_argument("--nb_games", help="Number of games to play", type=int, default=100)
+    parser.add_argument(
+        "--players",
+        help=f"The players, as [name=]module:Class (default: 4 x {DEFAULT_PLAYER})",
+        nargs="+",
+        default=[DEFAULT_PLAYER] * 4,
+    )
+    parser.add_argument(
+        "--maps",
+        help="Glob of the game presets to play on, the maps without enough spawn positions are skipped",
+        type=str,
+        default="practice-*",
+    )
+    parser.add_argument("--max_nb_ticks", help="Set a maximum number of game ticks.", type=int, default=500)
+    parser.add_argument(
+        "--nb_processes", help="Number of worker processes, the number of cores by default", type=int, default=None
+    )
+    parser.add_argument("--seed", help="Seed of the first game, incremented for every game", type=int, default=0)
+    parser.add_argument(
+        "--map_storage",
+        help="Select the map storage: lists of tiles or NumPy arrays",
+        type=str,
+        default="list",
+        choices=["list", "array"],
+    )
+    parser.add_argument("--output", help="Write the result of every game to this json file", type=str, default=None)
+    parser.add_argument(
+        "--log_level",
+        help="Set the log level",
+        type=str,
+        default="WARNING",
+        choices=["CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"],
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+
+    map_files = sorted(glob.glob(str(GAME_PRESETS_PATH / args.maps)))
+    start = time.perf_counter()
+    results = simulate(
+        args.nb_games,
+        args.players,
+        map_files,
+        max_nb_ticks=args.max_nb_ticks,
+        nb_processes=args.nb_processes,
+        seed=args.seed,
+        array_map=args.map_storage == "array",
+    )
+    summary = aggregate_results(results, time.perf_counter() - start)
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump({"summary": summary, "games": results}, file)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
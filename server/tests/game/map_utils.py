@@ -1,7 +1,14 @@
-from typing import List
+import random
+from typing import List, Type
+from unittest.mock import patch
 
+from blitz2020.game.action import Action
+from blitz2020.game.array_game_map import ArrayGameMap
+from blitz2020.game.game_config import GameConfig
 from blitz2020.game.game_map import GameMap
+from blitz2020.game.game_state import GameState
 from blitz2020.game.position import Position
+from blitz2020.simulator import GAME_PRESETS_PATH
 
 P = -3
 W = -2
@@ -9,10 +16,10 @@ E = -1
 P1 = -4
 
 
-def create_map_with(map_data: List[List[int]]) -> GameMap:
+def create_map_with(map_data: List[List[int]], game_map_class: Type[GameMap] = GameMap) -> GameMap:
     data_size = len(map_data)
     assert data_size == len(map_data[0])
-    game_map = GameMap(data_size + 2)
+    game_map = game_map_class(data_size + 2)
     for y in range(data_size):
         for x in range(data_size):
             pos = Position(x + 1, y + 1)
@@ -27,3 +34,21 @@ def create_map_with(map_data: List[List[int]]) -> GameMap:
             else:
                 game_map.conquer_tile(pos, player_id=map_data[y][x])
     return game_map
+
+
+def create_game_state(game_map_class: Type[GameMap] = ArrayGameMap) -> GameState:
+    game_config = GameConfig.from_file(GAME_PRESETS_PATH / "practice-4p-0.txt", game_map_class)
+    game_state = GameState(game_config)
+    for player in range(4):
+        game_state.add_player(f"player-{player}")
+    return game_state
+
+
+def play(game_state: GameState, nb_ticks: int, rng: random.Random) -> None:
+    # rng also drives the relocations of the game so the global generator is neither used nor seeded
+    with patch("blitz2020.game.game_state.random", rng):
+        for _ in range(nb_ticks):
+            tick = game_state.game_tick + 1
+            for player in game_state.players:
+                game_state.apply_action(tick, player, rng.choice(list(Action)))
+            game_state.update_players_scores()
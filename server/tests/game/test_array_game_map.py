@@ -0,0 +1,76 @@
+import copy
+import random
+import unittest
+
+import tests.game.test_game_map as test_game_map
+from blitz2020.game.array_game_map import ArrayGameMap
+from blitz2020.game.game_map import GameMap
+from blitz2020.game.position import Position
+from tests.game.map_utils import create_map_with, E, P, P1, W
+
+
+class TestArrayMap(test_game_map.TestMap):
+    game_map_class = ArrayGameMap
+
+    def create_random_maps(self, size: int = 12):
+        random.seed(123)
+        game_map = GameMap(size)
+        for _ in range(size * size):
+            pos = Position(random.randint(1, size - 2), random.randint(1, size - 2))
+            state = random.choice([GameMap.EMPTY, GameMap.PLANET, GameMap.BLITZIUM, GameMap.BLACK_HOLE])
+            if game_map.is_empty(pos):
+                game_map.set_tile(pos, state)
+            if not game_map.is_blitzium(pos) and not game_map.is_black_hole(pos):
+                game_map.conquer_tile(pos, random.randint(0, 3))
+        return game_map, ArrayGameMap.from_game_map(game_map)
+
+    def test_same_tiles_as_list_map(self):
+        list_map = create_map_with([[E, W, P], [P1, 1, 2], [E, 3, E]])
+        array_map = create_map_with([[E, W, P], [P1, 1, 2], [E, 3, E]], ArrayGameMap)
+        self.assertEqual(list_map.tiles, array_map.tiles)
+        self.assertEqual(str(list_map), str(array_map))
+        self.assertEqual(list_map, array_map)
+        self.assertEqual(array_map, list_map)
+        self.assertEqual(array_map, ArrayGameMap.from_game_map(list_map))
+
+    def test_tiles_view(self):
+        game_map = create_map_with([[E, W, P], [P1, 1, 2], [E, 3, E]], ArrayGameMap)
+        tiles = game_map.tiles
+        self.assertIs(game_map.tiles, tiles)
+
+        # the view is rebuilt once the map changed
+        game_map.conquer_tile(Position(1, 1), 2)
+        self.assertIsNot(game_map.tiles, tiles)
+        self.assertEqual(game_map.tiles[1][1], (GameMap.EMPTY, 2))
+
+        game_map.clear_tile_owned_by(2)
+        self.assertEqual(game_map.tiles[1][1], GameMap.empty_tile)
+
+        game_map.kinds[1, 1] = ArrayGameMap.PLANET_KIND
+        game_map.invalidate_tiles()
+        self.assertEqual(game_map.tiles[1][1], (GameMap.PLANET, None))
+
+    def test_deepcopy(self):
+        game_map = create_map_with([[E, W, P], [P1, 1, 2], [E, 3, E]], ArrayGameMap)
+        copied = copy.deepcopy(game_map)
+        self.assertIsInstance(copied, ArrayGameMap)
+        self.assertEqual(game_map, copied)
+
+        copied.conquer_tile(Position(1, 1), 2)
+        self.assertNotEqual(game_map, copied)
+        self.assertTrue(game_map.is_empty(Position(1, 1)))
+
+    def test_bulk_operations(self):
+        list_map, array_map = self.create_random_maps()
+
+        self.assertEqual(list_map.get_empty_tiles(), array_map.get_empty_tiles())
+        for player_id in range(4):
+            self.assertEqual(list_map.owned_tiles.get(player_id), array_map.owned_tiles.get(player_id))
+            self.assertEqual(list_map.count_tiles_owned_by(player_id), array_map.count_tiles_owned_by(player_id))
+            self.assertEqual(list_map.count_planets_owned_by(player_id), array_map.count_planets_owned_by(player_id))
+
+        for player_id in range(4):
+            list_map.clear_tile_owned_by(player_id)
+            array_map.clear_tile_owned_by(player_id)
+            self.assertEqual(list_map.tiles, array_map.tiles)
+            self.assertEqual(list_map.empty_tiles, array_map.empty_tiles)
@@ -1,6 +1,6 @@
 import unittest
 
-from blitz2020.game.flood import flood
+from blitz2020.game.flood import flood, enclosed_tiles
 
 
 class TestFlood(unittest.TestCase):
@@ -92,3 +92,41 @@ class TestFlood(unittest.TestCase):
         number = 1000
         elapsed = timeit.timeit(lambda: self.simple_flood(), number=number)
         # print(elapsed)
+
+
+class TestEnclosedTiles(unittest.TestCase):
+    def test_no_borders(self):
+        self.assertEqual(enclosed_tiles(5, []), [])
+
+    def test_closed_box(self):
+        # fmt: off
+        borders = [
+            6, 7, 8,
+            11,    13,
+            16, 17, 18
+        ]
+        # fmt: on
+        self.assertEqual(enclosed_tiles(5, borders), [12])
+
+    def test_closed_box_corner(self):
+        # The top-left corner is always outside, the map is surrounded by asteroids
+        borders = [1, 6, 11, 16, 17, 18, 19]
+        self.assertEqual(enclosed_tiles(5, borders), [2, 3, 4, 7, 8, 9, 12, 13, 14])
+
+    def test_open_path(self):
+        borders = [6, 11, 16, 17, 18]
+        self.assertEqual(enclosed_tiles(5, borders), [])
+
+    def test_same_as_flood(self):
+        map_size = 21
+        borders = [y * map_size + 5 for y in range(3, 12)] + [y * map_size + 9 for y in range(3, 12)]
+        borders += [3 * map_size + x for x in range(5, 10)] + [11 * map_size + x for x in range(5, 10)]
+
+        flooded_tiles = [[1] * map_size for _ in range(map_size)]
+        for index in borders:
+            flooded_tiles[index // map_size][index % map_size] = 0
+        flood(flooded_tiles, 1, 0)
+        expected = [y * map_size + x for y in range(map_size) for x in range(map_size) if flooded_tiles[y][x] == 1]
+
+        self.assertEqual(enclosed_tiles(map_size, borders), expected)
+        self.assertEqual(len(expected), 7 * 3)
@@ -142,6 +142,32 @@ class TestGame(unittest.TestCase):
         game.unregister_recorder(recorder)
         self.assertEqual(len(game.recorders), 0)
 
+    def test_game_delay_does_not_block_loop(self):
+        game = get_game(max_nb_ticks=10)
+        game.delay = 20
+        game.register_player(RandomPlayer())
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            wakeups = 0
+
+            async def other():
+                nonlocal wakeups
+                while True:
+                    await asyncio.sleep(0.005)
+                    wakeups += 1
+
+            task = asyncio.create_task(other())
+            await game.game_loop()
+            task.cancel()
+            return loop.time() - start, wakeups
+
+        duration, wakeups = asyncio.run(run())
+        # 10 ticks with a 20ms period
+        self.assertGreaterEqual(duration, game.max_nb_ticks * 0.02 * 0.9)
+        self.assertGreater(wakeups, game.max_nb_ticks)
+
 
 def print_scores(game: Game):
     print("----------------")
@@ -7,9 +7,11 @@ from tests.game.map_utils import create_map_with, W, E
 
 
 class TestMap(unittest.TestCase):
+    game_map_class = GameMap
+
     def setUp(self):
         self.map_size = 10
-        self.my_map = GameMap(self.map_size)
+        self.my_map = self.game_map_class(self.map_size)
 
     def test_init_with_empty_map(self):
         """
@@ -40,13 +42,14 @@ class TestMap(unittest.TestCase):
                     self.assertEqual(self.my_map.get_tile(Position(x=x, y=y)), (GameMap.EMPTY, None))
 
     def test_eq(self):
-        self.assertEqual(GameMap(5), GameMap(5))
-        self.assertNotEqual(GameMap(5), GameMap(6))
+        self.assertEqual(self.game_map_class(5), self.game_map_class(5))
+        self.assertNotEqual(self.game_map_class(5), self.game_map_class(6))
 
         map_data1 = [[E, W, W], [E, 1, 2], [E, 3, E]]
         map_data2 = [[E, W, W], [E, 2, 3], [E, 1, E]]
-        self.assertEqual(create_map_with(map_data1), create_map_with(map_data1))
-        self.assertNotEqual(create_map_with(map_data1), create_map_with(map_data2))
+        map1 = create_map_with(map_data1, self.game_map_class)
+        self.assertEqual(map1, create_map_with(map_data1, self.game_map_class))
+        self.assertNotEqual(map1, create_map_with(map_data2, self.game_map_class))
 
     def test_str(self):
         map = create_map_with(
@@ -56,7 +59,8 @@ class TestMap(unittest.TestCase):
                 [E, 0, E],
                 [E, E, 1]
                 # fmt: on
-            ]
+            ],
+            self.game_map_class,
         )
         map.set_tile(Position(2, 1), state=GameMap.PLANET, player_id=0)
         map.set_tile(Position(3, 1), state=GameMap.BLACK_HOLE)
@@ -221,8 +225,13 @@ class TestMap(unittest.TestCase):
         self.my_map.conquer_tile(Position(1, 5), player_id=2)
         self.assertEqual(self.my_map.count_tiles_owned_by(player_id=1), 3)
 
+        # owned tiles are indexed by y * size + x
+        self.assertEqual({55, 65, 75}, self.my_map.owned_tiles[1])
+        self.assertEqual({51}, self.my_map.owned_tiles[2])
+
         self.my_map.clear_tile_owned_by(player_id=1)
         self.assertEqual(self.my_map.count_tiles_owned_by(player_id=1), 0)
+        self.assertEqual(self.my_map.count_tiles_owned_by(player_id=2), 1)
 
         self.assertFalse(self.my_map.is_empty(Position(5, 5)))
         self.assertEqual(self.my_map.get_tile(Position(5, 5)), (GameMap.PLANET, None))
@@ -231,6 +240,47 @@ class TestMap(unittest.TestCase):
         self.assertEqual(self.my_map.get_tile(Position(1, 5)), (GameMap.EMPTY, 2))
         self.assertEqual(self.my_map.get_owner(Position(1, 5)), 2)
 
+    def test_count_tiles_owned_by(self):
+        """
+        Tests that the owned tiles and planets counters follow every tile update
+        """
+
+        def scan(player_id):
+            tiles = [self.my_map.get_tile(Position(x, y)) for y in range(self.map_size) for x in range(self.map_size)]
+            owned = [state for state, owner in tiles if owner == player_id]
+            return len(owned), owned.count(GameMap.PLANET)
+
+        self.my_map.set_tile(Position(5, 5), GameMap.PLANET, player_id=None)
+        self.my_map.set_tile(Position(6, 6), GameMap.PLANET, player_id=None)
+        self.my_map.conquer_tile(Position(5, 5), player_id=1)
+        self.my_map.conquer_tile(Position(5, 6), player_id=1)
+        self.my_map.conquer_tile(Position(6, 6), player_id=2)
+        self.my_map.conquer_tile(Position(1, 1), player_id=2)
+        self.assertEqual((2, 1), scan(1))
+        self.assertEqual((2, 1), (self.my_map.count_tiles_owned_by(1), self.my_map.count_planets_owned_by(1)))
+        self.assertEqual((2, 1), (self.my_map.count_tiles_owned_by(2), self.my_map.count_planets_owned_by(2)))
+        self.assertEqual((0, 0), (self.my_map.count_tiles_owned_by(3), self.my_map.count_planets_owned_by(3)))
+
+        # steal a planet and a tile
+        self.my_map.conquer_tile(Position(6, 6), player_id=1)
+        self.my_map.conquer_tile(Position(1, 1), player_id=1)
+        self.assertEqual((4, 2), (self.my_map.count_tiles_owned_by(1), self.my_map.count_planets_owned_by(1)))
+        self.assertEqual((0, 0), (self.my_map.count_tiles_owned_by(2), self.my_map.count_planets_owned_by(2)))
+
+        # release a planet and a tile
+        self.my_map.set_tile(Position(5, 5), GameMap.PLANET, player_id=None)
+        self.my_map.clear_tile(Position(1, 1))
+        self.assertEqual((2, 1), (self.my_map.count_tiles_owned_by(1), self.my_map.count_planets_owned_by(1)))
+        self.assertEqual(scan(1), (self.my_map.count_tiles_owned_by(1), self.my_map.count_planets_owned_by(1)))
+
+        self.my_map.clear_tile_owned_by(player_id=1)
+        self.assertEqual((0, 0), (self.my_map.count_tiles_owned_by(1), self.my_map.count_planets_owned_by(1)))
+
+        # invalid updates are not counted
+        with self.assertRaises(InvalidStateException):
+            self.my_map.conquer_tile(Position(0, 0), player_id=1)
+        self.assertEqual(0, self.my_map.count_tiles_owned_by(1))
+
     def test_find_path_empty_tiles(self):
         map = create_map_with(
             [
@@ -240,7 +290,8 @@ class TestMap(unittest.TestCase):
                 [W, E, E, W],
                 [2, E, W, E]
                 # fmt: on
-            ]
+            ],
+            self.game_map_class,
         )
         found, path = map.find_path(start=Position(1, 1), goal=Position(4, 1))
         self.assertTrue(found)
@@ -263,7 +314,8 @@ class TestMap(unittest.TestCase):
                 [E, 1, E, 1],
                 [E, 1, 1, E]
                 # fmt: on
-            ]
+            ],
+            self.game_map_class,
         )
         found, path = map.find_path(start=Position(1, 1), goal=Position(3, 4), player_id=1)
         self.assertTrue(found)
@@ -284,11 +336,42 @@ class TestMap(unittest.TestCase):
         with self.assertRaises(Exception):
             map.find_path(start=Position(3, 1), goal=Position(4, 1), player_id=1)
 
+    def test_find_path_reuse_buffers(self):
+        map = create_map_with(
+            [
+                # fmt: off
+                [1, 1, 1, 1],
+                [1, W, W, 1],
+                [1, 1, W, 1],
+                [E, 1, 1, 1]
+                # fmt: on
+            ],
+            self.game_map_class,
+        )
+        # ties are broken by visiting up, left, down then right
+        found, path = map.find_path(start=Position(1, 1), goal=Position(4, 4), player_id=1)
+        self.assertTrue(found)
+        self.assertEqual(7, len(path))
+        self.assertEqual(path[:4], [Position(1, 1), Position(1, 2), Position(1, 3), Position(2, 3)])
+
+        # the previous search does not leak in the next ones
+        found, path = map.find_path(start=Position(4, 4), goal=Position(2, 3), player_id=1)
+        self.assertTrue(found)
+        self.assertEqual(path, [Position(4, 4), Position(3, 4), Position(2, 4), Position(2, 3)])
+
+        found, path = map.find_path(start=Position(2, 3), goal=Position(2, 3), player_id=1)
+        self.assertTrue(found)
+        self.assertEqual(path, [Position(2, 3)])
+
+        found, path = map.find_path(start=Position(2, 3), goal=Position(1, 4))
+        self.assertTrue(found)
+        self.assertEqual(path, [Position(2, 3), Position(1, 3), Position(1, 4)])
+
     def test_get_random_empty_position(self):
         positions = set()
 
         map_size = 10
-        game_map = GameMap(map_size)
+        game_map = self.game_map_class(map_size)
 
         for i in range(25):
             pos = game_map.get_random_empty_position()
@@ -298,7 +381,7 @@ class TestMap(unittest.TestCase):
             positions.add(pos)
 
     def test_get_empty_tiles(self):
-        map = GameMap(4)
+        map = self.game_map_class(4)
         self.assertEqual(map.get_empty_tiles(), [Position(1, 1), Position(1, 2), Position(2, 1), Position(2, 2)])
 
         map.set_tile(Position(1, 1), GameMap.PLANET)
@@ -1,4 +1,6 @@
+import random
 import unittest
+from pathlib import Path
 
 from blitz2020.game.action import Action
 from blitz2020.game.direction import Direction
@@ -732,3 +734,22 @@ class TestGameState(unittest.TestCase):
         gs.apply_action(0, p0, Action.FORWARD)
         self.assertFalse(p0.killed)
         self.assertEqual(1, p0.stats.stats[PlayerStats.BLITZIUMS])
+
+    def test_incremental_scores_match_full_scan(self):
+        random.seed(42)
+        presets_path = Path(__file__).parent.parent.parent / "game_presets"
+        GameState.validate_incremental_scores = True
+        try:
+            for preset in sorted(presets_path.glob("*.txt")):
+                game_config = GameConfig.from_file(preset)
+                gs = GameState(game_config)
+                for i in range(len(game_config.spawn_positions)):
+                    gs.add_player(str(i))
+
+                for tick in range(1, 40):
+                    for p in gs.players:
+                        gs.apply_action(tick, p, random.choice(list(Action)))
+                    # raises when the incremental scores and stats differ from the full scan
+                    gs.update_players_scores()
+        finally:
+            GameState.validate_incremental_scores = False
@@ -0,0 +1,95 @@
+import copy
+import random
+import unittest
+
+from blitz2020.game.game_map import GameMap
+from blitz2020.game.game_state_pool import GameStatePool
+from tests.game.map_utils import create_game_state, play
+
+
+def player_values(player):
+    return (
+        player.active,
+        player.killed,
+        player.score,
+        player.position,
+        player.direction,
+        player.tail,
+        player.tail_tiles,
+        player.stats.stats,
+        player.stats.kills,
+        player.stats.killed_by_players,
+    )
+
+
+class TestGameStatePool(unittest.TestCase):
+    def assertSameState(self, expected, game_state):
+        self.assertEqual(expected.game_tick, game_state.game_tick)
+        self.assertEqual(expected.game_map, game_state.game_map)
+        self.assertEqual(expected.game_map.owned_tiles, game_state.game_map.owned_tiles)
+        for player in expected.players:
+            self.assertEqual(
+                expected.game_map.count_planets_owned_by(player.id),
+                game_state.game_map.count_planets_owned_by(player.id),
+            )
+        for expected_player, player in zip(expected.players, game_state.players):
+            self.assertEqual(player_values(expected_player), player_values(player))
+
+    def test_save_and_restore(self):
+        rng = random.Random(42)
+        game_state = create_game_state()
+        pool = GameStatePool(game_state, capacity=50)
+
+        slots = []
+        expected_states = []
+        for _ in range(50):
+            play(game_state, 5, rng)
+            slots.append(pool.save(game_state))
+            expected_states.append(copy.deepcopy(game_state))
+        self.assertEqual(pool.nb_free_slots, 0)
+        # the game had kills, the kills are packed too
+        self.assertTrue(any(player.stats.kills for player in game_state.players))
+
+        for slot, expected in reversed(list(zip(slots, expected_states))):
+            version = game_state.version
+            self.assertIs(pool.restore(slot, game_state), game_state)
+            self.assertSameState(expected, game_state)
+            self.assertGreater(game_state.version, version)
+
+    def test_restored_state_plays_like_the_saved_one(self):
+        game_state = create_game_state()
+        play(game_state, 30, random.Random(1))
+
+        pool = GameStatePool(game_state, capacity=1)
+        slot = pool.save(game_state)
+        expected = copy.deepcopy(game_state)
+
+        play(game_state, 40, random.Random(2))
+
+        pool.restore(slot, game_state)
+        for state in (expected, game_state):
+            play(state, 40, random.Random(3))
+        self.assertSameState(expected, game_state)
+
+        # the slot is not modified by the restored state
+        pool.restore(slot, game_state)
+        play(game_state, 40, random.Random(3))
+        self.assertSameState(expected, game_state)
+
+    def test_slots(self):
+        pool = GameStatePool(create_game_state(), capacity=2)
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertEqual({first, second}, {0, 1})
+        with self.assertRaises(Exception):
+            pool.acquire()
+
+        pool.release(first)
+        self.assertEqual(pool.acquire(), first)
+
+        pool.release_all()
+        self.assertEqual(pool.nb_free_slots, 2)
+
+    def test_requires_array_game_map(self):
+        with self.assertRaises(Exception):
+            GameStatePool(create_game_state(GameMap), capacity=1)
@@ -68,3 +68,43 @@ class TestPlayerState(unittest.TestCase):
         self.assertEqual(14, len(ps.history))
         self.assertEqual("message-12", ps.history[0].message)
         self.assertEqual("message-2-0", ps.history[-1].message)
+
+    def test_tail_index(self):
+        game_map = GameMap(7)
+        ps = PlayerState(id=1, name="dummy", game_map=game_map, position=Position(1, 1))
+        self.assertTrue(ps.is_on_tail(Position(1, 1)))
+        self.assertFalse(ps.is_on_tail(Position(1, 1), with_ends=False))
+
+        for pos in [Position(2, 1), Position(2, 2), Position(1, 2), Position(1, 1)]:
+            ps.extend_tail(pos)
+        self.assertTrue(ps.is_on_tail(Position(2, 2)))
+        self.assertTrue(ps.is_on_tail(Position(2, 2), with_ends=False))
+        self.assertFalse(ps.is_on_tail(Position(1, 1), with_ends=False))
+        self.assertFalse(ps.is_on_tail(Position(3, 3)))
+        self.assertTrue(ps.is_tail_in({Position(1, 2)}))
+        self.assertTrue(ps.is_tail_in({Position(x, y) for x in range(2, 7) for y in range(2, 7)}))
+        self.assertFalse(ps.is_tail_in({Position(3, 3), Position(4, 4)}))
+
+        # walking twice on the same tile, it is now in the middle of the tail
+        ps.extend_tail(Position(2, 1))
+        self.assertTrue(ps.is_on_tail(Position(1, 1), with_ends=False))
+
+        ps.tail = [Position(3, 3)]
+        self.assertFalse(ps.is_on_tail(Position(2, 2)))
+        self.assertTrue(ps.is_on_tail(Position(3, 3)))
+
+    def test_restore_tail(self):
+        game_map = GameMap(7)
+        ps = PlayerState(id=1, name="dummy", game_map=game_map, position=Position(1, 1))
+        ps.extend_tail(Position(2, 1))
+        saved = (tuple(ps.tail), ps.tail_tiles.copy())
+
+        ps.extend_tail(Position(2, 2))
+        ps.restore_tail(*saved)
+        self.assertEqual(ps.tail, [Position(1, 1), Position(2, 1)])
+        self.assertFalse(ps.is_on_tail(Position(2, 2)))
+
+        # the saved tail is not modified
+        ps.extend_tail(Position(3, 1))
+        self.assertEqual(len(saved[0]), 2)
+        self.assertNotIn((3, 1), saved[1])
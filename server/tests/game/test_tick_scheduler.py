@@ -0,0 +1,79 @@
+import asyncio
+import unittest
+
+from blitz2020.game.tick_scheduler import TickScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+class TestTickScheduler(unittest.TestCase):
+    def test_fixed_cadence(self):
+        clock = FakeClock()
+
+        async def run():
+            scheduler = TickScheduler(20, clock.time, clock.sleep)
+            scheduler.start()
+            for _ in range(10):
+                # the time spent in the tick is part of the period
+                clock.now += 0.01
+                await scheduler.wait_next_tick()
+            return scheduler
+
+        scheduler = asyncio.run(run())
+        self.assertAlmostEqual(clock.now, 100.2)
+        self.assertEqual(len(clock.sleeps), 10)
+        for delay in clock.sleeps:
+            self.assertAlmostEqual(delay, 0.01)
+        self.assertEqual(scheduler.nb_late_ticks, 0)
+
+    def test_late_tick(self):
+        clock = FakeClock()
+
+        async def run():
+            scheduler = TickScheduler(10, clock.time, clock.sleep)
+            scheduler.start()
+            clock.now += 0.03
+            await scheduler.wait_next_tick()
+            # no catch up: the next tick waits a full period
+            await scheduler.wait_next_tick()
+            return scheduler
+
+        scheduler = asyncio.run(run())
+        self.assertEqual(scheduler.nb_late_ticks, 1)
+        self.assertEqual(len(clock.sleeps), 1)
+        self.assertAlmostEqual(clock.sleeps[0], 0.01)
+
+    def test_no_delay(self):
+        clock = FakeClock()
+
+        async def run():
+            scheduler = TickScheduler(0, clock.time, clock.sleep)
+            scheduler.start()
+            await scheduler.wait_next_tick()
+            return scheduler
+
+        scheduler = asyncio.run(run())
+        self.assertEqual(scheduler.nb_late_ticks, 0)
+        self.assertEqual(clock.sleeps, [])
+
+    def test_event_loop_clock(self):
+        async def run():
+            scheduler = TickScheduler(10)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            scheduler.start()
+            await scheduler.wait_next_tick()
+            return loop.time() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.009)
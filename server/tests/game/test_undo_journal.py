@@ -0,0 +1,134 @@
+import copy
+import random
+import unittest
+
+from blitz2020.game.action import Action
+from blitz2020.game.array_game_map import ArrayGameMap
+from blitz2020.game.game_map import GameMap
+from blitz2020.game.position import Position
+from blitz2020.game.undo_journal import UndoJournal
+from tests.game.map_utils import create_game_state, play
+
+
+def state_values(game_state):
+    game_map = game_state.game_map
+    values = (
+        game_state.game_tick,
+        game_map.tiles,
+        game_map.empty_tiles,
+        {owner: tiles for owner, tiles in game_map.owned_tiles.items() if tiles},
+        {owner: planets for owner, planets in game_map.owned_planets.items() if planets},
+        [
+            (
+                player.killed,
+                player.score,
+                player.position,
+                player.direction,
+                player.tail,
+                player.tail_tiles,
+                player.stats.stats,
+                player.stats.kills,
+                player.stats.killed_by_players,
+            )
+            for player in game_state.players
+        ],
+    )
+    # the game state changes these objects in place
+    return copy.deepcopy(values)
+
+
+class TestUndoJournal(unittest.TestCase):
+    def test_rollback(self):
+        values = []
+        journal = UndoJournal()
+        journal.record(values.pop)
+        values.append(1)
+        mark = journal.mark()
+        journal.record(values.pop)
+        values.append(2)
+        self.assertEqual(len(journal), 2)
+
+        journal.rollback(mark)
+        self.assertEqual(values, [1])
+        journal.rollback()
+        self.assertEqual(values, [])
+        self.assertEqual(len(journal), 0)
+
+        journal.record(values.pop)
+        journal.clear()
+        journal.rollback()
+        self.assertEqual(values, [])
+
+    def test_undo_requires_a_journal(self):
+        with self.assertRaises(Exception):
+            create_game_state(GameMap).undo()
+
+
+class TestGameStateUndo(unittest.TestCase):
+    game_map_class = GameMap
+
+    def test_undo_ticks(self):
+        rng = random.Random(7)
+        game_state = create_game_state(self.game_map_class)
+        journal = game_state.start_journal()
+
+        marks = []
+        expected_values = []
+        for _ in range(150):
+            marks.append(journal.mark())
+            expected_values.append(state_values(game_state))
+            play(game_state, 1, rng)
+        # the random game went through the kill, fill and blitzium paths
+        self.assertTrue(any(player.stats.safe_get("number_of_deaths") for player in game_state.players))
+        self.assertTrue(any(player.stats.safe_get("number_of_blitziums_collected") for player in game_state.players))
+        self.assertTrue(any(player.score > 100 for player in game_state.players))
+
+        for mark, expected in reversed(list(zip(marks, expected_values))):
+            game_state.undo(mark)
+            self.assertEqual(expected, state_values(game_state))
+        self.assertEqual(len(journal), 0)
+
+    def test_undone_state_plays_like_a_copy(self):
+        game_state = create_game_state(self.game_map_class)
+        play(game_state, 30, random.Random(11))
+
+        expected = copy.deepcopy(game_state)
+        game_state.start_journal()
+
+        # depth first search: every branch is undone before the next one
+        for branch in range(5):
+            mark = game_state.journal.mark()
+            play(game_state, 20, random.Random(branch))
+            game_state.undo(mark)
+            self.assertEqual(state_values(expected), state_values(game_state))
+
+        for state in (expected, game_state):
+            play(state, 50, random.Random(42))
+        self.assertEqual(state_values(expected), state_values(game_state))
+
+    def test_stop_journal(self):
+        game_state = create_game_state(self.game_map_class)
+        journal = game_state.start_journal()
+        game_state.stop_journal()
+
+        game_state.apply_action(1, game_state.players[0], Action.FORWARD)
+        self.assertEqual(len(journal), 0)
+        self.assertIsNone(game_state.game_map.journal)
+
+    def test_undo_clear_tile_owned_by(self):
+        game_state = create_game_state(self.game_map_class)
+        game_map = game_state.game_map
+        player = game_state.players[0]
+        for x in range(1, 4):
+            game_map.conquer_tile(Position(x, 1), player.id)
+        expected = state_values(game_state)
+
+        game_state.start_journal()
+        game_state.kill_player(player)
+        self.assertTrue(player.killed)
+        game_state.undo()
+        self.assertEqual(expected, state_values(game_state))
+
+
+class TestArrayGameStateUndo(TestGameStateUndo):
+    game_map_class = ArrayGameMap
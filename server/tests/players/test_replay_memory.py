@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from blitz2020.players.utils.replay_memory import RingReplayMemory, SumTree
+
+
+def fill(memory, nb_transitions, episode_length):
+    for step in range(nb_transitions):
+        memory.add(np.full((2, 2), step), step, step / 10, (step + 1) % episode_length == 0)
+
+
+class TestSumTree(unittest.TestCase):
+    def test_find(self):
+        tree = SumTree(5)
+        tree.update(np.arange(5), np.array([1.0, 0.0, 2.0, 3.0, 4.0]))
+
+        self.assertEqual(tree.total, 10)
+        self.assertEqual(tree.find(np.array([0, 0.5, 1, 2.9, 3, 5.9, 6, 9.99])).tolist(), [0, 0, 2, 2, 3, 3, 4, 4])
+
+        tree.update(np.array([4]), np.array([1.0]))
+        self.assertEqual(tree.total, 7)
+        np.testing.assert_array_equal(tree.get(np.array([2, 4])), [2.0, 1.0])
+
+    def test_find_is_proportional(self):
+        tree = SumTree(4)
+        tree.update(np.arange(4), np.array([1.0, 2.0, 3.0, 4.0]))
+
+        leaves = tree.find(np.random.uniform(0, tree.total, 100_000))
+        np.testing.assert_allclose(np.bincount(leaves) / len(leaves), [0.1, 0.2, 0.3, 0.4], atol=0.01)
+
+
+class TestRingReplayMemory(unittest.TestCase):
+    def test_add_overwrites_the_oldest_transitions(self):
+        memory = RingReplayMemory(10, (2, 2))
+        fill(memory, 15, episode_length=100)
+
+        self.assertEqual(len(memory), 10)
+        self.assertEqual(memory.position, 5)
+        self.assertEqual(sorted(memory.actions.tolist()), list(range(5, 15)))
+
+    def test_extend(self):
+        memory = RingReplayMemory(10, (2,))
+        memory.extend(np.zeros((4, 2)), np.arange(4), np.zeros(4), np.zeros(4, dtype=bool))
+        memory.extend(np.zeros((12, 2)), np.arange(4, 16), np.zeros(12), np.zeros(12, dtype=bool))
+
+        self.assertEqual(len(memory), 10)
+        self.assertEqual(memory.position, 6)
+        self.assertEqual(memory.actions.tolist(), [10, 11, 12, 13, 14, 15, 6, 7, 8, 9])
+
+    def test_sample_traces(self):
+        memory = RingReplayMemory(50, (2, 2))
+        fill(memory, 73, episode_length=7)
+
+        batch = memory.sample(200, trace_length=3)
+        self.assertEqual(batch["frames"].shape, (200, 3, 2, 2))
+        self.assertEqual(batch["next_frames"].shape, (200, 3, 2, 2))
+
+        actions = batch["actions"]
+        # consecutive transitions of the same episode
+        np.testing.assert_array_equal(actions[:, 1:] - actions[:, :-1], 1)
+        self.assertTrue(np.all(actions[:, 0] // 7 == actions[:, -1] // 7))
+        self.assertFalse(batch["dones"][:, :-1].any())
+        # only stored transitions and their stored next frame
+        self.assertTrue(np.all(actions >= 73 - 50))
+        self.assertTrue(np.all(actions < 72))
+
+        np.testing.assert_array_equal(batch["frames"][:, :, 0, 0], actions)
+        np.testing.assert_array_equal(batch["next_frames"][:, :, 0, 0], actions + 1)
+        np.testing.assert_allclose(batch["rewards"], actions / 10, rtol=1e-6)
+        np.testing.assert_array_equal(batch["weights"], 1)
+
+    def test_sample_without_enough_transitions(self):
+        memory = RingReplayMemory(10, (2, 2))
+        fill(memory, 3, episode_length=100)
+
+        with self.assertRaises(Exception):
+            memory.sample(1, trace_length=3)
+
+        # every transition ends its episode
+        memory = RingReplayMemory(10, (2, 2))
+        fill(memory, 6, episode_length=1)
+        with self.assertRaises(Exception):
+            memory.sample(1, trace_length=2, max_nb_tries=5)
+
+    def test_prioritized_sample(self):
+        memory = RingReplayMemory(20, (2, 2), prioritized=True, alpha=1.0)
+        fill(memory, 20, episode_length=100)
+
+        priorities = np.full(20, 1e-6)
+        priorities[[3, 8]] = [1.0, 3.0]
+        memory.update_priorities(np.arange(20), priorities)
+
+        np.random.seed(0)
+        batch = memory.sample(10_000, trace_length=2)
+        starts = batch["indices"]
+        # the other transitions have the minimum priority
+        self.assertGreater(np.mean((starts == 3) | (starts == 8)), 0.99)
+        self.assertAlmostEqual(np.mean(starts == 8), 0.75, delta=0.02)
+        # the rare traces weight more
+        self.assertTrue(np.all(batch["weights"][starts == 8] < batch["weights"][starts == 3][0]))
+
+        # new transitions get the highest priority
+        fill(memory, 1, episode_length=100)
+        self.assertEqual(memory.priorities.get(np.array([0]))[0], 3.0)
+
+    def test_update_priorities_when_not_prioritized(self):
+        with self.assertRaises(Exception):
+            RingReplayMemory(10, (2, 2)).update_priorities(np.arange(2), np.ones(2))
+
+    def test_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as path:
+            memory = RingReplayMemory(10, (2, 2), path=path)
+            fill(memory, 12, episode_length=100)
+            memory.flush()
+
+            self.assertIsInstance(memory.frames, np.memmap)
+            self.assertEqual(sorted(os.listdir(path)), ["actions.npy", "dones.npy", "frames.npy", "rewards.npy"])
+            np.testing.assert_array_equal(np.load(os.path.join(path, "actions.npy")), memory.actions)
+            self.assertEqual(memory.sample(4, trace_length=2)["frames"].shape, (4, 2, 2, 2))
@@ -0,0 +1,103 @@
+import random
+import unittest
+
+import numpy as np
+
+from blitz2020.game.action import Action
+from blitz2020.game.array_game_map import ArrayGameMap
+from blitz2020.game.game_config import GameConfig
+from blitz2020.game.game_map import GameMap
+from blitz2020.game.game_state import GameState
+from blitz2020.game.position import Position
+from blitz2020.players.utils import state_to_frame
+from blitz2020.players.utils.state_to_frame import (
+    game_state_to_frame,
+    game_state_to_frames,
+    game_state_to_one_hot_frame,
+    game_state_to_one_hot_frames,
+    payer_state_to_frame,
+)
+from blitz2020.simulator import GAME_PRESETS_PATH
+
+
+def reference_frame(player_id, state):
+    # the original tile by tile implementation
+    size = state.game_map.size
+    frame = np.zeros((size, size))
+    for y in range(size):
+        for x in range(size):
+            tile_state, tile_owner = state.game_map.get_tile(Position(x, y))
+            value = state_to_frame.EMPTY
+            if tile_state == GameMap.ASTEROIDS or tile_state == GameMap.BLACK_HOLE:
+                value = state_to_frame.ASTEROIDS_BH
+            elif tile_state == GameMap.BLITZIUM:
+                value = state_to_frame.BLITZIUM
+            elif tile_state == GameMap.PLANET and tile_owner != player_id:
+                value = state_to_frame.PLANETS
+            if tile_owner is not None and tile_owner == player_id:
+                value = state_to_frame.CAPTURED_BY_PLAYER
+            elif tile_owner is not None:
+                value = state_to_frame.CAPTURED_BY_OTHERS
+            frame[y, x] = value
+
+    for p in state.players:
+        if p.id == player_id:
+            payer_state_to_frame(p, frame, head=state_to_frame.PLAYER_HEAD, tail=state_to_frame.PLAYER_TAIL)
+        else:
+            payer_state_to_frame(p, frame, head=state_to_frame.OTHERS_HEAD, tail=state_to_frame.OTHERS_TAIL)
+    return frame
+
+
+def play_random_game(game_map_class, nb_ticks):
+    with open(GAME_PRESETS_PATH / "practice-4p-t-0.txt") as file:
+        state = GameState(GameConfig.from_str(file.read(), game_map_class))
+    for i in range(4):
+        state.add_player(f"p{i}")
+
+    for tick in range(1, nb_ticks + 1):
+        for p in state.players:
+            state.apply_action(tick, p, random.choice(list(Action)))
+        state.update_players_scores()
+    return state
+
+
+class TestStateToFrame(unittest.TestCase):
+    def test_same_frames(self):
+        random.seed(7)
+        for game_map_class in [GameMap, ArrayGameMap]:
+            state = play_random_game(game_map_class, 1)
+            for tick in range(60):
+                for p in state.players:
+                    state.apply_action(tick + 2, p, random.choice(list(Action)))
+                state.update_players_scores()
+
+                frames = game_state_to_frames(state)
+                for index, p in enumerate(state.players):
+                    expected = reference_frame(p.id, state)
+                    np.testing.assert_array_equal(game_state_to_frame(p.id, state), expected)
+                    np.testing.assert_array_equal(frames[index], expected)
+
+            # a player not in the game sees everybody as an opponent
+            np.testing.assert_array_equal(game_state_to_frame(9, state), reference_frame(9, state))
+
+    def test_one_hot_frames(self):
+        random.seed(3)
+        state = play_random_game(ArrayGameMap, 30)
+        frames = game_state_to_one_hot_frames(state)
+        size = state.game_map.size
+        self.assertEqual(frames.shape, (4, state_to_frame.ONE_HOT_NB_CHANNELS, size, size))
+        self.assertEqual(frames.dtype, np.float32)
+
+        for index, p in enumerate(state.players):
+            frame = frames[index]
+            np.testing.assert_array_equal(frame, game_state_to_one_hot_frame(p.id, state))
+            self.assertEqual(frame[state_to_frame.ONE_HOT_PLAYER_HEAD, p.position.y, p.position.x], 1)
+            self.assertEqual(frame[state_to_frame.ONE_HOT_PLAYER_HEAD].sum(), 1)
+            self.assertEqual(frame[state_to_frame.ONE_HOT_OTHERS_HEAD].sum(), 3)
+            self.assertEqual(frame[state_to_frame.ONE_HOT_PLAYER_TAIL].sum(), len(p.tail_tiles))
+            self.assertEqual(
+                frame[state_to_frame.ONE_HOT_CAPTURED_BY_PLAYER].sum(), state.game_map.count_tiles_owned_by(p.id)
+            )
+            np.testing.assert_array_equal(
+                frame[state_to_frame.ONE_HOT_ASTEROIDS], state.game_map.kinds == ArrayGameMap.ASTEROIDS_KIND
+            )
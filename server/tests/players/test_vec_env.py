@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from blitz2020.game.action import Action
+from blitz2020.players.utils.state_to_frame import PLAYER_HEAD, OTHERS_HEAD
+from blitz2020.players.utils.vec_env import ACTIONS, GameEnv, VecEnv
+from blitz2020.simulator import GAME_PRESETS_PATH
+
+
+def read_map(name):
+    with open(GAME_PRESETS_PATH / name) as file:
+        return file.read()
+
+
+class TestVecEnv(unittest.TestCase):
+    maps = [read_map("practice-2p-0.txt"), read_map("practice-2p-1.txt")]
+
+    def test_game_env(self):
+        env = GameEnv(self.maps, nb_players=2, max_nb_ticks=10)
+        observations = env.reset()
+
+        size = env.game_state.game_map.size
+        self.assertEqual(observations.shape, (2, size, size))
+        for player in env.game_state.players:
+            self.assertEqual(observations[player.id, player.position.y, player.position.x], PLAYER_HEAD)
+            self.assertEqual(observations[1 - player.id, player.position.y, player.position.x], OTHERS_HEAD)
+
+        forward = ACTIONS.index(Action.FORWARD)
+        total_rewards = np.zeros(2)
+        for tick in range(1, 20):
+            observations, rewards, done, info = env.step([forward, forward])
+            total_rewards += rewards
+            self.assertEqual(done, tick == env.max_game_ticks)
+            if done:
+                break
+
+        # the game is reset, the rewards add up to the final scores
+        self.assertEqual(tick, 10)
+        self.assertEqual(info["nb_ticks"], 10)
+        np.testing.assert_allclose(total_rewards, info["scores"])
+        self.assertEqual(env.game_tick, 0)
+        self.assertEqual(env.nb_episodes, 2)
+
+    def test_vec_env(self):
+        for nb_processes in [0, 2]:
+            env = VecEnv(self.maps, nb_envs=3, nb_players=2, max_nb_ticks=10, nb_processes=nb_processes, seed=1)
+            observations = env.reset()
+            self.assertEqual(observations.shape[:2], (3, 2))
+
+            actions = np.random.randint(len(ACTIONS), size=(3, 2))
+            observations, rewards, dones, infos = env.step(actions)
+            self.assertEqual(observations.shape[:2], (3, 2))
+            self.assertEqual(rewards.shape, (3, 2))
+            self.assertEqual(dones.tolist(), [False] * 3)
+            self.assertEqual(infos, [{}] * 3)
+            env.close()
+
+    def test_same_map_size(self):
+        with self.assertRaises(Exception):
+            VecEnv([read_map("practice-2p-0.txt"), read_map("0-basic_1p_5x5.txt")], nb_envs=2)
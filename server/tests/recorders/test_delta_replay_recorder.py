@@ -0,0 +1,86 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from asyncmock import Mock
+from blitz2020.game.action import Action
+from blitz2020.game.game_config import GameConfig
+from blitz2020.game.game_state import GameState
+from blitz2020.recorders.delta_replay_recorder import (
+    DeltaReplayReader,
+    DeltaReplayRecorder,
+    delta_replay_to_json_replay,
+    json_replay_to_delta_replay,
+)
+from blitz2020.recorders.json_recorder import JsonRecorder
+
+
+class TestDeltaReplayRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.record_path = os.path.join(self.directory.name, "replay.delta")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record_game(self, nb_ticks: int):
+        random.seed(1)
+        game_state = GameState(GameConfig.from_file("game_presets/0-basic_4p_21x21.txt"))
+        game = Mock()
+        game.max_nb_ticks = 500
+        game.players = []
+        for i in range(4):
+            player = Mock()
+            player.name = f"p{i}"
+            player.player_state = game_state.add_player(player.name)
+            game.players.append(player)
+
+        recorder = DeltaReplayRecorder(game, self.record_path, keyframe_interval=10)
+        json_recorder = JsonRecorder(game, os.path.join(self.directory.name, "replay.json"))
+        for tick in range(1, nb_ticks + 1):
+            for player in game_state.players:
+                game_state.apply_action(tick, player, random.choice(list(Action)))
+            game_state.update_players_scores()
+            recorder.record_tick(tick, game_state)
+            json_recorder.record_tick(tick, game_state)
+        recorder.finish()
+
+        return json.loads(json.dumps(json_recorder.ticks))
+
+    def test_record_and_seek(self):
+        ticks = self.record_game(35)
+
+        reader = DeltaReplayReader(self.record_path)
+        self.assertEqual(4, len(reader.players))
+        self.assertEqual([1, 11, 21, 31], reader.keyframe_ticks)
+        self.assertEqual(ticks, list(reader.iter_ticks()))
+        for game_tick in [1, 10, 11, 25, 35]:
+            self.assertEqual(ticks[game_tick - 1], reader.get_tick(game_tick))
+
+        with self.assertRaises(Exception):
+            reader.get_tick(36)
+
+        # smaller than the full replay
+        with open(self.record_path) as file:
+            self.assertLess(len(file.read()), len(json.dumps(ticks)) / 2)
+
+    def test_convert(self):
+        ticks = self.record_game(25)
+        replay = delta_replay_to_json_replay(self.record_path)
+        self.assertEqual(ticks, replay["ticks"])
+
+        converted_path = os.path.join(self.directory.name, "converted.delta")
+        json_replay_to_delta_replay(replay, converted_path, keyframe_interval=10)
+        self.assertEqual(replay, delta_replay_to_json_replay(converted_path))
+
+    def test_incomplete_replay(self):
+        self.record_game(5)
+        with open(self.record_path, "rb") as file:
+            lines = file.readlines()
+        with open(self.record_path, "wb") as file:
+            file.writelines(lines[:-1])
+
+        with self.assertRaises(Exception):
+            DeltaReplayReader(self.record_path)
@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+import unittest
+
+from asyncmock import Mock
+from blitz2020.game.game_map import GameMap
+from blitz2020.game.game_state import GameState
+from blitz2020.recorders.json_lines_recorder import JsonLinesRecorder, read_json_lines_replay
+from blitz2020.recorders.json_recorder import JsonRecorder
+
+
+class TestJsonLinesRecorder(unittest.TestCase):
+    def test_record_tick(self):
+        game = Mock()
+        game.max_nb_ticks = 500
+        player1 = Mock()
+        player1.name = "p1"
+        player1.player_state.score = 10
+        player1.player_state.name_str.return_value = "p1-0"
+        player2 = Mock()
+        player2.name = "p2"
+        player2.player_state.score = 20
+        player2.player_state.name_str.return_value = "p2-1"
+        game.players = [player1, player2]
+
+        with tempfile.TemporaryDirectory() as directory:
+            record_path = os.path.join(directory, "replay.jsonl")
+            recorder = JsonLinesRecorder(game, record_path)
+            json_recorder = JsonRecorder(game, os.path.join(directory, "replay.json"))
+
+            gs = GameState(GameMap(3))
+            nb = 10
+            for i in range(nb):
+                recorder.record_tick(100 + i, gs)
+                json_recorder.record_tick(100 + i, gs)
+
+            # ticks are written as they are recorded
+            recorder.file.flush()
+            with open(record_path) as file:
+                self.assertEqual(nb, len(file.readlines()))
+
+            recorder.finish()
+            replay = read_json_lines_replay(record_path)
+
+        self.assertEqual(json.loads(json.dumps(json_recorder.ticks)), replay["ticks"])
+        self.assertEqual(["p2-1", "p1-0"], replay["players"])
+        self.assertEqual("p2", replay["winner"])
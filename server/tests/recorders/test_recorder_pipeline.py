@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import unittest
+
+from blitz2020.game.game_map import GameMap
+from blitz2020.game.game_state import GameState
+from blitz2020.recorders.recorder_pipeline import RecorderPipeline
+from blitz2020.recorders.tick_recorder import TickRecorder
+
+
+class ListRecorder(TickRecorder):
+    def __init__(self) -> None:
+        super().__init__()
+        self.ticks = []
+        self.finished = False
+        self.threads = set()
+        self.can_write = threading.Event()
+        self.can_write.set()
+
+    def tick_payload(self, game_tick, game_state):
+        return game_tick
+
+    def write_tick(self, payload):
+        self.can_write.wait()
+        self.threads.add(threading.get_ident())
+        self.ticks.append(payload)
+
+    def finish(self):
+        self.threads.add(threading.get_ident())
+        self.finished = True
+
+
+class TestRecorderPipeline(unittest.TestCase):
+    def test_record_off_loop(self):
+        recorder = ListRecorder()
+        pipeline = RecorderPipeline(recorder)
+
+        gs = GameState(GameMap(3))
+        for i in range(10):
+            pipeline.record_tick(i, gs)
+        asyncio.run(pipeline.close())
+
+        self.assertEqual(recorder.ticks, list(range(10)))
+        self.assertTrue(recorder.finished)
+        self.assertEqual(recorder.threads, {pipeline.worker.ident})
+        self.assertNotIn(threading.get_ident(), recorder.threads)
+        self.assertFalse(pipeline.worker.is_alive())
+
+    def test_drop_when_full(self):
+        recorder = ListRecorder()
+        recorder.can_write.clear()
+        pipeline = RecorderPipeline(recorder, max_queue_size=2, drop_when_full=True)
+
+        gs = GameState(GameMap(3))
+        pipeline.record_tick(0, gs)
+        # wait for the worker to be blocked writing the first tick
+        while not pipeline.queue.empty():
+            pass
+        for i in range(1, 6):
+            pipeline.record_tick(i, gs)
+        self.assertEqual(pipeline.nb_dropped_ticks, 3)
+
+        recorder.can_write.set()
+        asyncio.run(pipeline.close())
+        self.assertEqual(recorder.ticks, [0, 1, 2])
+        self.assertTrue(recorder.finished)
+
+    def test_backlog_when_full(self):
+        recorder = ListRecorder()
+        recorder.can_write.clear()
+        pipeline = RecorderPipeline(recorder, max_queue_size=2)
+
+        gs = GameState(GameMap(3))
+        pipeline.record_tick(0, gs)
+        while not pipeline.queue.empty():
+            pass
+        # the game loop does not wait for the worker
+        for i in range(1, 6):
+            pipeline.record_tick(i, gs)
+        self.assertEqual(list(pipeline.backlog), [3, 4, 5])
+        self.assertEqual(pipeline.nb_dropped_ticks, 0)
+
+        recorder.can_write.set()
+        asyncio.run(pipeline.close())
+        self.assertEqual(recorder.ticks, list(range(6)))
+        self.assertEqual(len(pipeline.backlog), 0)
+        self.assertTrue(recorder.finished)
+
+    def test_write_error(self):
+        recorder = ListRecorder()
+        recorder.write_tick = lambda payload: 1 / 0
+        pipeline = RecorderPipeline(recorder)
+
+        pipeline.record_tick(0, GameState(GameMap(3)))
+        asyncio.run(pipeline.close())
+        self.assertTrue(recorder.finished)
@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from asyncmock import Mock
+from blitz2020.game.game_map import GameMap
+from blitz2020.game.game_state import GameState
+from blitz2020.recorders.object_store import LocalObjectStore
+from blitz2020.recorders.s3_recorder import S3Recorder
+
+
+class TestS3Recorder(unittest.TestCase):
+    def setUp(self):
+        self.game = Mock()
+        self.game.max_nb_ticks = 500
+        player1 = Mock()
+        player1.uid = "uid1"
+        player1.name = "p1"
+        player1.player_state.score = 10
+        player1.player_state.active = True
+        player2 = Mock()
+        player2.uid = "uid2"
+        player2.name = "p2"
+        player2.player_state.score = 20
+        player2.player_state.active = False
+        self.game.players = [player1, player2]
+
+    def test_streaming_upload(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = LocalObjectStore(directory, min_part_size=64)
+            recorder = S3Recorder(self.game, "bucket", "game/", None, object_store=store, part_size=64)
+
+            gs = GameState(GameMap(5))
+            ticks = []
+            for i in range(100):
+                tick = recorder.tick_payload(i, gs)
+                # random data, the ticks of an idle game compress too well to fill several parts
+                tick["noise"] = os.urandom(256).hex()
+                ticks.append(tick)
+                recorder.write_tick(tick)
+
+            # parts are uploaded during the game, the replay only exists once completed
+            upload = store.uploads[0]
+            self.assertGreater(len(upload.parts), 0)
+            self.assertFalse(os.path.exists(os.path.join(directory, "game/replay.gz")))
+
+            recorder.finish()
+            self.assertGreater(len(upload.parts), 1)
+            with gzip.open(os.path.join(directory, "game/replay.gz"), "rt", encoding="utf8") as file:
+                self.assertEqual(file.read(), json.dumps({"ticks": ticks}))
+            with open(os.path.join(directory, "game/gameResults.json")) as file:
+                results = json.load(file)
+            self.assertEqual([r["rank"] for r in results], [2, 1])
+            self.assertEqual([r["didTimeout"] for r in results], [False, True])
+
+    def test_empty_replay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = LocalObjectStore(directory)
+            recorder = S3Recorder(self.game, "bucket", "game/", None, object_store=store)
+            recorder.finish()
+
+            with gzip.open(os.path.join(directory, "game/replay.gz"), "rt", encoding="utf8") as file:
+                self.assertEqual(json.load(file), {"ticks": []})
+
+    def test_part_too_small(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = LocalObjectStore(directory, min_part_size=1024)
+            upload = store.create_multipart_upload("replay.gz")
+            upload.upload_part(b"a" * 10)
+            with self.assertRaises(Exception):
+                upload.upload_part(b"a" * 10)
+            upload.abort()
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_key_without_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                store = LocalObjectStore("")
+                upload = store.create_multipart_upload("replay.gz")
+                upload.upload_part(b"replay")
+                upload.complete()
+                store.put("results.json", b"{}")
+                self.assertEqual(sorted(os.listdir(directory)), ["replay.gz", "results.json"])
+            finally:
+                os.chdir(cwd)
@@ -183,6 +183,24 @@ class TestSocketGameServer(unittest.TestCase):
         )
         self.assertEqual(len(server.game.recorders), 1)
 
+    def test_game_server_with_pretty_map(self):
+        server = SocketGameServer(max_nb_ticks=10, path=path, port=port, record_path="/tmp/file.json")
+        self.assertTrue(server.with_pretty_map(False))
+        self.assertTrue(server.game.recorders[0].recorder.with_pretty_map)
+
+        server = SocketGameServer(
+            max_nb_ticks=10, path=path, port=port, record_path="/tmp/file.json", pretty_map="requested"
+        )
+        self.assertTrue(server.with_pretty_map(True))
+        self.assertFalse(server.with_pretty_map(False))
+        self.assertFalse(server.game.recorders[0].recorder.with_pretty_map)
+
+        server = SocketGameServer(max_nb_ticks=10, path=path, port=port, pretty_map="never")
+        self.assertFalse(server.with_pretty_map(True))
+
+        with self.assertRaises(Exception):
+            SocketGameServer(max_nb_ticks=10, path=path, port=port, pretty_map="sometimes")
+
     def test_game_server_with_min_nb_players(self):
         min_nb_players = 5
         server = SocketGameServer(
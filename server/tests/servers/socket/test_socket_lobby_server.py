@@ -0,0 +1,112 @@
+import asyncio
+import json
+import unittest
+from typing import List
+
+import websockets
+from blitz2020.game.direction import Direction
+from blitz2020.game.game_config import GameConfig
+from blitz2020.game.game_map import GameMap
+from blitz2020.game.position import Position
+from blitz2020.players.random_player import RandomPlayer
+from blitz2020.servers.socket.socket_game_server import SocketGameServer
+from blitz2020.servers.socket.socket_lobby_server import SocketLobbyServer
+
+path = "localhost"
+port = 8765
+
+
+def game_config() -> GameConfig:
+    # the players go forward side by side: none of them is killed and skips a tick
+    return GameConfig(
+        GameMap(20),
+        spawn_positions=[Position(2, 5), Position(2, 10)],
+        spawn_directions=[Direction(Direction.RIGHT), Direction(Direction.RIGHT)],
+    )
+
+
+async def play(registration: str) -> int:
+    nb_ticks = 0
+    async with websockets.connect(f"ws://{path}:{port}") as websocket:
+        await websocket.send(registration)
+        try:
+            while True:
+                data = json.loads(await websocket.recv())
+                nb_ticks += 1
+                await websocket.send(json.dumps({"type": "move", "action": "FORWARD", "tick": data["game"]["tick"]}))
+        except websockets.ConnectionClosed:
+            pass
+    return nb_ticks
+
+
+class TestSocketLobbyServer(unittest.TestCase):
+    def setUp(self):
+        self.game_servers: List[SocketGameServer] = []
+
+    def create_game_server(self, room_id: str, game_id: int) -> SocketGameServer:
+        game_server = SocketGameServer(
+            max_nb_ticks=5, min_nb_players=2, max_nb_players=2, game_config=game_config(), path=path, port=port
+        )
+        game_server.room_id = room_id
+        self.game_servers.append(game_server)
+        return game_server
+
+    def test_room_id(self):
+        lobby = SocketLobbyServer(self.create_game_server, room_ids_by_token={"abc": "room-abc"})
+        self.assertEqual(lobby.room_id({"type": "register", "room": "a", "token": "abc"}), "a")
+        self.assertEqual(lobby.room_id({"type": "register", "token": "abc"}), "room-abc")
+        self.assertEqual(lobby.room_id({"type": "viewer"}), SocketLobbyServer.DEFAULT_ROOM)
+
+    def test_concurrent_games(self):
+        async def run():
+            lobby = SocketLobbyServer(self.create_game_server, path=path, port=port)
+            await lobby.start()
+
+            # two games in two rooms at the same time, the third player of room a starts a new game
+            nb_ticks = await asyncio.gather(
+                play('{"type": "register", "name": "a1", "room": "a"}'),
+                play('{"type": "register", "name": "b1", "room": "b"}'),
+                play('{"type": "register", "name": "a2", "room": "a"}'),
+                play('{"type": "register", "name": "b2", "room": "b"}'),
+            )
+            self.assertEqual(nb_ticks, [5, 5, 5, 5])
+            await asyncio.sleep(0)
+            self.assertEqual(lobby.rooms, {})
+            self.assertEqual(lobby.nb_finished_games, 2)
+
+            # the finished games are recycled, the same process hosts the next game of the room
+            await asyncio.gather(
+                play('{"type": "register", "name": "a3", "room": "a"}'),
+                play('{"type": "register", "name": "a4", "room": "a"}'),
+            )
+            await asyncio.sleep(0)
+            self.assertEqual(lobby.nb_games, 3)
+            self.assertEqual(lobby.nb_finished_games, 3)
+
+            await lobby.terminate()
+
+        asyncio.run(run())
+
+        # the players of the first two games connect concurrently, any of the two rooms can be created first
+        self.assertEqual(sorted(s.room_id for s in self.game_servers[:2]), ["a", "b"])
+        self.assertEqual(self.game_servers[2].room_id, "a")
+        self.assertEqual(
+            sorted(sorted(p.name for p in s.game.players) for s in self.game_servers[:2]), [["a1", "a2"], ["b1", "b2"]]
+        )
+        self.assertEqual(sorted(p.name for p in self.game_servers[2].game.players), ["a3", "a4"])
+
+    def test_full_game(self):
+        async def run():
+            lobby = SocketLobbyServer(self.create_game_server, path=path, port=port)
+            game_server = lobby.get_game_server("a", for_player=True)
+            game_server.game.register_player(RandomPlayer())
+            game_server.game.register_player(RandomPlayer())
+
+            # the game is full, a new one is created for the next player, viewers watch the last one
+            self.assertIsNot(lobby.get_game_server("a", for_player=True), game_server)
+            self.assertIs(lobby.get_game_server("a", for_player=False), lobby.rooms["a"])
+            self.assertEqual(lobby.nb_games, 2)
+
+            await lobby.terminate()
+
+        asyncio.run(run())
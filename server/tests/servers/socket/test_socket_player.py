@@ -1,9 +1,11 @@
 import asyncio
+import json
 import unittest
 
 import websockets
 from asyncmock import AsyncMock, Mock
 from blitz2020.game.action import Action
+from blitz2020.game.game import Game
 from blitz2020.game.game_map import GameMap
 from blitz2020.game.game_state import GameState
 from blitz2020.game.player_state import PlayerState
@@ -80,6 +82,25 @@ class TestSocketPlayer(unittest.TestCase):
         player.server.game.unregister_player.assert_not_called()
         self.assertTrue(len(player.player_state.history) > 0)
 
+    def test_retry_sends_the_new_history(self):
+        game = Game(GameState(GameMap(5)), max_nb_ticks=10)
+        game.game_tick = 1
+        server = Mock()
+        server.game = game
+        socket = AsyncMock()
+        socket.recv.side_effect = [
+            '{ "type":"move", "action":"TURN_LEFT", "tick": 5 }',
+            '{ "type":"move", "action":"TURN_LEFT", "tick": 1 }',
+        ]
+        player = game.register_player(SocketPlayer(server, "p1", socket))
+
+        # the out of sync answer is added to the history before the same tick is sent again
+        self.assertEqual(asyncio.run(game.request_next_move(player)), Action.TURN_LEFT)
+        first, second = [json.loads(call.args[0]) for call in socket.send.call_args_list]
+        self.assertEqual(first["game"]["tick"], second["game"]["tick"])
+        messages = [item["message"] for item in second["players"][0]["history"]]
+        self.assertTrue(any("out of sync" in message for message in messages))
+
 
 def get_player(server, socket):
     gs = GameState(GameMap(3))
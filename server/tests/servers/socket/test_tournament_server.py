@@ -0,0 +1,141 @@
+import asyncio
+import unittest
+from typing import List
+
+from blitz2020.servers.socket.socket_game_server import SocketGameServer
+from blitz2020.servers.socket.tournament_server import TournamentServer
+from tests.servers.socket.test_socket_lobby_server import game_config, play, path, port
+
+
+def create_game_server(room_id: str, game_id: int) -> SocketGameServer:
+    return SocketGameServer(
+        max_nb_ticks=5, min_nb_players=2, max_nb_players=2, game_config=game_config(), path=path, port=port
+    )
+
+
+class SlowWebSocket:
+    def __init__(self):
+        self.sent: List[str] = []
+
+    async def send(self, data: str) -> None:
+        # the first messages are the slowest to send
+        await asyncio.sleep(0.01 / (len(self.sent) + 1))
+        self.sent.append(data)
+
+    async def close(self) -> None:
+        self.sent.append("closed")
+
+
+class TestTournamentServer(unittest.TestCase):
+    def test_games_in_workers(self):
+        async def run():
+            tournament = TournamentServer(create_game_server, nb_workers=2, path=path, port=port)
+            await tournament.start()
+
+            nb_ticks = await asyncio.gather(
+                play('{"type": "register", "name": "a1", "room": "a"}'),
+                play('{"type": "register", "name": "b1", "room": "b"}'),
+                play('{"type": "register", "name": "a2", "room": "a"}'),
+                play('{"type": "register", "name": "b2", "room": "b"}'),
+            )
+            self.assertEqual(nb_ticks, [5, 5, 5, 5])
+
+            # one game per worker, both are done
+            await asyncio.sleep(0)
+            self.assertEqual(tournament.nb_games, 2)
+            self.assertEqual(tournament.nb_finished_games, 2)
+            self.assertEqual(tournament.worker_nb_games, [0, 0])
+
+            await tournament.terminate()
+            return tournament
+
+        tournament = asyncio.run(run())
+        self.assertEqual(len(tournament.processes), 2)
+        self.assertFalse(any(process.is_alive() for process in tournament.processes))
+
+    def test_worker_assignment(self):
+        async def run():
+            tournament = TournamentServer(create_game_server, nb_workers=3, path=path, port=port)
+            tournament.worker_nb_games = [2, 0, 1]
+
+            # a new game goes to the worker with the fewest games
+            worker_ids = [tournament.create_remote_game_server("room", game_id).worker_id for game_id in range(4)]
+            self.assertEqual(worker_ids, [1, 1, 2, 0])
+            self.assertEqual(tournament.worker_nb_games, [3, 2, 2])
+
+            game_server = tournament.remote_game_servers[1]
+            tournament.game_finished(1, "p1")
+            self.assertEqual(tournament.worker_nb_games, [3, 1, 2])
+            self.assertEqual(await game_server.wait_for_game_to_finish(), "p1")
+
+        asyncio.run(run())
+
+    def test_refused_players_do_not_take_a_slot(self):
+        async def run():
+            tournament = TournamentServer(create_game_server, nb_workers=1, path=path, port=port)
+            await tournament.start()
+
+            # the worker refuses the registrations without name, their game still has two free slots
+            nb_ticks = await asyncio.gather(*[play('{"type": "register", "room": "a"}') for _ in range(3)])
+            self.assertEqual(nb_ticks, [0, 0, 0])
+            while any(game_server.registering for game_server in tournament.remote_game_servers.values()):
+                await asyncio.sleep(0.01)
+            nb_ticks = await asyncio.gather(
+                play('{"type": "register", "name": "a1", "room": "a"}'),
+                play('{"type": "register", "name": "a2", "room": "a"}'),
+            )
+            self.assertEqual(nb_ticks, [5, 5])
+            self.assertEqual(tournament.nb_games, 1)
+
+            await tournament.terminate()
+
+        asyncio.run(run())
+
+    def test_registering_players(self):
+        async def run():
+            tournament = TournamentServer(create_game_server, nb_workers=1, path=path, port=port)
+            tournament.worker_nb_games = [0]
+            game_server = tournament.create_remote_game_server("room", 0)
+            tournament.on_worker_message(0, ("game_opened", 0, 2))
+
+            # the registrations waiting for the worker take a slot until accepted or refused
+            game_server.registering.update([1, 2])
+            self.assertFalse(game_server.accepts_players())
+            tournament.on_worker_message(0, ("player_registered", 0, 1))
+            game_server.registering.discard(2)
+            self.assertEqual(game_server.nb_players, 1)
+            self.assertTrue(game_server.accepts_players())
+            tournament.on_worker_message(0, ("player_registered", 0, 3))
+            self.assertFalse(game_server.accepts_players())
+
+        asyncio.run(run())
+
+    def test_terminate_finishes_the_games(self):
+        async def run():
+            tournament = TournamentServer(create_game_server, nb_workers=1, path=path, port=port)
+            tournament.worker_nb_games = [0]
+            game_server = tournament.create_remote_game_server("room", 0)
+
+            await tournament.terminate()
+            self.assertEqual(await game_server.wait_for_game_to_finish(), "Server terminated")
+            self.assertEqual(tournament.remote_game_servers, {})
+
+        asyncio.run(run())
+
+    def test_send_to_client_in_order(self):
+        async def run():
+            tournament = TournamentServer(create_game_server, nb_workers=1, path=path, port=port)
+            websocket = SlowWebSocket()
+            connection_id = tournament.add_websocket(websocket)
+
+            for tick in range(5):
+                tournament.on_worker_message(0, ("send", connection_id, f"tick {tick}"))
+            tournament.on_worker_message(0, ("close", connection_id))
+            await tournament.send_tasks[connection_id]
+            self.assertEqual(websocket.sent, [f"tick {tick}" for tick in range(5)] + ["closed"])
+
+            tournament.remove_websocket(connection_id)
+            self.assertEqual(tournament.send_queues, {})
+            self.assertEqual(tournament.send_tasks, {})
+
+        asyncio.run(run())
@@ -1,9 +1,12 @@
 import datetime
 import datetime
 import json
+import random
 import unittest
 
+from blitz2020.game.action import Action
 from blitz2020.game.direction import Direction
+from blitz2020.game.game_config import GameConfig
 from blitz2020.game.game_map import GameMap
 from blitz2020.game.game_state import GameState
 from blitz2020.game.player_state import PlayerState, HistoryItem
@@ -16,7 +19,19 @@ from blitz2020.servers.socket.utils import (
     player_state_to_dict,
     dict_to_game_state,
     game_state_to_dict,
+    tick_snapshot,
+    to_json,
+    tick_delta,
+    apply_tick_delta,
+    TickEncoder,
+    PROTOCOL_DELTA,
+    PROTOCOL_BINARY,
+    encode_binary_tick,
+    decode_binary_tick,
+    generate_pretty_map_from_game_state,
 )
+from blitz2020.game.array_game_map import ArrayGameMap
+import blitz2020.servers.socket.utils as utils
 from tests.game.map_utils import create_map_with, W, E
 
 state_test = {
@@ -261,6 +276,148 @@ class TestUtils(unittest.TestCase):
 
         self.assertEqual(data, expected)
 
+    def test_tick_snapshot(self):
+        game_state = self.create_state()
+
+        snapshot = tick_snapshot(game_state)
+        self.assertIs(snapshot, tick_snapshot(game_state))
+        for player_id in [None, -1, 0, 1]:
+            self.assertEqual(
+                game_state_to_json(game_tick=12, player_id=player_id, game_state=game_state, ticks_left=34),
+                snapshot.to_json(12, player_id, ticks_left=34),
+            )
+        self.assertEqual(
+            game_state_to_dict(12, -1, game_state, ticks_left=34, with_history=False),
+            snapshot.to_dict(12, -1, ticks_left=34, with_history=False),
+        )
+
+        without_pretty_map = json.loads(snapshot.to_json(12, 1, ticks_left=34, with_pretty_map=False))
+        self.assertNotIn("pretty_map", without_pretty_map["game"])
+        self.assertEqual(1, without_pretty_map["game"]["player_id"])
+
+        # the snapshot is rebuilt once the game state changes
+        game_state.apply_action(13, game_state.players[0], Action.FORWARD)
+        self.assertIsNot(snapshot, tick_snapshot(game_state))
+        self.assertEqual(
+            game_state_to_json(game_tick=13, player_id=0, game_state=game_state, ticks_left=33),
+            tick_snapshot(game_state).to_json(13, 0, ticks_left=33),
+        )
+
+    def test_tick_snapshot_does_not_change(self):
+        game_state = self.create_state()
+        player, other = game_state.players[0], game_state.players[1]
+
+        snapshot = tick_snapshot(game_state)
+        expected = json.loads(json.dumps(snapshot.players()))
+        expected_without_history = [{**p, "history": []} for p in expected]
+        expected_pretty_map = generate_pretty_map_from_game_state(snapshot.map, game_state)
+        expected_binary = encode_binary_tick(12, 0, game_state, ticks_left=34)
+
+        player.stats.kill_player(other.name)
+        other.stats.killed_by_player(player.name)
+        game_state.apply_action(13, player, Action.FORWARD)
+        self.assertEqual(expected, snapshot.players())
+        self.assertEqual(expected_without_history, snapshot.players(with_history=False))
+        self.assertEqual(expected_pretty_map, snapshot.pretty_map())
+        self.assertEqual(expected_binary, snapshot.to_binary(12, 0, ticks_left=34))
+        self.assertNotEqual(expected, tick_snapshot(game_state).players())
+
+    def test_tick_snapshot_history_and_active(self):
+        game_state = self.create_state()
+        player = game_state.players[0]
+
+        # neither change the game state version
+        snapshot = tick_snapshot(game_state)
+        player.add_history(12, "Asked again")
+        self.assertIsNot(snapshot, tick_snapshot(game_state))
+        self.assertEqual(
+            game_state_to_json(game_tick=12, player_id=0, game_state=game_state, ticks_left=34),
+            tick_snapshot(game_state).to_json(12, 0, ticks_left=34),
+        )
+
+        snapshot = tick_snapshot(game_state)
+        player.active = False
+        self.assertIsNot(snapshot, tick_snapshot(game_state))
+        self.assertFalse(tick_snapshot(game_state).players()[0]["active"])
+
+    def test_compact_json(self):
+        game_state = self.create_state()
+        data = game_state_to_dict(12, 1, game_state, ticks_left=34)
+        indented = game_state_to_json(game_tick=12, player_id=1, game_state=game_state, ticks_left=34)
+        compact = game_state_to_json(game_tick=12, player_id=1, game_state=game_state, ticks_left=34, compact=True)
+
+        self.assertLess(len(compact), len(indented))
+        self.assertNotIn("\n ", compact)
+        self.assertEqual(json.loads(indented), json.loads(compact))
+        self.assertEqual(compact, tick_snapshot(game_state).to_json(12, 1, ticks_left=34, compact=True))
+
+        # stdlib fallback when orjson is not installed
+        fast_encoder, utils.orjson = utils.orjson, None
+        try:
+            self.assertEqual(json.dumps(data, separators=(",", ":")), to_json(data, compact=True))
+        finally:
+            utils.orjson = fast_encoder
+
+    def play_random_ticks(self, nb_ticks: int):
+        random.seed(42)
+        game_state = GameState(GameConfig.from_file("game_presets/0-basic_4p_21x21.txt"))
+        for i in range(4):
+            game_state.add_player(str(i))
+
+        for tick in range(1, nb_ticks + 1):
+            for player in game_state.players:
+                game_state.apply_action(tick, player, random.choice(list(Action)))
+            game_state.update_players_scores()
+            yield tick, game_state
+
+    def test_tick_delta(self):
+        previous = None
+        for tick, game_state in self.play_random_ticks(60):
+            current = game_state_to_dict(tick, 1, game_state, ticks_left=100 - tick)
+            if previous is not None:
+                delta = tick_delta(previous, current)
+                self.assertEqual("delta", delta["type"])
+                self.assertNotIn("map", delta["game"])
+                self.assertEqual(current, apply_tick_delta(previous, delta))
+                self.assertLess(len(json.dumps(delta)), len(json.dumps(current)))
+            previous = json.loads(json.dumps(current))
+
+        with self.assertRaises(Exception):
+            apply_tick_delta(previous, delta)
+
+    def test_tick_encoder_delta(self):
+        encoder = TickEncoder(protocol=PROTOCOL_DELTA, keyframe_interval=5)
+        state = None
+        for tick, game_state in self.play_random_ticks(12):
+            message = json.loads(encoder.encode(tick, 2, game_state, ticks_left=100 - tick))
+
+            # a keyframe every 5 messages
+            self.assertEqual("tick" if tick % 5 == 1 else "delta", message["type"])
+            state = message if message["type"] == "tick" else apply_tick_delta(state, message)
+            self.assertEqual(game_state_to_dict(tick, 2, game_state, ticks_left=100 - tick), state)
+
+        # the client may have missed the last message
+        encoder.reset()
+        self.assertEqual("tick", json.loads(encoder.encode(13, 2, game_state, ticks_left=87))["type"])
+
+    def test_binary_tick(self):
+        for tick, game_state in self.play_random_ticks(30):
+            frame = encode_binary_tick(tick, 3, game_state, ticks_left=100 - tick)
+            self.assertIsInstance(frame, bytes)
+            expected = game_state_to_dict(tick, 3, game_state, ticks_left=100 - tick, with_pretty_map=False)
+            self.assertEqual(expected, decode_binary_tick(frame))
+
+        # same frame with the array storage
+        array_state = GameState(ArrayGameMap.from_game_map(game_state.game_map), game_state.players)
+        self.assertEqual(frame, encode_binary_tick(tick, 3, array_state, ticks_left=100 - tick))
+
+        # viewers have no player id
+        encoder = TickEncoder(protocol=PROTOCOL_BINARY)
+        self.assertEqual(-1, decode_binary_tick(encoder.encode(tick, -1, game_state, 0))["game"]["player_id"])
+
+        with self.assertRaises(Exception):
+            decode_binary_tick(b"JSON" + frame[4:])
+
     def test_dict_to_game_map(self):
         data = state_test["game"]["map"]
         new_map = dict_to_game_map(data)
@@ -281,6 +438,19 @@ class TestUtils(unittest.TestCase):
         gm.conquer_tile(Position(2, 2), 2)
         self.assertEqual(gm, new_map)
 
+    def test_player_state_to_dict_copies_the_stats(self):
+        game_state = self.create_state()
+        player, other = game_state.players[0], game_state.players[1]
+        data = player_state_to_dict(player)
+        other_data = player_state_to_dict(other)
+        kills = dict(player.stats.kills)
+        killed_by_players = dict(other.stats.killed_by_players)
+
+        player.stats.kill_player(other.name)
+        other.stats.killed_by_player(player.name)
+        self.assertEqual(data["stats"]["players_killed"], kills)
+        self.assertEqual(other_data["stats"]["killed_by_players"], killed_by_players)
+
     def test_dict_to_player_state(self):
         data = state_test["players"][0]
         gm = GameMap(20)
@@ -0,0 +1,76 @@
+import unittest
+
+from blitz2020.players.random_player import RandomPlayer
+from blitz2020.simulator import (
+    GAME_PRESETS_PATH,
+    DEFAULT_PLAYER,
+    aggregate_results,
+    load_player_class,
+    parse_player,
+    run_game,
+    simulate,
+)
+
+map_2p = str(GAME_PRESETS_PATH / "practice-2p-0.txt")
+map_4p = str(GAME_PRESETS_PATH / "practice-4p-0.txt")
+
+
+class TestSimulator(unittest.TestCase):
+    def test_parse_player(self):
+        self.assertEqual(parse_player(DEFAULT_PLAYER, 2), ("RandomPlayer-2", DEFAULT_PLAYER))
+        self.assertEqual(parse_player(f"bob={DEFAULT_PLAYER}", 2), ("bob", DEFAULT_PLAYER))
+        self.assertIs(load_player_class(DEFAULT_PLAYER), RandomPlayer)
+        with self.assertRaises(Exception):
+            load_player_class("blitz2020.simulator:simulate")
+
+    def test_run_game(self):
+        players = [("a", DEFAULT_PLAYER), ("b", DEFAULT_PLAYER)]
+        result = run_game(map_2p, players, max_nb_ticks=50, seed=3)
+        self.assertEqual(result["nb_ticks"], 50)
+        self.assertEqual([p["rank"] for p in result["players"]], [1, 2])
+        self.assertEqual(sorted(p["name"] for p in result["players"]), ["a", "b"])
+        self.assertEqual(sorted(p["spawn"] for p in result["players"]), [0, 1])
+
+        # same seed, same game
+        same = run_game(map_2p, players, max_nb_ticks=50, seed=3)
+        self.assertEqual([p["score"] for p in result["players"]], [p["score"] for p in same["players"]])
+
+    def test_simulate(self):
+        results = simulate(4, [DEFAULT_PLAYER, DEFAULT_PLAYER], [map_4p, map_2p], max_nb_ticks=20, nb_processes=2)
+        self.assertEqual([r["map"] for r in results], ["practice-4p-0.txt", "practice-2p-0.txt"] * 2)
+        self.assertEqual([r["seed"] for r in results], [0, 1, 2, 3])
+
+        # the spawn positions rotate between the players
+        spawns = [{p["name"]: p["spawn"] for p in r["players"]} for r in results]
+        self.assertEqual(spawns[0], {"RandomPlayer-0": 0, "RandomPlayer-1": 1})
+        self.assertEqual(spawns[1], {"RandomPlayer-0": 1, "RandomPlayer-1": 0})
+
+        # the maps without enough spawn positions are skipped
+        with self.assertRaises(Exception):
+            simulate(1, [DEFAULT_PLAYER] * 3, [map_2p], nb_processes=1)
+
+    def test_aggregate_results(self):
+        def result(duration, *players):
+            return {
+                "nb_ticks": 100,
+                "duration": duration,
+                "players": [
+                    {"name": name, "rank": rank, "score": score} for rank, (name, score) in enumerate(players, start=1)
+                ],
+            }
+
+        results = [
+            result(1.0, ("a", 10), ("b", 5)),
+            result(1.0, ("b", 30), ("a", 20)),
+            result(2.0, ("a", 30), ("b", 10)),
+        ]
+        summary = aggregate_results(results, wall_time=2.0)
+
+        self.assertEqual(summary["nb_games"], 3)
+        self.assertEqual(summary["ticks_per_second"], 75)
+        self.assertEqual(summary["total_ticks_per_second"], 150)
+        self.assertEqual(summary["players"]["a"]["nb_wins"], 2)
+        self.assertAlmostEqual(summary["players"]["a"]["win_rate"], 2 / 3)
+        self.assertAlmostEqual(summary["players"]["b"]["mean_rank"], 5 / 3)
+        self.assertEqual(summary["players"]["a"]["score"]["median"], 20)
+        self.assertEqual(summary["players"]["b"]["score"]["max"], 30)
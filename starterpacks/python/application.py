@@ -6,7 +6,14 @@ import websockets
 
 from bot import Bot
 from bot_message import BotMessage, MessageType, Move
-from game_message import GameMessage
+from game_message import GameMessage, GameMessageDecoder
+
+
+# protocol 1: every tick message has the full game state
+# protocol 2: opt-in, the server only sends the changes between two ticks, the decoder rebuilds the full game message
+# protocol 3: opt-in, the server sends binary frames, faster to decode but without the pretty map
+# set PROTOCOL to 2 or 3 to use them, GameMessageDecoder decodes the messages of every protocol
+PROTOCOL = 1
 
 
 async def run():
@@ -15,21 +22,24 @@ async def run():
     async with websockets.connect(uri) as websocket:
         bot = Bot()
         if "TOKEN" in os.environ:
-            await websocket.send(BotMessage(type=MessageType.REGISTER, token=os.environ["TOKEN"]).to_json())
+            await websocket.send(
+                BotMessage(type=MessageType.REGISTER, token=os.environ["TOKEN"], protocol=PROTOCOL).to_json()
+            )
         else:
-            await websocket.send(BotMessage(type=MessageType.REGISTER, name="MyBot").to_json())
+            await websocket.send(BotMessage(type=MessageType.REGISTER, name="MyBot", protocol=PROTOCOL).to_json())
 
         await game_loop(websocket=websocket, bot=bot)
 
 
 async def game_loop(websocket: websockets.WebSocketServerProtocol, bot: Bot):
+    decoder = GameMessageDecoder()
     while True:
         try:
             message = await websocket.recv()
         except websockets.exceptions.ConnectionClosed:
             # Connection is closed, the game is probably over
             break
-        game_message: GameMessage = GameMessage.from_json(message)
+        game_message: GameMessage = decoder.decode(message)
 
         print(f"\nTurn {game_message.game.tick}")
 
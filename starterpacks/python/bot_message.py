@@ -22,3 +22,5 @@ class BotMessage:
     tick: int = None
     token: str = None
     name: str = None
+    pretty_map: bool = None
+    protocol: int = None
@@ -1,7 +1,9 @@
+import json
+import struct
 from dataclasses import dataclass, field
 from dataclasses_json import dataclass_json
 from enum import Enum
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
 
 
 class Direction(Enum):
@@ -41,11 +43,12 @@ class Point:
 
 @dataclass
 class Game:
-    pretty_map: str
     map: List[List[str]]
     tick: int
     ticks_left: int
     player_id: int
+    # only sent when the server is configured to, or when registering with pretty_map=True
+    pretty_map: Optional[str] = None
 
     def _validate_tile_exists(self, point: Point):
         if point.y < 0 or not point.y < len(self.map):
@@ -97,3 +100,127 @@ class GameMessage:
 
     def generate_players_by_id_dict(self) -> Dict[int, Player]:
         return {player.id: player for player in self.players}
+
+
+def apply_delta(previous: dict, delta: dict) -> dict:
+    """
+    Rebuild the full game message from the previous one and a delta message (protocol 2).
+    """
+    if delta["game"]["base_tick"] != previous["game"]["tick"]:
+        raise Exception(f"Delta for tick {delta['game']['base_tick']} received on tick {previous['game']['tick']}.")
+
+    game_map = [row.copy() for row in previous["game"]["map"]]
+    for tile in delta["game"]["tiles"]:
+        game_map[tile["y"]][tile["x"]] = tile["tile"]
+    game = {"map": game_map}
+    game.update((key, value) for key, value in delta["game"].items() if key not in ("base_tick", "tiles"))
+
+    players = [dict(player) for player in previous["players"]]
+    players_by_id = {player["id"]: player for player in players}
+    for changes in delta["players"]:
+        player = players_by_id.get(changes["id"])
+        if player is None:
+            players.append(dict(changes))
+            continue
+        for key, value in changes.items():
+            if key == "tail_append":
+                player["tail"] = player["tail"] + value
+            elif key == "history_prepend":
+                player["history"] = (value + player["history"])[: changes["history_size"]]
+            elif key != "history_size":
+                player[key] = value
+
+    return {"type": "tick", "game": game, "players": players}
+
+
+# binary frames (protocol 3), see the server documentation for the format
+# copies of the BINARY_* constants of server/blitz2020/servers/socket/utils.py, the server is the source of truth
+BINARY_HEADER = struct.Struct("<4sBHhIi")
+BINARY_PLAYER = struct.Struct("<BBHHHHBBdH")
+BINARY_TILES = [" ", "W", "%", "$", "!"]
+BINARY_DIRECTIONS = ["UP", "LEFT", "DOWN", "RIGHT"]
+BINARY_NO_OWNER = 255
+
+
+def decode_binary_frame(frame: bytes) -> dict:
+    """
+    Decode a binary tick frame (protocol 3) into the same dict as the json game message, without the pretty map.
+    """
+    magic, version, size, player_id, tick, ticks_left = BINARY_HEADER.unpack_from(frame)
+    if magic != b"BLTZ" or version != 1:
+        raise Exception(f"Invalid binary frame: {magic} version {version}.")
+    offset = BINARY_HEADER.size
+
+    nb_tiles = size * size
+    kinds = frame[offset : offset + nb_tiles]
+    owners = frame[offset + nb_tiles : offset + 2 * nb_tiles]
+    offset += 2 * nb_tiles
+    game_map = []
+    for y in range(size):
+        row = []
+        for index in range(y * size, (y + 1) * size):
+            tile = BINARY_TILES[kinds[index]]
+            if owners[index] != BINARY_NO_OWNER:
+                tile = f"{'C' if tile == ' ' else tile}-{owners[index]}"
+            row.append(tile)
+        game_map.append(row)
+
+    nb_players = frame[offset]
+    offset += 1
+    players = []
+    for _ in range(nb_players):
+        id, flags, x, y, spawn_x, spawn_y, direction, spawn_direction, score, tail_size = BINARY_PLAYER.unpack_from(
+            frame, offset
+        )
+        offset += BINARY_PLAYER.size
+        tail = struct.unpack_from(f"<{2 * tail_size}H", frame, offset)
+        offset += 4 * tail_size
+        (name_size,) = struct.unpack_from("<H", frame, offset)
+        name = frame[offset + 2 : offset + 2 + name_size].decode("utf-8")
+        offset += 2 + name_size
+        (extra_size,) = struct.unpack_from("<I", frame, offset)
+        extra = json.loads(frame[offset + 4 : offset + 4 + extra_size].decode("utf-8"))
+        offset += 4 + extra_size
+
+        players.append(
+            {
+                "active": bool(flags & 1),
+                "killed": bool(flags & 2),
+                "position": {"x": x, "y": y},
+                "spawn_position": {"x": spawn_x, "y": spawn_y},
+                "direction": BINARY_DIRECTIONS[direction],
+                "spawn_direction": BINARY_DIRECTIONS[spawn_direction],
+                "tail": [{"x": tail[i], "y": tail[i + 1]} for i in range(0, len(tail), 2)],
+                "id": id,
+                "name": name,
+                "score": score,
+                "stats": extra["stats"],
+                "history": extra["history"],
+            }
+        )
+
+    game = {"map": game_map, "player_id": player_id, "tick": tick, "ticks_left": ticks_left}
+    return {"type": "tick", "game": game, "players": players}
+
+
+class GameMessageDecoder:
+    """
+    Decode the messages received from the server into full GameMessage, with every protocol.
+
+    With protocol 2, the server sends a full message from time to time and only the changes in between,
+    the decoder keeps the last game state to rebuild the full messages. With protocol 3, the messages
+    are binary frames.
+    """
+
+    def __init__(self):
+        self.last_message: Optional[dict] = None
+
+    def decode(self, message: Union[str, bytes]) -> GameMessage:
+        if isinstance(message, bytes):
+            data = decode_binary_frame(message)
+        else:
+            data = json.loads(message)
+        if data["type"] == "delta":
+            data = apply_delta(self.last_message, data)
+        self.last_message = data
+        return GameMessage.from_dict(data)
@@ -1,3 +1,5 @@
+import json
+import struct
 import unittest
 from game_message import *
 
@@ -51,3 +53,71 @@ class TestGameMessage(unittest.TestCase):
                 posx += 1
 
             posy += 1
+
+    def test_decode_delta(self):
+        with open("game_message.json", "r") as file:
+            full = json.loads(file.read())
+        player = full["players"][0]
+        delta = {
+            "type": "delta",
+            "game": {
+                "base_tick": full["game"]["tick"],
+                "tiles": [{"x": 1, "y": 1, "tile": "C-3"}],
+                "player_id": full["game"]["player_id"],
+                "tick": full["game"]["tick"] + 1,
+                "ticks_left": full["game"]["ticks_left"] - 1,
+            },
+            "players": [{"id": player["id"], "score": 123.5, "tail_append": [{"x": 1, "y": 1}]}],
+        }
+
+        decoder = GameMessageDecoder()
+        decoder.decode(json.dumps(full))
+        game_message = decoder.decode(json.dumps(delta))
+
+        self.assertEqual(game_message.game.tick, full["game"]["tick"] + 1)
+        self.assertEqual(game_message.game.get_tile_type_at(Point(x=1, y=1)), TileType.CONQUERED)
+        self.assertEqual(game_message.game.get_tile_owner_id(Point(x=1, y=1)), 3)
+        self.assertEqual(game_message.players[0].score, 123.5)
+        self.assertEqual(game_message.players[0].tail[-1], Point(x=1, y=1))
+        self.assertEqual(len(game_message.players[0].tail), len(player["tail"]) + 1)
+
+    def test_decode_server_binary_frame(self):
+        # binary_tick.bin is generated by encode_binary_tick on the server, whose BINARY_* constants in
+        # server/blitz2020/servers/socket/utils.py are the source of truth: regenerate both fixtures when they change
+        with open("binary_tick.bin", "rb") as file:
+            frame = file.read()
+        with open("binary_tick.json", "r") as file:
+            expected = json.load(file)
+
+        self.assertEqual(decode_binary_frame(frame), expected)
+        game_message = GameMessageDecoder().decode(frame)
+        self.assertEqual(game_message.game.map[2], ["W", " ", " ", "%-1", "W"])
+        self.assertEqual(game_message.players[1].history[0].message, "out of sync")
+
+    def test_decode_binary_frame(self):
+        # 3x3 map: asteroids border with a planet conquered by player 1 in the middle
+        kinds = bytes([1, 1, 1, 1, 2, 1, 1, 1, 1])
+        owners = bytes([255, 255, 255, 255, 1, 255, 255, 255, 255])
+        extra = json.dumps({"stats": {"CONQUERED": 1}, "history": []}).encode("utf-8")
+        frame = (
+            BINARY_HEADER.pack(b"BLTZ", 1, 3, 1, 12, 88)
+            + kinds
+            + owners
+            + bytes([1])
+            + BINARY_PLAYER.pack(1, 1, 1, 1, 1, 1, 3, 3, 4.5, 1)
+            + struct.pack("<2H", 1, 1)
+            + struct.pack("<H", 2)
+            + b"p1"
+            + struct.pack("<I", len(extra))
+            + extra
+        )
+
+        game_message = GameMessageDecoder().decode(frame)
+        self.assertEqual(game_message.game.tick, 12)
+        self.assertEqual(game_message.game.player_id, 1)
+        self.assertEqual(game_message.game.map[1], ["W", "%-1", "W"])
+        self.assertEqual(game_message.game.get_tile_type_at(Point(x=1, y=1)), TileType.CONQUERED_PLANET)
+        self.assertEqual(game_message.players[0].name, "p1")
+        self.assertEqual(game_message.players[0].direction, Direction.RIGHT)
+        self.assertEqual(game_message.players[0].tail, [Point(x=1, y=1)])
+        self.assertEqual(game_message.players[0].score, 4.5)